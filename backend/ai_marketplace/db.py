@@ -0,0 +1,149 @@
+import contextvars
+import functools
+import random
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+STICKY_COOKIE = 'db_primary_until'
+
+# Whether reads in this context may go to a replica, and whether this
+# context has written (or must otherwise see the primary's latest state)
+_use_replica = contextvars.ContextVar('use_replica', default=False)
+_pinned = contextvars.ContextVar('pinned_to_primary', default=False)
+_wrote = contextvars.ContextVar('wrote_to_primary', default=False)
+
+
+def replica_aliases():
+    return getattr(settings, 'REPLICA_DATABASES', [])
+
+
+def replicas_in_use():
+    """
+    Whether reads in the current context are being served by a replica
+    """
+    return bool(replica_aliases()) and _use_replica.get() and not _pinned.get()
+
+
+class ReplicaRouter:
+    """
+    Send reads marked with read_from_replica to a replica and everything
+    else to the primary.
+
+    A write pins the rest of the context (request, command or block) to
+    the primary so it reads its own writes; ReplicaStickinessMiddleware
+    carries that pin over to the client's next requests.
+    """
+
+    def db_for_read(self, model, **hints):
+        instance = hints.get('instance')
+        if instance is not None and instance._state.db:
+            return instance._state.db
+        if not replicas_in_use() or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return random.choice(replica_aliases())
+
+    def db_for_write(self, model, **hints):
+        _wrote.set(True)
+        _pinned.set(True)
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same data as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas get their schema through replication
+        return db not in replica_aliases()
+
+
+class read_from_replica:
+    """
+    Decorator or context manager letting ORM reads go to a replica.
+
+    Use it on read-heavy views and commands that tolerate replication lag.
+    """
+
+    def __init__(self, func=None):
+        self.func = func
+        self._tokens = []
+        if func is not None:
+            functools.update_wrapper(self, func)
+
+    def __enter__(self):
+        self._tokens.append((_use_replica.set(True), _pinned.set(_pinned.get())))
+        return self
+
+    def __exit__(self, *exc_info):
+        use_token, pinned_token = self._tokens.pop()
+        _use_replica.reset(use_token)
+        _pinned.reset(pinned_token)
+
+    def __call__(self, *args, **kwargs):
+        with read_from_replica():
+            return self.func(*args, **kwargs)
+
+    def __get__(self, instance, owner):
+        # Support decorating methods such as BaseCommand.handle
+        if instance is None:
+            return self
+        return functools.partial(self.__call__, instance)
+
+
+class ReplicaStickinessMiddleware:
+    """
+    Read-your-writes across requests: after a request that writes, the
+    same client reads from the primary for REPLICA_STICKY_SECONDS
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        tokens = self._enter(request)
+        try:
+            response = self.get_response(request)
+            wrote = _wrote.get()
+        finally:
+            self._exit(tokens)
+        return self._stick(request, response, wrote)
+
+    async def __acall__(self, request):
+        tokens = self._enter(request)
+        try:
+            response = await self.get_response(request)
+            wrote = _wrote.get()
+        finally:
+            self._exit(tokens)
+        return self._stick(request, response, wrote)
+
+    def _enter(self, request):
+        try:
+            pinned = float(request.COOKIES.get(STICKY_COOKIE, 0)) > time.time()
+        except ValueError:
+            pinned = False
+        return (_use_replica.set(False), _pinned.set(pinned), _wrote.set(False))
+
+    def _exit(self, tokens):
+        for var, token in zip((_use_replica, _pinned, _wrote), tokens):
+            var.reset(token)
+
+    def _stick(self, request, response, wrote):
+        if replica_aliases() and (wrote or request.method not in ('GET', 'HEAD', 'OPTIONS')):
+            sticky_seconds = getattr(settings, 'REPLICA_STICKY_SECONDS', 5)
+            response.set_cookie(
+                STICKY_COOKIE,
+                str(time.time() + sticky_seconds),
+                max_age=sticky_seconds,
+                httponly=True,
+                samesite='Lax',
+            )
+        return response
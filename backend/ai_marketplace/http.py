@@ -0,0 +1,143 @@
+import functools
+import hashlib
+import re
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.db.models import Count, Max
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+from django.utils.text import compress_string
+
+try:
+    import brotli
+except ImportError:  # optional
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # optional
+    zstandard = None
+
+COMPRESSIBLE_TYPES = ('application/json', 'application/javascript', 'text/')
+
+# Codings that pad their output with random bytes against BREACH; zstd and
+# brotli frames have nowhere to put padding
+PADDED_ENCODINGS = ('gzip',)
+
+# Parameter names are case-insensitive: "q" or "Q"
+_accept_encoding_re = re.compile(r'\s*([\w*-]+)\s*(?:;\s*q\s*=\s*([0-9.]+))?\s*$', re.IGNORECASE)
+
+
+def _gzip(content):
+    # Random padding, as in Django's GZipMiddleware, mitigates BREACH
+    return compress_string(content, max_random_bytes=100)
+
+
+def available_encodings():
+    """
+    Supported content codings, most preferred first
+    """
+    encodings = {}
+    if zstandard is not None:
+        encodings['zstd'] = lambda content: zstandard.ZstdCompressor(level=3).compress(content)
+    if brotli is not None:
+        encodings['br'] = lambda content: brotli.compress(content, quality=5)
+    encodings['gzip'] = _gzip
+    return encodings
+
+
+def secret_response(view):
+    """
+    Mark a view's responses as carrying credentials, such as issued tokens.
+
+    CompressionMiddleware only applies padded codings to them, since a
+    secret compressed next to attacker-controlled input leaks through the
+    response size (BREACH).
+    """
+    if iscoroutinefunction(view):
+        async def wrapper(*args, **kwargs):
+            response = await view(*args, **kwargs)
+            response.contains_secrets = True
+            return response
+    else:
+        def wrapper(*args, **kwargs):
+            response = view(*args, **kwargs)
+            response.contains_secrets = True
+            return response
+    return functools.wraps(view)(wrapper)
+
+
+def negotiate_encoding(accept_encoding, encodings):
+    """
+    Best coding in ``encodings`` acceptable under an Accept-Encoding header,
+    or None; ties go to the server's preference order
+    """
+    weights = {}
+    for part in accept_encoding.split(','):
+        match = _accept_encoding_re.match(part)
+        if not match:
+            continue
+        try:
+            weights[match[1].lower()] = float(match[2]) if match[2] else 1.0
+        except ValueError:
+            continue
+
+    best, best_weight = None, 0.0
+    for encoding in encodings:
+        weight = weights.get(encoding, weights.get('*', 0.0))
+        if weight > best_weight:
+            best, best_weight = encoding, weight
+    return best
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    """
+    Compress responses of at least COMPRESSION_MIN_SIZE bytes with the best
+    coding the client accepts: zstd or brotli when installed, else gzip.
+    Responses marked with secret_response only get gzip, which is padded.
+
+    Streaming responses, such as the task event stream, are left alone so
+    every event is flushed as it is written.
+    """
+
+    def process_response(self, request, response):
+        if response.streaming or response.has_header('Content-Encoding'):
+            return response
+        content_type = response.get('Content-Type', '').split(';')[0].strip()
+        if not content_type.startswith(COMPRESSIBLE_TYPES):
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        if len(response.content) < getattr(settings, 'COMPRESSION_MIN_SIZE', 1024):
+            return response
+
+        encodings = available_encodings()
+        if getattr(response, 'contains_secrets', False):
+            encodings = {name: encode for name, encode in encodings.items() if name in PADDED_ENCODINGS}
+        encoding = negotiate_encoding(request.META.get('HTTP_ACCEPT_ENCODING', ''), encodings)
+        if encoding is None:
+            return response
+        compressed = encodings[encoding](response.content)
+        if len(compressed) >= len(response.content):
+            return response
+
+        response.content = compressed
+        response['Content-Length'] = str(len(compressed))
+        response['Content-Encoding'] = encoding
+        # The bytes differ per coding, so a strong validator no longer holds
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        return response
+
+
+def collection_etag(queryset, *parts):
+    """
+    ETag of a collection from its row count and latest updated_at, plus
+    any request ``parts`` (query parameters) that shape the response
+    """
+    stats = queryset.aggregate(latest=Max('updated_at'), count=Count('pk'))
+    latest = stats['latest'].isoformat() if stats['latest'] else ''
+    key = ':'.join([queryset.model._meta.label, latest, str(stats['count']), *map(str, parts)])
+    return hashlib.md5(key.encode()).hexdigest()
@@ -0,0 +1,135 @@
+import datetime
+import decimal
+import json
+from operator import itemgetter
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpResponse
+
+try:
+    import orjson
+except ImportError:  # optional; the stdlib encoder is used without it
+    orjson = None
+
+
+def _default(value):
+    # Decimals render as strings, like DRF's DecimalField
+    if isinstance(value, decimal.Decimal):
+        return str(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+class _JSONEncoder(DjangoJSONEncoder):
+    """
+    Renders times like orjson and DRF do, keeping microseconds that
+    DjangoJSONEncoder would truncate
+    """
+
+    def default(self, o):
+        if isinstance(o, datetime.datetime):
+            representation = o.isoformat()
+            if representation.endswith('+00:00'):
+                representation = representation[:-6] + 'Z'
+            return representation
+        if isinstance(o, datetime.time):
+            return o.isoformat()
+        return super().default(o)
+
+
+def dumps(data):
+    """
+    Encode to JSON bytes with orjson when installed
+    """
+    if orjson is not None:
+        return orjson.dumps(data, default=_default, option=orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(data, cls=_JSONEncoder).encode()
+
+
+class FastJsonResponse(HttpResponse):
+    """
+    JsonResponse rendered by dumps()
+    """
+
+    def __init__(self, data, **kwargs):
+        kwargs.setdefault('content_type', 'application/json')
+        super().__init__(content=dumps(data), **kwargs)
+
+
+def _row_builder(tree):
+    """
+    Compile a {key: column index | subtree} tree into a row -> dict function
+    """
+    leaf_keys = tuple(key for key, node in tree.items() if isinstance(node, int))
+    leaf_columns = [tree[key] for key in leaf_keys]
+    nested = [(key, _row_builder(node)) for key, node in tree.items() if not isinstance(node, int)]
+
+    if len(leaf_columns) == 1:
+        column = leaf_columns[0]
+        def leaves(row):
+            return ((leaf_keys[0], row[column]),)
+    else:
+        getter = itemgetter(*leaf_columns) if leaf_columns else (lambda row: ())
+        def leaves(row):
+            return zip(leaf_keys, getter(row))
+
+    if not nested:
+        return lambda row: dict(leaves(row))
+
+    def build(row):
+        result = dict(leaves(row))
+        for key, builder in nested:
+            result[key] = builder(row)
+        return result
+    return build
+
+
+class ValuesSerializer:
+    """
+    Read-only serializer for list and bulk endpoints.
+
+    Fetches rows with a single values_list() query, joining related
+    tables as needed, and maps each tuple to a dict with a field list
+    compiled once, skipping DRF's per-field, per-instance machinery.
+    ``fields`` are output paths; a dotted path such as ``'user.username'``
+    nests the related value under ``'user'``.
+    """
+
+    def __init__(self, model, fields):
+        self.model = model
+        self.fields = list(fields)
+        self.lookups = [field.replace('.', '__') for field in self.fields]
+
+        tree = {}
+        for column, field in enumerate(self.fields):
+            *parents, leaf = field.split('.')
+            node = tree
+            for parent in parents:
+                node = node.setdefault(parent, {})
+            node[leaf] = column
+        self._build = _row_builder(tree)
+
+    def serialize(self, queryset=None):
+        """
+        List of dicts for every row of ``queryset`` (all rows by default)
+        """
+        if queryset is None:
+            queryset = self.model.objects.all()
+        return list(map(self._build, queryset.values_list(*self.lookups)))
+
+    def get(self, queryset=None, **lookup):
+        """
+        Dict for the single row matching ``lookup``, or None
+        """
+        if queryset is None:
+            queryset = self.model.objects.all()
+        rows = queryset.filter(**lookup).values_list(*self.lookups)[:2]
+        if len(rows) > 1:
+            raise self.model.MultipleObjectsReturned()
+        return self._build(rows[0]) if rows else None
+
+
+def model_fields(model, exclude=()):
+    """
+    Attribute names of a model's concrete fields, as .values() returns them
+    """
+    return [field.attname for field in model._meta.concrete_fields if field.attname not in exclude]
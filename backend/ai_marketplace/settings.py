@@ -54,11 +54,13 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'ai_marketplace.http.CompressionMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'ai_marketplace.db.ReplicaStickinessMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -91,9 +93,29 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Reuse connections across requests instead of reconnecting every time
+        'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', '60')),
+        'CONN_HEALTH_CHECKS': True,
     }
 }
 
+# Read replicas, as comma-separated database names with the default engine
+# (e.g. two local SQLite files). Reads in views and commands marked with
+# ai_marketplace.db.read_from_replica go to a replica unless the client
+# wrote within the last REPLICA_STICKY_SECONDS.
+for index, name in enumerate(filter(None, os.getenv('DATABASE_REPLICAS', '').split(',')), 1):
+    DATABASES[f'replica_{index}'] = {
+        **DATABASES['default'],
+        'NAME': name.strip(),
+        'TEST': {'MIRROR': 'default'},
+    }
+
+REPLICA_DATABASES = [alias for alias in DATABASES if alias.startswith('replica_')]
+DATABASE_ROUTERS = ['ai_marketplace.db.ReplicaRouter']
+REPLICA_STICKY_SECONDS = int(os.getenv('REPLICA_STICKY_SECONDS', '5'))
+# Upper bound on replication lag; incremental jobs reading replicas rewind by it
+REPLICA_MAX_LAG_SECONDS = int(os.getenv('REPLICA_MAX_LAG_SECONDS', '30'))
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
@@ -131,17 +153,69 @@ USE_TZ = True
 
 STATIC_URL = 'static/'
 
+# Uploaded files (task submissions)
+MEDIA_URL = 'media/'
+MEDIA_ROOT = BASE_DIR / 'media'
+
 # Blockchain Configuration
 BLOCKCHAIN_CONFIG = {
     'NETWORK': 'sepolia',
     'RPC_URL': os.getenv('SEPOLIA_RPC_URL', ''),
     'CONTRACT_ADDRESS': os.getenv('TASK_MARKETPLACE_CONTRACT', ''),
+    'RPC_BATCH_SIZE': int(os.getenv('RPC_BATCH_SIZE', '100')),
+    'RPC_MAX_CONCURRENCY': int(os.getenv('RPC_MAX_CONCURRENCY', '4')),
+    'RPC_MAX_RETRIES': int(os.getenv('RPC_MAX_RETRIES', '3')),
+    'RPC_TIMEOUT': int(os.getenv('RPC_TIMEOUT', '30')),
 }
 
 # AI Model Configuration
 AI_MODEL_CONFIG = {
     'FREELANCER_RECOMMENDATION_MODEL_PATH': 'ai_models/models/freelancer_recommendation.h5',
     'WORK_VALIDATION_MODEL_PATH': 'ai_models/models/work_validation_model.pkl',
+    # 'hashed' uses the stateless HashedSkillEncoder over the feature store and
+    # encodes new skills without retraining; 'tfidf' is the legacy ORM path
+    # that fits a vocabulary per training run. The shipped model is TF-IDF;
+    # switch to 'hashed' only once a hashed model (skill_idf.npy) is trained
+    'SKILL_ENCODER': os.getenv('SKILL_ENCODER', 'tfidf'),
+    'SKILL_HASH_FEATURES': 2 ** 12,
+    # Recommendation snapshots: ranking length stored and maximum age served
+    'SNAPSHOT_SIZE': 20,
+    'SNAPSHOT_MAX_AGE': 3600,
+    'SNAPSHOT_BATCH_SIZE': 100,
+    # Freelancer index shards scored by separate worker processes: an integer
+    # or 'auto' for one per core; 0 or 1 scores in-process. Pools smaller than
+    # SHARD_MIN_FREELANCERS are always scored in-process
+    'RECOMMENDATION_SHARDS': os.getenv('RECOMMENDATION_SHARDS', '0'),
+    'SHARD_MIN_FREELANCERS': int(os.getenv('SHARD_MIN_FREELANCERS', 5000)),
+    # Versioned columnar features shared by training and serving
+    'FEATURE_STORE_DIR': BASE_DIR / 'ai_models' / 'feature_store',
+    'FEATURE_STORE_KEEP_VERSIONS': 3,
+    # Writes to freelancers and tasks queue a background refresh, run at most
+    # once per this many seconds; serving never materializes the store itself
+    'FEATURE_STORE_REFRESH_INTERVAL': 10,
+    # Seconds without a heartbeat before a running training job is considered dead
+    'TRAINING_JOB_TIMEOUT': 3600,
+    # Seconds to wait after a failed training job before queueing another
+    'TRAINING_RETRY_COOLDOWN': 300,
+    # Training logs older than this are rolled up and archived by archive_training_logs
+    'TRAINING_LOG_RETENTION_DAYS': int(os.getenv('TRAINING_LOG_RETENTION_DAYS', 30)),
+    'TRAINING_LOG_ARCHIVE_DIR': BASE_DIR / 'ai_models' / 'training_log_archive',
+    # Buffered training log capture: rows per bulk INSERT and maximum seconds buffered
+    'TRAINING_LOG_BATCH_SIZE': 500,
+    'TRAINING_LOG_FLUSH_INTERVAL': 5.0,
+    # Registered model versions: seconds between routing re-reads, seconds per
+    # metrics window, and shadow requests queued before shadow scoring is shed
+    'MODEL_ROUTING_TTL': 30,
+    'MODEL_METRICS_FLUSH_INTERVAL': 60,
+    'SHADOW_MAX_PENDING': 64,
+    # Load the serving models and score a synthetic task when a worker
+    # boots; /ready answers 503 until that finishes
+    'WARM_UP_ON_BOOT': os.getenv('AI_WARM_UP_ON_BOOT', 'false').lower() in ('1', 'true', 'yes'),
+    # Batch assignment (assign_tasks): active tasks per freelancer, top
+    # recommendations considered per task, and lowest match score accepted
+    'ASSIGNMENT_MAX_ACTIVE_TASKS': 3,
+    'ASSIGNMENT_CANDIDATES': 20,
+    'ASSIGNMENT_MIN_SCORE': 0.0,
 }
 
 # CORS Configuration
@@ -162,11 +236,15 @@ CORS_ALLOW_METHODS = [
 # Django Rest Framework Configuration
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'users.authentication.CachedJWTAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
-    ]
+    ],
+    # Reverse proxies in front of the app. Client addresses used for
+    # throttling come from X-Forwarded-For only when this is above 0;
+    # otherwise everyone behind a proxy would share its address
+    'NUM_PROXIES': int(os.environ.get('NUM_PROXIES', 0)),
 }
 
 # Simple JWT Configuration
@@ -175,7 +253,8 @@ SIMPLE_JWT = {
     'REFRESH_TOKEN_LIFETIME': timedelta(days=1),
     'ROTATE_REFRESH_TOKENS': True,
     'BLACKLIST_AFTER_ROTATION': True,
-    'UPDATE_LAST_LOGIN': True,
+    # Avoid a user row write on every token obtain
+    'UPDATE_LAST_LOGIN': False,
 
     'ALGORITHM': 'HS256',
     'SIGNING_KEY': SECRET_KEY,
@@ -190,6 +269,43 @@ SIMPLE_JWT = {
     'USER_ID_FIELD': 'id',
     'USER_ID_CLAIM': 'user_id',
     'USER_AUTHENTICATION_RULE': 'rest_framework_simplejwt.authentication.default_user_authentication_rule',
+
+    'TOKEN_OBTAIN_SERIALIZER': 'users.serializers.VersionedTokenObtainPairSerializer',
+    'TOKEN_USER_CLASS': 'users.authentication.ClaimsUser',
+}
+
+# Cache shared by all workers when REDIS_URL is set, per process otherwise
+if os.environ.get('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ['REDIS_URL'],
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+# Users resolved by CachedJWTAuthentication are kept this many seconds.
+# Revocation (password change, deactivation) evicts the user only from
+# the cache of the process that saved it: with the per-process
+# LocMemCache, other workers keep accepting revoked tokens for up to
+# AUTH_USER_CACHE_TTL. Set REDIS_URL when running more than one worker.
+AUTH_USER_CACHE = 'default'
+AUTH_USER_CACHE_TTL = int(os.environ.get('AUTH_USER_CACHE_TTL', 60))
+
+# Login: password hashing pool size, logins allowed to wait for it, and
+# token-bucket throttles per client IP and per username
+LOGIN_CONFIG = {
+    'HASH_WORKERS': int(os.environ.get('LOGIN_HASH_WORKERS', 2)),
+    'HASH_QUEUE_SIZE': int(os.environ.get('LOGIN_HASH_QUEUE_SIZE', 8)),
+    'IP_BURST': 20,
+    'IP_PER_MINUTE': 10,
+    'USERNAME_BURST': 5,
+    'USERNAME_PER_MINUTE': 2,
 }
 
 # Settings modifications for custom user model and data generation
@@ -199,3 +315,24 @@ AUTH_USER_MODEL = 'users.CustomUser'
 # https://docs.djangoproject.com/en/5.1/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+# Smallest response body worth compressing, in bytes
+COMPRESSION_MIN_SIZE = 1024
+
+# Most tasks accepted by one bulk task creation request
+TASK_BULK_CREATE_LIMIT = 1000
+
+# Task event stream: events per query, seconds between polls of the event
+# log, how long the newest events are held back so commits can settle,
+# idle keep-alive interval and stream lifetime before the client reconnects.
+# SETTLE_SECONDS counts from an event's created_at, stamped at insert, not
+# at commit: an event written by a transaction that stays open longer than
+# that commits behind cursors already handed out and is never delivered to
+# them. Keep transactions that record events shorter than SETTLE_SECONDS.
+TASK_EVENT_CONFIG = {
+    'PAGE_SIZE': 100,
+    'POLL_INTERVAL': 1.0,
+    'SETTLE_SECONDS': 1.0,
+    'HEARTBEAT_SECONDS': 15,
+    'STREAM_MAX_SECONDS': 300,
+}
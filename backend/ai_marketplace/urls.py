@@ -17,8 +17,13 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path, include
 
+from ai_models.views import ReadinessView
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/tasks/', include('tasks.urls')),
+    path('api/users/', include('users.urls')),
+    path('api/ai/', include('ai_models.urls')),
+    path('ready', ReadinessView.as_view(), name='ready'),
     # Add other app URLs as needed
 ]
@@ -1,5 +1,8 @@
 from django.contrib import admin
-from .models import AIModelTrainingLog, FreelancerProfile, AIModel, AIModelVersion
+from .models import (
+    AIModelTrainingLog, AIModelTrainingRollup, FreelancerProfile, AIModel, AIModelVersion,
+    AIModelVersionMetrics, TrainingJob, RecommendationSnapshot
+)
 
 # Register your models here.
 
@@ -8,6 +11,14 @@ class AIModelTrainingLogAdmin(admin.ModelAdmin):
     list_display = ('model_type', 'training_accuracy', 'captured_at', 'is_used_for_training')
     list_filter = ('model_type', 'captured_at', 'is_used_for_training')
     search_fields = ('model_version',)
+    ordering = ('-captured_at',)
+
+@admin.register(AIModelTrainingRollup)
+class AIModelTrainingRollupAdmin(admin.ModelAdmin):
+    list_display = ('model_type', 'day', 'row_count', 'run_count', 'avg_accuracy', 'training_data_size')
+    list_filter = ('model_type',)
+    date_hierarchy = 'day'
+    ordering = ('-day',)
 
 @admin.register(FreelancerProfile)
 class FreelancerProfileAdmin(admin.ModelAdmin):
@@ -21,6 +32,23 @@ class AIModelAdmin(admin.ModelAdmin):
 
 @admin.register(AIModelVersion)
 class AIModelVersionAdmin(admin.ModelAdmin):
-    list_display = ('model', 'version', 'created_at')
-    list_filter = ('model', 'created_at')
+    list_display = ('model', 'version', 'role', 'traffic_percent', 'created_at')
+    list_filter = ('model', 'role', 'created_at')
     search_fields = ('version',)
+
+@admin.register(AIModelVersionMetrics)
+class AIModelVersionMetricsAdmin(admin.ModelAdmin):
+    list_display = ('model_type', 'version_label', 'role', 'window_start', 'requests', 'errors')
+    list_filter = ('model_type', 'role')
+    ordering = ('-window_start',)
+
+@admin.register(TrainingJob)
+class TrainingJobAdmin(admin.ModelAdmin):
+    list_display = ('model_type', 'status', 'progress', 'message', 'created_at', 'finished_at')
+    list_filter = ('model_type', 'status')
+    readonly_fields = ('progress', 'message', 'error', 'started_at', 'finished_at', 'heartbeat_at')
+
+@admin.register(RecommendationSnapshot)
+class RecommendationSnapshotAdmin(admin.ModelAdmin):
+    list_display = ('task', 'model_version', 'computed_at')
+    list_select_related = ('task',)
@@ -1,6 +1,17 @@
 from django.apps import AppConfig
+from django.conf import settings
 
 
 class AiModelsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'ai_models'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+
+        # Warm each serving worker before the load balancer routes to it
+        # (see /ready); management commands never pay for it
+        from .warmup import serving_process, start_warm_up
+
+        if settings.AI_MODEL_CONFIG.get('WARM_UP_ON_BOOT') and serving_process():
+            start_warm_up()
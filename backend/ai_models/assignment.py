@@ -0,0 +1,198 @@
+import logging
+import time
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from tasks.events import record_status_changed
+from tasks.models import Task
+
+logger = logging.getLogger(__name__)
+
+# Statuses in which a task counts against its freelancer's workload
+ACTIVE_STATUSES = ('ASSIGNED', 'IN_PROGRESS', 'SUBMITTED')
+
+
+def _config(key, default):
+    return settings.AI_MODEL_CONFIG.get(key, default)
+
+
+def open_tasks():
+    """
+    Tasks waiting for a freelancer
+    """
+    return Task.objects.filter(status='CREATED', assigned_freelancer__isnull=True)
+
+
+def remaining_capacity(user_ids, max_active):
+    """
+    Further tasks each freelancer can take before reaching ``max_active``
+    """
+    active = dict(
+        Task.objects.filter(assigned_freelancer_id__in=user_ids, status__in=ACTIVE_STATUSES)
+        .values('assigned_freelancer_id')
+        .annotate(count=Count('id'))
+        .values_list('assigned_freelancer_id', 'count')
+    )
+    return [max(max_active - active.get(user_id, 0), 0) for user_id in user_ids]
+
+
+def candidate_scores(tasks, candidates, min_score):
+    """
+    Sparse task x freelancer score matrix from each task's top ``candidates``
+    recommendations, as (rows, columns, scores, freelancer user ids,
+    unscored task count).
+
+    Pairs below ``min_score`` and freelancers recommended for their own
+    tasks are left out, as are tasks no trained model scored: their
+    fallback or empty rankings are not match scores.
+    """
+    import numpy as np
+    from .recommendation import FreelancerRecommendationEngine
+
+    scored = FreelancerRecommendationEngine.score_freelancers_bulk(tasks, top_n=candidates, fallback=False)
+    columns = {}
+    rows, cols, scores = [], [], []
+    unscored = 0
+    for row, (task, recommendations) in enumerate(zip(tasks, scored)):
+        if recommendations is None:
+            unscored += 1
+            continue
+        for rec in recommendations:
+            user_id = rec['freelancer'].user_id
+            if user_id == task.creator_id or rec['match_score'] < min_score:
+                continue
+            rows.append(row)
+            cols.append(columns.setdefault(user_id, len(columns)))
+            scores.append(rec['match_score'])
+    rows, cols, scores = np.array(rows, dtype=int), np.array(cols, dtype=int), np.array(scores, dtype=float)
+    return rows, cols, scores, list(columns), unscored
+
+
+def solve_assignment(n_tasks, rows, cols, scores, capacity):
+    """
+    Capacity-constrained assignment over the candidate pairs: freelancer
+    ``j`` takes at most ``capacity[j]`` tasks and every task at most one
+    freelancer. Assigns as many tasks as possible, then maximizes the total
+    match score. Returns (task row, freelancer column) pairs.
+
+    Each freelancer's column is repeated once per free slot, and each task
+    gets a column of its own meaning "unassigned", costing more than any
+    set of matches could save. A minimum weight full matching over these
+    sparse edges then always exists; memory and time follow the number of
+    candidate pairs, not tasks x freelancers.
+    """
+    import numpy as np
+    from scipy.sparse import csr_matrix
+    from scipy.sparse.csgraph import min_weight_full_bipartite_matching
+
+    capacity = np.asarray(capacity, dtype=int)
+    # Slots beyond the number of tasks listing a freelancer can never be used
+    slots = np.minimum(capacity, np.bincount(cols, minlength=len(capacity)))
+    usable = slots[cols] > 0 if len(cols) else np.zeros(0, dtype=bool)
+    rows, cols, scores = rows[usable], cols[usable], scores[usable]
+    if not len(rows):
+        return []
+
+    task_rows, task_index = np.unique(rows, return_inverse=True)
+    n_rows = len(task_rows)
+    slot_owner = np.repeat(np.arange(len(capacity)), slots)
+    first_slot = np.cumsum(slots) - slots
+
+    # One edge per candidate pair and free slot of its freelancer
+    per_pair = slots[cols]
+    pair_start = np.cumsum(per_pair) - per_pair
+    edge_rows = np.repeat(task_index, per_pair)
+    edge_slots = np.repeat(first_slot[cols], per_pair) + np.arange(per_pair.sum()) - np.repeat(pair_start, per_pair)
+    # Costs stay at or above 1, as csgraph drops zero-weight edges; leaving
+    # a task unassigned costs more than rerouting every other task could save
+    edge_costs = np.repeat(1 + scores.max() - scores, per_pair)
+    unassigned_cost = (n_rows + 1) * (2 + scores.max() - scores.min())
+
+    graph = csr_matrix(
+        (
+            np.concatenate([edge_costs, np.full(n_rows, unassigned_cost)]),
+            (
+                np.concatenate([edge_rows, np.arange(n_rows)]),
+                np.concatenate([edge_slots, len(slot_owner) + np.arange(n_rows)]),
+            ),
+        ),
+        shape=(n_rows, len(slot_owner) + n_rows),
+    )
+    matched_rows, matched_columns = min_weight_full_bipartite_matching(graph)
+
+    keep = matched_columns < len(slot_owner)
+    return list(zip(task_rows[matched_rows[keep]].tolist(), slot_owner[matched_columns[keep]].tolist()))
+
+
+def assign_open_tasks(tasks=None, max_active=None, candidates=None, min_score=None, dry_run=False):
+    """
+    Match open tasks to freelancers in one global pass and save the result.
+
+    Recommendations score each task in isolation, so assigning every task
+    its top match piles work onto the same few freelancers. This solves
+    the whole batch at once, capping each freelancer at ``max_active``
+    active tasks (counting the ones already assigned). Matched tasks move
+    to ASSIGNED in a single bulk update; tasks claimed by someone else
+    in the meantime are skipped, and so are tasks whose model version
+    failed to score them. Returns run statistics.
+    """
+    from .recommendation import FreelancerRecommendationEngine
+
+    max_active = max_active if max_active is not None else _config('ASSIGNMENT_MAX_ACTIVE_TASKS', 3)
+    candidates = candidates or _config('ASSIGNMENT_CANDIDATES', 20)
+    min_score = min_score if min_score is not None else _config('ASSIGNMENT_MIN_SCORE', 0.0)
+    if FreelancerRecommendationEngine.model_status() != 'ready':
+        # The fallback ranking is one ORM pass per task; not for batches
+        raise ValueError('No trained recommendation model to score the tasks')
+
+    started = time.monotonic()
+    queryset = open_tasks() if tasks is None else tasks.filter(status='CREATED', assigned_freelancer__isnull=True)
+    tasks = list(queryset.order_by('created_at', 'id'))
+    stats = {'tasks': len(tasks), 'assigned': 0, 'skipped': 0, 'freelancers': 0, 'mean_score': None}
+
+    rows, cols, scores, user_ids, stats['unscored'] = candidate_scores(tasks, candidates, min_score)
+    if stats['unscored']:
+        logger.warning(f"{stats['unscored']} open tasks could not be scored and are left unassigned")
+    scored_at = time.monotonic()
+    capacity = remaining_capacity(user_ids, max_active)
+    pairs = solve_assignment(len(tasks), rows, cols, scores, capacity)
+    solved_at = time.monotonic()
+
+    score_of = dict(zip(zip(rows.tolist(), cols.tolist()), scores.tolist()))
+    assignments = {tasks[row].id: (user_ids[col], score_of[row, col]) for row, col in pairs}
+
+    if not dry_run and assignments:
+        with transaction.atomic():
+            still_open = set(
+                open_tasks().select_for_update().filter(id__in=list(assignments)).values_list('id', flat=True)
+            )
+            now = timezone.now()
+            updated = []
+            for task in tasks:
+                if task.id in still_open:
+                    task.assigned_freelancer_id = assignments[task.id][0]
+                    task.status = 'ASSIGNED'
+                    # bulk_update skips auto_now, which the collection ETags rely on
+                    task.updated_at = now
+                    updated.append(task)
+            Task.objects.bulk_update(updated, ['assigned_freelancer', 'status', 'updated_at'], batch_size=500)
+            record_status_changed(updated, 'CREATED')
+        stats['skipped'] = len(assignments) - len(updated)
+        assignments = {task.id: assignments[task.id] for task in updated}
+
+    stats.update(
+        assigned=len(assignments),
+        freelancers=len({user_id for user_id, _ in assignments.values()}),
+        mean_score=sum(score for _, score in assignments.values()) / len(assignments) if assignments else None,
+        scoring_seconds=round(scored_at - started, 3),
+        solve_seconds=round(solved_at - scored_at, 3),
+        assignments=assignments,
+    )
+    logger.info(
+        f"Assigned {stats['assigned']} of {stats['tasks']} open tasks to {stats['freelancers']} freelancers"
+        f"{' (dry run)' if dry_run else ''}"
+    )
+    return stats
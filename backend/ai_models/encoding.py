@@ -0,0 +1,112 @@
+import zlib
+from functools import lru_cache
+
+import numpy as np
+from scipy.sparse import csr_matrix
+
+DEFAULT_N_FEATURES = 2 ** 12
+
+
+@lru_cache(maxsize=65536)
+def _hash_skill(skill):
+    """
+    Hash a normalized skill name to a stable 32-bit value.
+
+    crc32 is used rather than hash() because it is identical across
+    processes and interpreter runs.
+    """
+    return zlib.crc32(skill.strip().lower().encode('utf-8'))
+
+
+class HashedSkillEncoder:
+    """
+    Stateless skill encoder based on feature hashing.
+
+    Each skill is hashed into one of ``n_features`` signed buckets and
+    weighted by a per-bucket IDF value kept in a float32 array. There is no
+    vocabulary: skills first seen after training encode immediately, with the
+    IDF of a never-seen bucket.
+    """
+
+    def __init__(self, n_features=DEFAULT_N_FEATURES, idf=None):
+        self.n_features = n_features
+        self.idf = np.ones(n_features, dtype=np.float32) if idf is None else idf
+
+    def _buckets(self, skill):
+        h = _hash_skill(skill)
+        # The top bit picks a sign so colliding skills tend to cancel out
+        return h % self.n_features, (-1.0 if h & 0x80000000 else 1.0)
+
+    def transform_raw(self, skill_lists):
+        """
+        Encode lists of skills as signed bucket counts, without IDF weighting.
+
+        Raw encodings don't depend on any fitted state, so they can be
+        materialized once (see ai_models.feature_store) and weighted later.
+        """
+        rows, cols, values = [], [], []
+        for row, skills in enumerate(skill_lists):
+            for skill in skills:
+                bucket, sign = self._buckets(skill)
+                rows.append(row)
+                cols.append(bucket)
+                values.append(sign)
+
+        matrix = csr_matrix(
+            (np.asarray(values, dtype=np.float32),
+             (np.asarray(rows, dtype=np.int64), np.asarray(cols, dtype=np.int64))),
+            shape=(len(skill_lists), self.n_features),
+            dtype=np.float32,
+        )
+        matrix.sum_duplicates()
+        matrix.eliminate_zeros()
+        return matrix
+
+    def weight(self, raw):
+        """
+        Apply IDF weights to raw encodings and L2-normalize each row
+        """
+        matrix = raw.astype(np.float32, copy=True)
+        matrix.data *= self.idf[matrix.indices]
+
+        norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+        norms[norms == 0] = 1.0
+        matrix.data /= np.repeat(norms, np.diff(matrix.indptr)).astype(np.float32)
+        return matrix
+
+    def fit_raw(self, raw):
+        """
+        Compute smoothed IDF weights per bucket from raw encodings
+        """
+        document_frequency = np.bincount(raw.indices, minlength=self.n_features)
+        n_documents = raw.shape[0]
+        # Same smoothing as TfidfVectorizer(smooth_idf=True)
+        self.idf = (np.log((1 + n_documents) / (1 + document_frequency)) + 1).astype(np.float32)
+        return self
+
+    def fit(self, skill_lists):
+        """
+        Compute smoothed IDF weights per bucket from lists of skills
+        """
+        return self.fit_raw(self.transform_raw(skill_lists))
+
+    def transform(self, skill_lists):
+        """
+        Encode lists of skills as an L2-normalized sparse matrix
+        """
+        return self.weight(self.transform_raw(skill_lists))
+
+    def fit_transform(self, skill_lists):
+        raw = self.transform_raw(skill_lists)
+        return self.fit_raw(raw).weight(raw)
+
+    def save(self, path):
+        """
+        Persist the IDF weights; this array is the encoder's only state
+        """
+        np.save(path, self.idf)
+
+    @classmethod
+    def load(cls, path):
+        idf = np.load(path)
+        return cls(n_features=len(idf), idf=idf)
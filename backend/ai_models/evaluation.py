@@ -0,0 +1,202 @@
+import json
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+import numpy as np
+from scipy.sparse import csr_matrix
+
+from ai_models.encoding import HashedSkillEncoder
+from ai_models.feature_store import FeatureStore
+from ai_models.models import AIModelTrainingLog
+from ai_models.recommendation import TRAINING_BLOCK_SIZE, FreelancerRecommendationEngine
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_KS = (5, 10, 20)
+
+# Rankers compared on every fold: the trained model and raw skill similarity
+STRATEGIES = ('model', 'similarity')
+
+
+def ranking_metrics(scores, relevance, ks):
+    """
+    NDCG@k, recall@k and MAP@k summed over the rows of a score block.
+
+    ``scores`` and ``relevance`` are (tasks, freelancers) arrays; rows
+    without any relevant freelancer must be filtered out beforehand.
+    Returns {metric_name: sum over rows}.
+    """
+    max_k = min(max(ks), scores.shape[1])
+    n_relevant = relevance.sum(axis=1)
+
+    # Only the top max_k positions matter: partition, then sort that slice
+    top = np.argpartition(-scores, max_k - 1, axis=1)[:, :max_k]
+    order = np.argsort(-np.take_along_axis(scores, top, axis=1), axis=1, kind='stable')
+    top = np.take_along_axis(top, order, axis=1)
+    gains = np.take_along_axis(relevance, top, axis=1).astype(np.float64)
+
+    discounts = 1.0 / np.log2(np.arange(2, max_k + 2))
+    ideal_cumulative = np.cumsum(discounts)
+    hits_cumulative = np.cumsum(gains, axis=1)
+    precision_at = hits_cumulative / np.arange(1, max_k + 1)
+
+    totals = {}
+    for k in ks:
+        k_eff = min(k, max_k)
+        dcg = (gains[:, :k_eff] * discounts[:k_eff]).sum(axis=1)
+        idcg = ideal_cumulative[np.minimum(n_relevant, k_eff) - 1]
+        totals[f'ndcg@{k}'] = float((dcg / idcg).sum())
+        totals[f'recall@{k}'] = float((hits_cumulative[:, k_eff - 1] / n_relevant).sum())
+        average_precision = (precision_at[:, :k_eff] * gains[:, :k_eff]).sum(axis=1) / np.minimum(n_relevant, k_eff)
+        totals[f'map@{k}'] = float(average_precision.sum())
+    return totals
+
+
+def _evaluate_fold(fold, train_index, test_index, task_raw, freelancer_raw, performance, relevance, ks, n_features):
+    """
+    Fit on the training tasks, rank every freelancer for each held-out task
+    and return the summed metrics per strategy
+    """
+    engine = FreelancerRecommendationEngine
+    encoder = HashedSkillEncoder(n_features=n_features).fit_raw(task_raw[train_index])
+    X, y = engine._training_pairs(encoder, task_raw[train_index], freelancer_raw, performance)
+    model, scaler = engine._fit_model(X, y)
+
+    freelancer_vectors = encoder.weight(freelancer_raw).T.tocsr()
+    n_freelancers = freelancer_raw.shape[0]
+    totals = {strategy: {} for strategy in STRATEGIES}
+
+    for start in range(0, len(test_index), TRAINING_BLOCK_SIZE):
+        block = test_index[start:start + TRAINING_BLOCK_SIZE]
+        similarities, skill_matches = engine._skill_matrices(
+            encoder, task_raw[block], freelancer_raw, freelancer_vectors
+        )
+        X_block = engine._pair_features(
+            similarities.ravel(), np.tile(performance, len(block)), skill_matches.ravel()
+        )
+        model_scores = model.predict_proba(scaler.transform(X_block))[:, 1].reshape(len(block), n_freelancers)
+        block_relevance = relevance[block].toarray().astype(bool)
+
+        for strategy, scores in (('model', model_scores), ('similarity', similarities)):
+            for name, value in ranking_metrics(scores, block_relevance, ks).items():
+                totals[strategy][name] = totals[strategy].get(name, 0.0) + value
+
+    return {
+        'fold': fold,
+        'tasks': len(test_index),
+        'metrics': {
+            strategy: {name: value / len(test_index) for name, value in metrics.items()}
+            for strategy, metrics in totals.items()
+        },
+    }
+
+
+def _outcome_matrix(feature_set):
+    """
+    Binary (task, freelancer) matrix of approved submissions, aligned with
+    the feature store's row order
+    """
+    from tasks.models import TaskSubmission
+
+    task_ids = np.asarray(feature_set.tasks['task_id'])
+    user_ids = np.asarray(feature_set.freelancers['user_id'])
+    user_order = np.argsort(user_ids)
+
+    pairs = np.array(
+        TaskSubmission.objects.filter(status='APPROVED')
+        .values_list('task_id', 'freelancer_id').distinct(),
+        dtype=np.int64,
+    ).reshape(-1, 2)
+
+    # Task ids are stored sorted; user ids are looked up through a sort
+    task_pos = np.searchsorted(task_ids, pairs[:, 0])
+    user_pos = np.searchsorted(user_ids, pairs[:, 1], sorter=user_order)
+    task_pos = np.minimum(task_pos, len(task_ids) - 1)
+    user_pos = np.minimum(user_pos, len(user_ids) - 1)
+    known = (task_ids[task_pos] == pairs[:, 0]) & (user_ids[user_order[user_pos]] == pairs[:, 1])
+
+    return csr_matrix(
+        (np.ones(known.sum(), dtype=np.int8), (task_pos[known], user_order[user_pos[known]])),
+        shape=(len(task_ids), len(user_ids)),
+    )
+
+
+def _summarize(fold_results):
+    summary = {}
+    for strategy in STRATEGIES:
+        names = fold_results[0]['metrics'][strategy]
+        weights = np.array([result['tasks'] for result in fold_results], dtype=np.float64)
+        summary[strategy] = {}
+        for name in names:
+            values = np.array([result['metrics'][strategy][name] for result in fold_results])
+            summary[strategy][name] = {
+                'mean': float(np.average(values, weights=weights)),
+                'std': float(values.std(ddof=1)) if len(values) > 1 else 0.0,
+            }
+    return summary
+
+
+def evaluate_recommendation_model(folds=5, ks=DEFAULT_KS, workers=None, seed=42, log=True):
+    """
+    K-fold offline evaluation against historical submission outcomes.
+
+    Tasks with at least one approved submission are split into folds. For
+    each fold a model is fitted on the remaining tasks exactly as in
+    training, and every freelancer is ranked for each held-out task. A
+    freelancer whose submission was approved counts as relevant. Folds
+    run in parallel worker processes.
+    """
+    feature_set = FeatureStore().refresh()
+    task_raw = feature_set.tasks.skills
+    freelancer_raw = feature_set.freelancers.skills
+    performance = np.asarray(feature_set.freelancers['performance_score'], dtype=np.float64)
+    relevance = _outcome_matrix(feature_set)
+
+    evaluable = np.flatnonzero(np.diff(relevance.indptr) > 0)
+    if len(evaluable) < folds or not freelancer_raw.shape[0]:
+        raise ValueError(
+            f"Not enough outcomes to evaluate: {len(evaluable)} tasks with approved "
+            f"submissions for {folds} folds"
+        )
+
+    rng = np.random.default_rng(seed)
+    assignment = rng.permutation(len(evaluable)) % folds
+    all_tasks = np.arange(task_raw.shape[0])
+    jobs = []
+    for fold in range(folds):
+        test_index = np.sort(evaluable[assignment == fold])
+        # Train on every other task, including ones without outcomes
+        train_index = np.setdiff1d(all_tasks, test_index, assume_unique=True)
+        jobs.append((
+            fold, train_index, test_index, task_raw, freelancer_raw, performance,
+            relevance, tuple(ks), feature_set.n_features,
+        ))
+
+    workers = workers or min(folds, os.cpu_count() or 1)
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers, initializer=django.setup) as executor:
+            fold_results = list(executor.map(_evaluate_fold, *zip(*jobs)))
+    else:
+        fold_results = [_evaluate_fold(*job) for job in jobs]
+
+    result = {
+        'feature_store_version': feature_set.version,
+        'folds': folds,
+        'seed': seed,
+        'tasks_evaluated': int(len(evaluable)),
+        'freelancers': int(freelancer_raw.shape[0]),
+        'summary': _summarize(fold_results),
+        'per_fold': fold_results,
+    }
+
+    if log:
+        AIModelTrainingLog.objects.create(
+            model_type='FREELANCER_REC',
+            model_version=FreelancerRecommendationEngine.model_version(),
+            training_data=json.dumps({'evaluation': result}),
+            is_used_for_training=False,
+        )
+
+    return result
@@ -0,0 +1,369 @@
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+import numpy as np
+from scipy.sparse import csr_matrix, vstack
+from django.conf import settings
+from django.db import connections, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from ai_marketplace.db import replicas_in_use
+from ai_models.encoding import HashedSkillEncoder
+
+logger = logging.getLogger(__name__)
+
+# Column schemas shared by training and serving
+FREELANCER_COLUMNS = {
+    'profile_id': np.int64,
+    'user_id': np.int64,
+    'performance_score': np.float32,
+    'reputation_score': np.float32,
+    'total_tasks_completed': np.float32,
+    'approval_rate': np.float32,
+}
+TASK_COLUMNS = {
+    'task_id': np.int64,
+    'budget': np.float32,
+    'description_length': np.float32,
+    'skills_count': np.float32,
+    'created_at': np.float64,
+}
+
+# Feature vector of a (task, freelancer, submission time) triple, as logged
+# by generate_and_train_data and scored by WorkValidationView
+SUBMISSION_FEATURES = ['budget', 'description_length', 'reputation_score', 'skills_count', 'submitted_at']
+
+
+def task_row(task):
+    return {
+        'task_id': task.id,
+        'budget': float(task.budget),
+        'description_length': len(task.description),
+        'skills_count': len(task.skills_required),
+        'created_at': task.created_at.timestamp(),
+    }
+
+
+def freelancer_row(profile):
+    user = profile.user
+    return {
+        'profile_id': profile.id,
+        'user_id': user.id,
+        'performance_score': profile.performance_score,
+        'reputation_score': user.reputation_score,
+        'total_tasks_completed': user.total_tasks_completed,
+        'approval_rate': user.approval_rate,
+    }
+
+
+def submission_features(task, freelancer, submitted_at):
+    """
+    Build the SUBMISSION_FEATURES vector from a task, its freelancer user and a time
+    """
+    row = task_row(task)
+    return [
+        row['budget'],
+        row['description_length'],
+        freelancer.reputation_score,
+        row['skills_count'],
+        submitted_at.timestamp(),
+    ]
+
+
+class EntityColumns:
+    """
+    Column arrays for one entity type plus its raw hashed skill matrix
+    """
+
+    def __init__(self, columns, skills):
+        self.columns = columns
+        self.skills = skills
+
+    def __getitem__(self, name):
+        return self.columns[name]
+
+    def __len__(self):
+        return self.skills.shape[0]
+
+    def save(self, path):
+        os.makedirs(path, exist_ok=True)
+        for name, values in self.columns.items():
+            np.save(os.path.join(path, f'{name}.npy'), values)
+        np.save(os.path.join(path, 'skills_indptr.npy'), self.skills.indptr)
+        np.save(os.path.join(path, 'skills_indices.npy'), self.skills.indices)
+        np.save(os.path.join(path, 'skills_data.npy'), self.skills.data)
+
+    @classmethod
+    def load(cls, path, schema, n_features):
+        columns = {
+            name: np.load(os.path.join(path, f'{name}.npy'), mmap_mode='r')
+            for name in schema
+        }
+        skills = csr_matrix(
+            (
+                np.load(os.path.join(path, 'skills_data.npy')),
+                np.load(os.path.join(path, 'skills_indices.npy')),
+                np.load(os.path.join(path, 'skills_indptr.npy')),
+            ),
+            shape=(len(columns[next(iter(schema))]), n_features),
+        )
+        return cls(columns, skills)
+
+    @classmethod
+    def from_rows(cls, rows, skill_lists, schema, encoder):
+        columns = {
+            name: np.array([row[name] for row in rows], dtype=dtype)
+            for name, dtype in schema.items()
+        }
+        return cls(columns, encoder.transform_raw(skill_lists))
+
+    def sorted_by(self, key):
+        order = np.argsort(self[key], kind='stable')
+        return EntityColumns(
+            {name: np.asarray(values)[order] for name, values in self.columns.items()},
+            self.skills[order],
+        )
+
+    def upsert(self, other, key, removed_ids):
+        """
+        Replace rows whose key is in ``other`` or ``removed_ids``, keeping key order
+        """
+        drop_ids = np.concatenate([other[key], np.asarray(removed_ids, dtype=np.int64)])
+        keep = ~np.isin(self[key], drop_ids)
+
+        merged_keys = np.concatenate([self[key][keep], other[key]])
+        order = np.argsort(merged_keys, kind='stable')
+
+        columns = {
+            name: np.concatenate([np.asarray(self[name])[keep], other[name]])[order]
+            for name in self.columns
+        }
+        skills = vstack([self.skills[keep], other.skills], format='csr')[order]
+        return EntityColumns(columns, skills)
+
+
+class FeatureSet:
+    """
+    One immutable, versioned materialization of freelancer and task features
+    """
+
+    def __init__(self, version, manifest, freelancers, tasks):
+        self.version = version
+        self.manifest = manifest
+        self.freelancers = freelancers
+        self.tasks = tasks
+
+    @property
+    def n_features(self):
+        return self.manifest['n_features']
+
+
+class FeatureStore:
+    """
+    Versioned columnar feature files shared by training and inference.
+
+    Each refresh writes a new ``vNNNNNN`` directory of .npy columns and
+    atomically repoints ``CURRENT`` at it. Refreshes are incremental: only
+    tasks and freelancer profiles updated since the previous version's
+    watermarks are re-read from the database.
+    """
+
+    _cache = {}
+    _lock = threading.Lock()
+
+    def __init__(self, root=None):
+        config = settings.AI_MODEL_CONFIG
+        self.root = str(root or config.get('FEATURE_STORE_DIR'))
+        self.n_features = config.get('SKILL_HASH_FEATURES', 2 ** 12)
+        self.keep_versions = config.get('FEATURE_STORE_KEEP_VERSIONS', 3)
+
+    def _current_pointer(self):
+        return os.path.join(self.root, 'CURRENT')
+
+    def current_version(self):
+        try:
+            with open(self._current_pointer()) as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def load(self, version=None):
+        """
+        Return the current FeatureSet (or a given version).
+
+        Raises FileNotFoundError when nothing has been materialized yet;
+        only training, refresh_feature_store and the background refresh
+        build versions, never a request.
+        """
+        version = version or self.current_version()
+        if version is None:
+            raise FileNotFoundError(self._current_pointer())
+
+        with FeatureStore._lock:
+            cached = FeatureStore._cache.get((self.root, version))
+        if cached:
+            return cached
+
+        path = os.path.join(self.root, version)
+        with open(os.path.join(path, 'manifest.json')) as f:
+            manifest = json.load(f)
+        feature_set = FeatureSet(
+            version,
+            manifest,
+            EntityColumns.load(os.path.join(path, 'freelancers'), FREELANCER_COLUMNS, manifest['n_features']),
+            EntityColumns.load(os.path.join(path, 'tasks'), TASK_COLUMNS, manifest['n_features']),
+        )
+
+        with FeatureStore._lock:
+            # Only the current version is worth keeping in memory
+            FeatureStore._cache = {
+                key: value for key, value in FeatureStore._cache.items() if key[0] != self.root
+            }
+            FeatureStore._cache[(self.root, version)] = feature_set
+        return feature_set
+
+    def refresh(self, full=False):
+        """
+        Materialize a new version from rows changed since the current one
+        """
+        from tasks.models import Task
+        from ai_models.models import FreelancerProfile
+
+        previous = None
+        if not full and self.current_version():
+            previous = self.load()
+            if previous.n_features != self.n_features:
+                previous = None
+
+        encoder = HashedSkillEncoder(n_features=self.n_features)
+        started_at = timezone.now()
+        if replicas_in_use():
+            # Rows committed on the primary may not have reached the replica yet
+            started_at -= timedelta(seconds=getattr(settings, 'REPLICA_MAX_LAG_SECONDS', 30))
+
+        profiles = FreelancerProfile.objects.select_related('user')
+        tasks = Task.objects.all()
+        if previous:
+            profiles = profiles.filter(updated_at__gt=parse_datetime(previous.manifest['watermarks']['freelancers']))
+            tasks = tasks.filter(updated_at__gt=parse_datetime(previous.manifest['watermarks']['tasks']))
+
+        profiles = list(profiles)
+        tasks = list(tasks.only('id', 'budget', 'description', 'skills_required', 'created_at'))
+        freelancers = EntityColumns.from_rows(
+            [freelancer_row(profile) for profile in profiles],
+            [profile.skill_embedding for profile in profiles],
+            FREELANCER_COLUMNS,
+            encoder,
+        )
+        task_columns = EntityColumns.from_rows(
+            [task_row(task) for task in tasks],
+            [task.skills_required for task in tasks],
+            TASK_COLUMNS,
+            encoder,
+        )
+
+        if previous:
+            # Rows that disappeared since the previous version
+            live_profile_ids = set(FreelancerProfile.objects.values_list('id', flat=True))
+            live_task_ids = set(Task.objects.values_list('id', flat=True))
+            removed_profiles = [i for i in previous.freelancers['profile_id'].tolist() if i not in live_profile_ids]
+            removed_tasks = [i for i in previous.tasks['task_id'].tolist() if i not in live_task_ids]
+
+            freelancers = previous.freelancers.upsert(freelancers, 'profile_id', removed_profiles)
+            task_columns = previous.tasks.upsert(task_columns, 'task_id', removed_tasks)
+        else:
+            freelancers = freelancers.sorted_by('profile_id')
+            task_columns = task_columns.sorted_by('task_id')
+
+        version = self._write(freelancers, task_columns, started_at)
+        logger.info(
+            f"Feature store {version}: {len(profiles)} freelancers and {len(tasks)} tasks re-read"
+        )
+        return self.load()
+
+    def _write(self, freelancers, tasks, watermark):
+        os.makedirs(self.root, exist_ok=True)
+        existing = sorted(name for name in os.listdir(self.root) if name.startswith('v'))
+        version = f"v{int(existing[-1][1:]) + 1:06d}" if existing else 'v000001'
+
+        tmp_path = os.path.join(self.root, f'.tmp-{version}-{os.getpid()}')
+        freelancers.save(os.path.join(tmp_path, 'freelancers'))
+        tasks.save(os.path.join(tmp_path, 'tasks'))
+        with open(os.path.join(tmp_path, 'manifest.json'), 'w') as f:
+            json.dump({
+                'version': version,
+                'created_at': timezone.now().isoformat(),
+                'n_features': self.n_features,
+                # Watermarks are taken before reading, so concurrent writes are re-read next time
+                'watermarks': {'freelancers': watermark.isoformat(), 'tasks': watermark.isoformat()},
+                'counts': {'freelancers': len(freelancers), 'tasks': len(tasks)},
+            }, f)
+        try:
+            os.replace(tmp_path, os.path.join(self.root, version))
+        except OSError:
+            # A concurrent refresh published this version first
+            shutil.rmtree(tmp_path, ignore_errors=True)
+            return version
+
+        pointer_tmp = f"{self._current_pointer()}.tmp-{os.getpid()}"
+        with open(pointer_tmp, 'w') as f:
+            f.write(version)
+        os.replace(pointer_tmp, self._current_pointer())
+
+        for old_version in (existing + [version])[:-self.keep_versions]:
+            shutil.rmtree(os.path.join(self.root, old_version), ignore_errors=True)
+
+        return version
+
+
+_refresh_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='ai-feature-store')
+_refresh_lock = threading.Lock()
+_refresh_pending = False
+_last_refresh = 0.0
+
+
+def _run_queued_refresh():
+    global _refresh_pending, _last_refresh
+
+    # Bursts of writes share one refresh per FEATURE_STORE_REFRESH_INTERVAL
+    interval = settings.AI_MODEL_CONFIG.get('FEATURE_STORE_REFRESH_INTERVAL', 10)
+    time.sleep(max(_last_refresh + interval - time.monotonic(), 0))
+    with _refresh_lock:
+        # Writes from here on queue another run
+        _refresh_pending = False
+    try:
+        FeatureStore().refresh()
+    except Exception as e:
+        logger.error(f"Error refreshing feature store: {e}")
+    finally:
+        _last_refresh = time.monotonic()
+        connections.close_all()
+
+
+def queue_refresh():
+    """
+    Refresh the feature store in the background once the current
+    transaction commits, picking up the rows it changed.
+
+    Only the hashed encoder serves from the store; with the TF-IDF
+    encoder there is nothing to keep fresh.
+    """
+    if settings.AI_MODEL_CONFIG.get('SKILL_ENCODER', 'tfidf') != 'hashed':
+        return
+
+    def submit():
+        global _refresh_pending
+        with _refresh_lock:
+            if _refresh_pending:
+                return
+            _refresh_pending = True
+        _refresh_executor.submit(_run_queued_refresh)
+
+    transaction.on_commit(submit)
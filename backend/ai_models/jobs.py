@@ -0,0 +1,129 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, connections, transaction
+from django.utils import timezone
+
+from ai_models.models import TrainingJob
+
+logger = logging.getLogger(__name__)
+
+# A single worker thread: jobs for one process run one after another
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='ai-training')
+
+
+def _train_freelancer_recommendation(job):
+    """
+    Train the freelancer recommendation model, reporting progress on the job
+    """
+    from tasks.models import Task
+    from ai_models.models import FreelancerProfile
+    from ai_models.recommendation import FreelancerRecommendationEngine, _use_hashed_encoder
+
+    if _use_hashed_encoder():
+        # Training reads the feature store, refreshing it first
+        job.update_progress(0.05, 'Refreshing feature store')
+        FreelancerRecommendationEngine.train_recommendation_model(progress=job.update_progress)
+        return
+
+    job.update_progress(0.05, 'Loading tasks and freelancers')
+    tasks = list(Task.objects.all())
+    freelancers = list(FreelancerProfile.objects.all())
+
+    FreelancerRecommendationEngine.train_recommendation_model(
+        tasks, freelancers, progress=job.update_progress
+    )
+
+
+TRAINERS = {
+    'FREELANCER_REC': _train_freelancer_recommendation,
+}
+
+
+def _expire_stale_jobs(model_type):
+    """
+    Fail active jobs whose worker stopped sending heartbeats, e.g. after a crash
+    """
+    timeout = settings.AI_MODEL_CONFIG.get('TRAINING_JOB_TIMEOUT', 3600)
+    TrainingJob.objects.filter(
+        model_type=model_type,
+        status__in=TrainingJob.ACTIVE_STATUSES,
+        heartbeat_at__lt=timezone.now() - timedelta(seconds=timeout),
+    ).update(status='FAILED', error='Job abandoned: no heartbeat', finished_at=timezone.now())
+
+
+def get_active_job(model_type):
+    return TrainingJob.objects.filter(
+        model_type=model_type, status__in=TrainingJob.ACTIVE_STATUSES
+    ).first()
+
+
+def enqueue_training(model_type='FREELANCER_REC'):
+    """
+    Queue a background training job unless one is already active.
+
+    The partial unique constraint on TrainingJob makes this single-flight
+    across every worker process sharing the database. Returns (job, created).
+    """
+    _expire_stale_jobs(model_type)
+
+    active_job = get_active_job(model_type)
+    if active_job:
+        return active_job, False
+
+    # Don't hammer a training that just failed, e.g. for lack of data
+    cooldown = settings.AI_MODEL_CONFIG.get('TRAINING_RETRY_COOLDOWN', 300)
+    recent_failure = TrainingJob.objects.filter(
+        model_type=model_type,
+        status='FAILED',
+        finished_at__gte=timezone.now() - timedelta(seconds=cooldown),
+    ).order_by('-finished_at').first()
+    if recent_failure:
+        return recent_failure, False
+
+    try:
+        with transaction.atomic():
+            job = TrainingJob.objects.create(model_type=model_type)
+    except IntegrityError:
+        # Another process won the race
+        return get_active_job(model_type), False
+
+    transaction.on_commit(lambda: _executor.submit(run_training_job, job.id))
+    logger.info(f"Queued training job {job.id} for {model_type}")
+    return job, True
+
+
+def run_training_job(job_id):
+    """
+    Execute a queued training job and record its outcome
+    """
+    try:
+        job = TrainingJob.objects.get(id=job_id)
+        job.status = 'RUNNING'
+        job.started_at = timezone.now()
+        job.heartbeat_at = job.started_at
+        job.save(update_fields=['status', 'started_at', 'heartbeat_at'])
+
+        TRAINERS[job.model_type](job)
+
+        job.status = 'SUCCEEDED'
+        job.progress = 1.0
+        job.message = 'Training complete'
+        job.finished_at = timezone.now()
+        job.save(update_fields=['status', 'progress', 'message', 'finished_at'])
+        logger.info(f"Training job {job_id} succeeded")
+
+        if job.model_type == 'FREELANCER_REC':
+            # Snapshots built by the previous model are now stale
+            from ai_models.snapshots import refresh_open_task_snapshots
+            refresh_open_task_snapshots()
+    except Exception as e:
+        logger.error(f"Training job {job_id} failed: {e}")
+        TrainingJob.objects.filter(id=job_id).update(
+            status='FAILED', error=str(e), finished_at=timezone.now()
+        )
+    finally:
+        # Worker threads own their connections; don't leak them
+        connections.close_all()
@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand
+from ai_models.retention import archive_training_logs, retention_cutoff
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = (
+        'Roll up, archive and delete training logs older than the retention window. '
+        'Meant to run daily, e.g. from cron.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=None,
+            help='Days of logs kept in the table (default: TRAINING_LOG_RETENTION_DAYS)'
+        )
+        parser.add_argument('--archive-dir', default=None, help='Directory receiving the .jsonl.gz files')
+        parser.add_argument('--chunk-size', type=int, default=5000, help='Rows read per database round trip')
+        parser.add_argument('--dry-run', action='store_true', help='List the days that would be archived')
+
+    def handle(self, *args, **options):
+        cutoff = retention_cutoff(options['days'])
+        summary = archive_training_logs(
+            cutoff=cutoff,
+            archive_dir=options['archive_dir'],
+            chunk_size=options['chunk_size'],
+            dry_run=options['dry_run'],
+        )
+
+        for bucket in summary:
+            self.stdout.write(f"{bucket['model_type']} {bucket['day']}: {bucket['rows']} rows")
+
+        total = sum(bucket['rows'] for bucket in summary)
+        verb = 'Would archive' if options['dry_run'] else 'Archived'
+        logger.info(f'{verb} {total} training logs captured before {cutoff}')
+        self.stdout.write(self.style.SUCCESS(f'{verb} {total} training logs captured before {cutoff}'))
@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand, CommandError
+from ai_models.assignment import assign_open_tasks, open_tasks
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = 'Assign open tasks to freelancers in one capacity-constrained batch'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=None, help='Assign only the oldest N open tasks')
+        parser.add_argument('--max-active', type=int, default=None, help='Active tasks allowed per freelancer')
+        parser.add_argument('--candidates', type=int, default=None, help='Top recommendations considered per task')
+        parser.add_argument('--min-score', type=float, default=None, help='Lowest match score accepted')
+        parser.add_argument('--dry-run', action='store_true', help='Report the matching without saving it')
+
+    def handle(self, *args, **options):
+        tasks = None
+        if options['limit']:
+            ids = list(open_tasks().order_by('created_at', 'id').values_list('id', flat=True)[:options['limit']])
+            tasks = open_tasks().filter(id__in=ids)
+
+        try:
+            stats = assign_open_tasks(
+                tasks,
+                max_active=options['max_active'],
+                candidates=options['candidates'],
+                min_score=options['min_score'],
+                dry_run=options['dry_run'],
+            )
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(
+            f"{stats['assigned']} of {stats['tasks']} open tasks matched to {stats['freelancers']} freelancers "
+            f"(scoring {stats['scoring_seconds']}s, solving {stats['solve_seconds']}s)"
+        )
+        if stats['mean_score'] is not None:
+            self.stdout.write(f"Mean match score: {stats['mean_score']:.4f}")
+        if stats['unscored']:
+            self.stdout.write(self.style.WARNING(f"{stats['unscored']} tasks could not be scored and were left open"))
+        if stats['skipped']:
+            self.stdout.write(self.style.WARNING(f"{stats['skipped']} tasks were claimed during the run and skipped"))
+        self.stdout.write(self.style.SUCCESS('Dry run; nothing saved' if options['dry_run'] else 'Assignment complete'))
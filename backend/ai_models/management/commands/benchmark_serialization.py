@@ -0,0 +1,106 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+
+from ai_marketplace.serialization import dumps, orjson
+from ai_models.models import AIModelTrainingLog, FreelancerProfile
+from ai_models.serializers import (
+    AIModelTrainingLogSerializer,
+    AIModelTrainingLogValues,
+    FreelancerProfileSerializer,
+    FreelancerProfileValues,
+)
+from users.models import CustomUser
+from users.serializers import UserProfileSerializer, UserProfileValues
+
+
+def _best_time(func, repeat):
+    best, result = None, None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+class Command(BaseCommand):
+    help = 'Compare ModelSerializer rendering with the values-based serializers on generated rows'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=10000, help='Rows generated per model')
+        parser.add_argument('--repeat', type=int, default=3, help='Runs per path; the best is reported')
+
+    def handle(self, *args, **options):
+        rows, repeat = options['rows'], options['repeat']
+        self.stdout.write(f"JSON encoder: {'orjson' if orjson else 'json'}; {rows} rows, best of {repeat}")
+
+        # Generated rows never outlive the benchmark
+        with transaction.atomic():
+            self._generate(rows)
+            cases = [
+                ('UserProfile', UserProfileSerializer, CustomUser.objects.order_by('id'), UserProfileValues),
+                (
+                    'FreelancerProfile',
+                    FreelancerProfileSerializer,
+                    FreelancerProfile.objects.select_related('user').order_by('id'),
+                    FreelancerProfileValues,
+                ),
+                (
+                    'AIModelTrainingLog',
+                    AIModelTrainingLogSerializer,
+                    AIModelTrainingLog.objects.order_by('id'),
+                    AIModelTrainingLogValues,
+                ),
+            ]
+            for name, serializer_class, queryset, values in cases:
+                drf_time, drf_body = _best_time(
+                    lambda: JSONRenderer().render(serializer_class(queryset.all(), many=True).data), repeat
+                )
+                lean_time, lean_body = _best_time(lambda: dumps(values.serialize(queryset.all())), repeat)
+                same = json.loads(drf_body) == json.loads(lean_body)
+                self.stdout.write(
+                    f"{name:<20} ModelSerializer {drf_time * 1000:8.1f} ms   "
+                    f"values {lean_time * 1000:7.1f} ms   {drf_time / lean_time:5.1f}x   "
+                    f"{'identical output' if same else 'OUTPUT DIFFERS'}"
+                )
+            transaction.set_rollback(True)
+
+    def _generate(self, rows):
+        # Unusable passwords: hashing 10k real ones would dominate the run
+        users = CustomUser.objects.bulk_create([
+            CustomUser(
+                username=f'bench_user_{i}',
+                email=f'bench_{i}@example.com',
+                password='!',
+                is_freelancer=True,
+                skills=['python', 'django', 'react'][:1 + i % 3],
+                reputation_score=i % 5,
+                total_tasks_completed=i % 17,
+                approval_rate=(i % 10) / 10,
+            )
+            for i in range(rows)
+        ], batch_size=1000)
+        FreelancerProfile.objects.bulk_create([
+            FreelancerProfile(
+                user=user,
+                skill_embedding=[(i % 7) / 7, (i % 3) / 3, 0.5],
+                task_history_embedding=[(i % 5) / 5],
+                performance_score=(i % 100) / 100,
+            )
+            for i, user in enumerate(users)
+        ], batch_size=1000)
+        AIModelTrainingLog.objects.bulk_create([
+            AIModelTrainingLog(
+                model_type='FREELANCER_REC',
+                model_version='bench',
+                training_data=json.dumps({'features': [i % 3, 0.25, 1.0]}),
+                label=str(i % 2),
+                training_accuracy=0.9,
+                training_data_size=rows,
+            )
+            for i in range(rows)
+        ], batch_size=1000)
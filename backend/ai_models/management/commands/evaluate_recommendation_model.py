@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand, CommandError
+from ai_marketplace.db import read_from_replica
+from ai_models.evaluation import DEFAULT_KS, STRATEGIES, evaluate_recommendation_model
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = 'Evaluate the recommendation pipeline offline against held-out submission outcomes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--folds', type=int, default=5, help='Number of cross-validation folds')
+        parser.add_argument('--k', type=int, nargs='+', default=list(DEFAULT_KS), help='Cutoffs for the @k metrics')
+        parser.add_argument('--workers', type=int, default=None, help='Worker processes (default: one per fold)')
+        parser.add_argument('--seed', type=int, default=42, help='Seed for the fold assignment')
+        parser.add_argument('--no-log', action='store_true', help='Do not record the results in AIModelTrainingLog')
+
+    @read_from_replica
+    def handle(self, *args, **options):
+        if options['folds'] < 2:
+            raise CommandError('At least 2 folds are required')
+
+        try:
+            result = evaluate_recommendation_model(
+                folds=options['folds'],
+                ks=sorted(set(options['k'])),
+                workers=options['workers'],
+                seed=options['seed'],
+                log=not options['no_log'],
+            )
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(
+            f"{result['tasks_evaluated']} tasks, {result['freelancers']} freelancers, "
+            f"{result['folds']} folds (feature store {result['feature_store_version']})"
+        )
+        for strategy in STRATEGIES:
+            self.stdout.write(f"\n{strategy}:")
+            for name, value in result['summary'][strategy].items():
+                self.stdout.write(f"  {name:<10} {value['mean']:.4f} ± {value['std']:.4f}")
+
+        logger.info(f"Evaluated recommendation model on {result['tasks_evaluated']} tasks")
+        self.stdout.write(self.style.SUCCESS('\nEvaluation complete'))
@@ -0,0 +1,51 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from ai_marketplace.db import read_from_replica
+from ai_models.models import AIModelTrainingLog
+from ai_models.training_data import export_training_logs
+from datetime import datetime, time
+
+
+def _parse_moment(value):
+    """
+    Accept an ISO datetime or a bare date (midnight, current timezone)
+    """
+    moment = parse_datetime(value)
+    if moment is None:
+        day = parse_date(value)
+        if day is None:
+            raise CommandError(f'Invalid date or datetime: {value}')
+        moment = datetime.combine(day, time.min)
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment)
+    return moment
+
+
+class Command(BaseCommand):
+    help = 'Export logged training samples to memory-mappable float32 .npy files'
+
+    def add_arguments(self, parser):
+        parser.add_argument('output', help='Path of the .npy feature matrix to write; labels go to <name>.labels.npy')
+        parser.add_argument(
+            '--model-type',
+            default='FREELANCER_REC',
+            choices=[choice for choice, _ in AIModelTrainingLog.MODEL_TYPES],
+        )
+        parser.add_argument('--since', help='Only samples captured at or after this date/datetime')
+        parser.add_argument('--until', help='Only samples captured before this date/datetime')
+        parser.add_argument('--chunk-size', type=int, default=10000, help='Rows read per database round trip')
+
+    @read_from_replica
+    def handle(self, *args, **options):
+        metadata = export_training_logs(
+            options['output'],
+            options['model_type'],
+            since=_parse_moment(options['since']) if options['since'] else None,
+            until=_parse_moment(options['until']) if options['until'] else None,
+            chunk_size=options['chunk_size'],
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Exported {metadata['rows']} samples with {metadata['n_features']} features "
+            f"to {options['output']} ({metadata['skipped']} rows skipped)"
+        ))
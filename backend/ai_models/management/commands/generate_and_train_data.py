@@ -1,27 +1,28 @@
 import random
-import json
-import numpy as np
 from django.core.management.base import BaseCommand
 from django.contrib.auth import get_user_model
 from django.db import transaction
-from django.utils import timezone
 from decimal import Decimal
 
 from tasks.models import Task, TaskSubmission
 from ai_models.models import AIModelTrainingLog, FreelancerProfile
-from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import StandardScaler
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.metrics import accuracy_score, classification_report
-import joblib
+from ai_models.training_data import TrainingLogWriter
 
 User = get_user_model()
 
 class Command(BaseCommand):
     help = 'Generate synthetic training data and train AI models'
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--log-batch-size',
+            type=int,
+            default=None,
+            help='Training logs per bulk INSERT (default: TRAINING_LOG_BATCH_SIZE)'
+        )
+
     @transaction.atomic
-    def generate_synthetic_data(self):
+    def generate_synthetic_data(self, log_batch_size=None):
         """
         Generate synthetic training data for AI models
         """
@@ -84,8 +85,10 @@ class Command(BaseCommand):
         creator.set_password('testpass123')
         creator.save()
 
-        # Generate synthetic tasks and submissions
+        # Generate synthetic tasks and submissions. Training logs are buffered
+        # and bulk-inserted; the writer flushes by size only, inside this transaction
         training_logs = []
+        log_writer = TrainingLogWriter(batch_size=log_batch_size, flush_interval=0)
         for _ in range(200):  # Increased number of synthetic tasks
             task_skills = random.sample(skills_list, random.randint(1, 3))
             
@@ -107,38 +110,30 @@ class Command(BaseCommand):
                     submission_text='Synthetic submission for training',
                     status=random.choice(['APPROVED', 'REJECTED'])
                 )
-                
-                # Prepare feature vector for training
-                feature_vector = [
-                    float(task.budget),
-                    len(task.description),
-                    freelancer.reputation_score,
-                    len(task_skills),
-                    submission.submitted_at.timestamp()
-                ]
-                
-                # Create training log
-                training_log = AIModelTrainingLog.objects.create(
-                    model_type='FREELANCER_REC',
-                    training_data=feature_vector,
-                    label=1 if submission.status == 'APPROVED' else 0,
-                    training_accuracy=None,
-                    captured_at=timezone.now()
-                )
-                training_logs.append(training_log)
 
+                # Queue the training sample
+                training_logs.append(log_writer.log_submission(submission))
+
+        log_writer.flush()
         return training_logs
 
     def train_freelancer_recommendation_model(self, training_logs):
         """
         Train a RandomForest model for freelancer recommendation
         """
+        # Imported here so generating data doesn't load scikit-learn
+        import joblib
+        from sklearn.ensemble import RandomForestClassifier
+        from sklearn.metrics import accuracy_score, classification_report
+        from sklearn.model_selection import train_test_split
+        from sklearn.preprocessing import StandardScaler
+
         # Prepare training data
         X = []
         y = []
         for log in training_logs:
-            features = log.training_data
-            X.append(features)
+            # Written by bulk_create, so training_data is still the feature list
+            X.append(log.training_data)
             y.append(log.label)
 
         if not X or not y:
@@ -178,7 +173,7 @@ class Command(BaseCommand):
 
     def handle(self, *args, **options):
         # Generate synthetic training data
-        training_logs = self.generate_synthetic_data()
+        training_logs = self.generate_synthetic_data(options['log_batch_size'])
         
         # Train freelancer recommendation model
         self.train_freelancer_recommendation_model(training_logs)
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from ai_models.training_data import import_training_logs
+
+
+class Command(BaseCommand):
+    help = 'Load samples written by export_training_logs back into AIModelTrainingLog'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Path of the exported .npy feature matrix')
+        parser.add_argument('--batch-size', type=int, default=5000, help='Rows inserted per bulk_create')
+
+    @transaction.atomic
+    def handle(self, *args, **options):
+        created = import_training_logs(options['path'], batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Imported {created} training samples'))
@@ -0,0 +1,38 @@
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from ai_marketplace.db import read_from_replica
+from ai_models.models import AIModelTrainingLog
+from ai_models.registry import summarize_metrics
+
+
+def _fmt(value, pattern='{:.3f}'):
+    return '-' if value is None else pattern.format(value)
+
+
+class Command(BaseCommand):
+    help = 'Compare serving latency, score distribution and top-k overlap of model versions'
+
+    def add_arguments(self, parser):
+        parser.add_argument('model_type', choices=[choice for choice, _ in AIModelTrainingLog.MODEL_TYPES])
+        parser.add_argument('--hours', type=float, default=24, help='Metrics window to summarize')
+
+    @read_from_replica
+    def handle(self, *args, **options):
+        since = timezone.now() - timedelta(hours=options['hours'])
+        summary = summarize_metrics(options['model_type'], since)
+        if not summary:
+            self.stdout.write(self.style.WARNING('No serving metrics recorded in this window'))
+            return
+
+        self.stdout.write(
+            f"{'version':<20} {'role':<8} {'requests':>9} {'errors':>7} {'mean ms':>8} "
+            f"{'p50 ms':>7} {'p95 ms':>7} {'score':>6} {'std':>6} {'overlap':>8}"
+        )
+        for (label, role), entry in sorted(summary.items()):
+            self.stdout.write(
+                f"{label:<20} {role:<8} {entry['requests']:>9} {entry['errors']:>7} "
+                f"{_fmt(entry['latency_ms_mean'], '{:.1f}'):>8} "
+                f"{_fmt(entry['latency_ms_p50'], '{:g}'):>7} {_fmt(entry['latency_ms_p95'], '{:g}'):>7} "
+                f"{_fmt(entry['score_mean']):>6} {_fmt(entry['score_std']):>6} {_fmt(entry['overlap_mean']):>8}"
+            )
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+from ai_marketplace.db import read_from_replica
+from ai_models.feature_store import FeatureStore
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = 'Materialize a new version of the columnar freelancer and task feature store'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--full',
+            action='store_true',
+            help='Re-read every row instead of only rows changed since the current version'
+        )
+
+    @read_from_replica
+    def handle(self, *args, **options):
+        feature_set = FeatureStore().refresh(full=options['full'])
+
+        counts = feature_set.manifest['counts']
+        logger.info(f"Feature store refreshed to {feature_set.version}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Feature store {feature_set.version}: "
+            f"{counts['freelancers']} freelancers, {counts['tasks']} tasks"
+        ))
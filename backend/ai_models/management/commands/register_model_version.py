@@ -0,0 +1,73 @@
+from django.core.files import File
+from django.core.management.base import BaseCommand, CommandError
+from django.db import IntegrityError
+from ai_models.models import AIModel, AIModelTrainingLog, AIModelVersion
+from ai_models.registry import assign_role
+import joblib
+import logging
+import os
+import tempfile
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = 'Bundle trained artifacts into a registered AIModelVersion, optionally routing it'
+
+    def add_arguments(self, parser):
+        parser.add_argument('model_type', choices=[choice for choice, _ in AIModelTrainingLog.MODEL_TYPES])
+        parser.add_argument('version', help='Version name, e.g. v2')
+        parser.add_argument('--model', help='Model artifact (default for FREELANCER_REC: trained_models)')
+        parser.add_argument('--scaler', help='Scaler artifact')
+        parser.add_argument('--encoder', help='Skill encoder artifact (.npy for hashed, joblib for TF-IDF)')
+        parser.add_argument(
+            '--role',
+            choices=[choice for choice, _ in AIModelVersion.ROLE_CHOICES],
+            default='INACTIVE',
+            help='Route the new version right away'
+        )
+        parser.add_argument('--traffic-percent', type=int, default=0, help='Share of requests served by a CANARY')
+
+    def _artifacts(self, options):
+        if options['model_type'] == 'FREELANCER_REC' and not options['model']:
+            from ai_models.recommendation import FreelancerRecommendationEngine
+            try:
+                artifacts = FreelancerRecommendationEngine._load_artifacts()
+            except FileNotFoundError:
+                raise CommandError('No trained recommendation model; train one or pass --model')
+            return {key: artifacts[key] for key in ('model', 'encoder', 'scaler')}
+
+        if not options['model'] or not options['scaler']:
+            raise CommandError('--model and --scaler are required')
+        artifacts = {'model': joblib.load(options['model']), 'scaler': joblib.load(options['scaler'])}
+        if options['encoder']:
+            if options['encoder'].endswith('.npy'):
+                from ai_models.encoding import HashedSkillEncoder
+                artifacts['encoder'] = HashedSkillEncoder.load(options['encoder'])
+            else:
+                artifacts['encoder'] = joblib.load(options['encoder'])
+        return artifacts
+
+    def handle(self, *args, **options):
+        artifacts = self._artifacts(options)
+        model, _ = AIModel.objects.get_or_create(name=options['model_type'])
+
+        try:
+            version = AIModelVersion.objects.create(model=model, version=options['version'])
+        except IntegrityError:
+            raise CommandError(f"{options['model_type']} {options['version']} is already registered")
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            bundle_path = os.path.join(tmp_dir, 'bundle.joblib')
+            joblib.dump(artifacts, bundle_path)
+            with open(bundle_path, 'rb') as f:
+                version.model_file.save(f"{options['model_type'].lower()}-{options['version']}.joblib", File(f))
+
+        if options['role'] != 'INACTIVE':
+            try:
+                assign_role(version, options['role'], options['traffic_percent'])
+            except ValueError as e:
+                raise CommandError(str(e))
+
+        logger.info(f'Registered {version} as {version.role}')
+        self.stdout.write(self.style.SUCCESS(f'Registered {version} ({version.role})'))
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand, CommandError
+from ai_models.models import AIModelTrainingLog, AIModelVersion
+from ai_models.registry import assign_role
+
+
+class Command(BaseCommand):
+    help = 'Make a registered model version primary, shadow, canary or inactive'
+
+    def add_arguments(self, parser):
+        parser.add_argument('model_type', choices=[choice for choice, _ in AIModelTrainingLog.MODEL_TYPES])
+        parser.add_argument('version')
+        parser.add_argument('role', choices=[choice for choice, _ in AIModelVersion.ROLE_CHOICES])
+        parser.add_argument('--traffic-percent', type=int, default=0, help='Share of requests served by a CANARY')
+
+    def handle(self, *args, **options):
+        try:
+            version = AIModelVersion.objects.select_related('model').get(
+                model__name=options['model_type'], version=options['version']
+            )
+        except AIModelVersion.DoesNotExist:
+            raise CommandError(f"{options['model_type']} {options['version']} is not registered")
+
+        try:
+            assign_role(version, options['role'], options['traffic_percent'])
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        # Other worker processes pick the change up within MODEL_ROUTING_TTL seconds
+        self.stdout.write(self.style.SUCCESS(f'{version} is now {version.role}'))
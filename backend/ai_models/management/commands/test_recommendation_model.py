@@ -107,8 +107,11 @@ class Command(BaseCommand):
         """
         from ai_models.models import AIModelTrainingLog
         
-        # Fetch the latest training log
-        latest_log = AIModelTrainingLog.objects.first()
+        # Fetch the latest training run's log (summary rows carry the data size)
+        latest_log = AIModelTrainingLog.objects.filter(
+            model_type='FREELANCER_REC',
+            training_data_size__isnull=False
+        ).order_by('-captured_at').first()
         
         if latest_log:
             self.stdout.write("\n--- Model Performance Analysis ---")
@@ -53,21 +53,10 @@ class Command(BaseCommand):
             logger.info('Starting model training...')
             self.stdout.write('Starting model training...')
 
-            model, scaler = FreelancerRecommendationEngine.train_recommendation_model(
-                tasks, freelancers
-            )
+            FreelancerRecommendationEngine.train_recommendation_model(tasks, freelancers)
 
-            # Log successful training
-            training_log = AIModelTrainingLog.objects.create(
-                model_type='FREELANCER_REC',
-                training_data={
-                    'tasks_count': len(tasks),
-                    'freelancers_count': len(freelancers)
-                },
-                training_accuracy=model.score(scaler.transform(model.X), model.y),
-                training_data_size=len(model.X),
-                is_used_for_training=True
-            )
+            # Training logs its own run, accuracy included
+            training_log = AIModelTrainingLog.objects.filter(model_type='FREELANCER_REC').latest('id')
 
             logger.info(f'Model training completed. Training log ID: {training_log.id}')
             self.stdout.write(self.style.SUCCESS(
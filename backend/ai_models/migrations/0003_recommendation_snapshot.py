@@ -0,0 +1,26 @@
+# Generated by Django 5.0.1 on 2026-10-19 16:55
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai_models', '0002_training_job'),
+        ('tasks', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RecommendationSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model_version', models.CharField(max_length=64)),
+                ('recommendations', models.JSONField(default=list)),
+                ('computed_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('task', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='recommendation_snapshot', to='tasks.task')),
+            ],
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.0.1 on 2026-10-19 18:02
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai_models', '0003_recommendation_snapshot'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='freelancerprofile',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+    ]
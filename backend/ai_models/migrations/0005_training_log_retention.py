@@ -0,0 +1,46 @@
+# Generated by Django 5.0.1 on 2026-10-19 17:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai_models', '0004_freelancerprofile_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AIModelTrainingRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model_type', models.CharField(choices=[('FREELANCER_REC', 'Freelancer Recommendation'), ('WORK_VALIDATION', 'Work Validation')], max_length=50)),
+                ('day', models.DateField()),
+                ('row_count', models.IntegerField(default=0)),
+                ('sample_count', models.IntegerField(default=0)),
+                ('positive_count', models.IntegerField(default=0)),
+                ('run_count', models.IntegerField(default=0)),
+                ('accuracy_count', models.IntegerField(default=0)),
+                ('avg_accuracy', models.FloatField(blank=True, null=True)),
+                ('min_accuracy', models.FloatField(blank=True, null=True)),
+                ('max_accuracy', models.FloatField(blank=True, null=True)),
+                ('loss_count', models.IntegerField(default=0)),
+                ('avg_loss', models.FloatField(blank=True, null=True)),
+                ('training_data_size', models.BigIntegerField(default=0)),
+                ('archive_files', models.JSONField(default=list)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AlterModelOptions(
+            name='aimodeltraininglog',
+            options={'verbose_name_plural': 'AI Model Training Logs'},
+        ),
+        migrations.AddIndex(
+            model_name='aimodeltraininglog',
+            index=models.Index(fields=['model_type', 'captured_at'], name='ai_training_type_captured_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='aimodeltrainingrollup',
+            constraint=models.UniqueConstraint(fields=('model_type', 'day'), name='unique_training_rollup_day'),
+        ),
+    ]
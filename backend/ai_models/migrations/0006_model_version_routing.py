@@ -0,0 +1,63 @@
+# Generated by Django 5.0.1 on 2026-10-19 17:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai_models', '0005_training_log_retention'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AIModelVersionMetrics',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model_type', models.CharField(max_length=50)),
+                ('version_label', models.CharField(max_length=64)),
+                ('role', models.CharField(max_length=20)),
+                ('window_start', models.DateTimeField()),
+                ('window_end', models.DateTimeField()),
+                ('requests', models.IntegerField(default=0)),
+                ('errors', models.IntegerField(default=0)),
+                ('latency_ms_sum', models.FloatField(default=0.0)),
+                ('latency_histogram', models.JSONField(default=list)),
+                ('score_count', models.IntegerField(default=0)),
+                ('score_sum', models.FloatField(default=0.0)),
+                ('score_sq_sum', models.FloatField(default=0.0)),
+                ('score_histogram', models.JSONField(default=list)),
+                ('overlap_sum', models.FloatField(default=0.0)),
+                ('overlap_count', models.IntegerField(default=0)),
+            ],
+            options={
+                'verbose_name_plural': 'AI Model Version Metrics',
+            },
+        ),
+        migrations.AddField(
+            model_name='aimodelversion',
+            name='role',
+            field=models.CharField(choices=[('INACTIVE', 'Inactive'), ('PRIMARY', 'Primary'), ('SHADOW', 'Shadow'), ('CANARY', 'Canary')], default='INACTIVE', max_length=20),
+        ),
+        migrations.AddField(
+            model_name='aimodelversion',
+            name='traffic_percent',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddConstraint(
+            model_name='aimodelversion',
+            constraint=models.UniqueConstraint(fields=('model', 'version'), name='unique_model_version'),
+        ),
+        migrations.AddConstraint(
+            model_name='aimodelversion',
+            constraint=models.UniqueConstraint(condition=models.Q(('role', 'PRIMARY')), fields=('model',), name='single_primary_model_version'),
+        ),
+        migrations.AddConstraint(
+            model_name='aimodelversion',
+            constraint=models.UniqueConstraint(condition=models.Q(('role__in', ['SHADOW', 'CANARY'])), fields=('model',), name='single_challenger_model_version'),
+        ),
+        migrations.AddIndex(
+            model_name='aimodelversionmetrics',
+            index=models.Index(fields=['model_type', 'window_start'], name='ai_version_metrics_window_idx'),
+        ),
+    ]
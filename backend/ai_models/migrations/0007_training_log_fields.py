@@ -0,0 +1,36 @@
+# Generated by Django 5.0.1 on 2026-10-19 16:51
+
+from django.db import migrations, models
+
+
+# AIModelTrainingLog field definitions missing from 0001_initial. These
+# operations first shipped inside 0002_training_job, so databases migrated
+# with that version re-apply them here as a no-op.
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai_models', '0006_model_version_routing'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='aimodeltraininglog',
+            name='label',
+            field=models.CharField(blank=True, max_length=100, null=True),
+        ),
+        migrations.AlterField(
+            model_name='aimodeltraininglog',
+            name='model_type',
+            field=models.CharField(choices=[('FREELANCER_REC', 'Freelancer Recommendation'), ('WORK_VALIDATION', 'Work Validation')], max_length=50),
+        ),
+        migrations.AlterField(
+            model_name='aimodeltraininglog',
+            name='model_version',
+            field=models.CharField(blank=True, max_length=20, null=True),
+        ),
+        migrations.AlterField(
+            model_name='aimodeltraininglog',
+            name='training_data_size',
+            field=models.IntegerField(blank=True, null=True),
+        ),
+    ]
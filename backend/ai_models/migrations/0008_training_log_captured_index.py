@@ -0,0 +1,17 @@
+# Generated by Django 5.0.1 on 2026-10-19 17:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai_models', '0007_training_log_fields'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='aimodeltraininglog',
+            index=models.Index(fields=['captured_at'], name='ai_training_captured_idx'),
+        ),
+    ]
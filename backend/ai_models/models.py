@@ -1,4 +1,5 @@
 from django.db import models
+from django.db.models import Q
 from django.conf import settings
 from django.utils import timezone
 import json
@@ -19,14 +20,71 @@ class AIModelVersion(models.Model):
     """
     Tracks different versions of AI models
     """
+    ROLE_CHOICES = [
+        ('INACTIVE', 'Inactive'),
+        ('PRIMARY', 'Primary'),  # Serves responses
+        ('SHADOW', 'Shadow'),  # Scored alongside the primary, never served
+        ('CANARY', 'Canary'),  # Serves traffic_percent of requests
+    ]
+    CHALLENGER_ROLES = ['SHADOW', 'CANARY']
+
     model = models.ForeignKey(AIModel, on_delete=models.CASCADE, related_name='versions')
     version = models.CharField(max_length=20)
     model_file = models.FileField(upload_to='ai_models/', null=True, blank=True)
+    role = models.CharField(max_length=20, choices=ROLE_CHOICES, default='INACTIVE')
+    traffic_percent = models.PositiveSmallIntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
     
     def __str__(self):
         return f"{self.model.name} - {self.version}"
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['model', 'version'], name='unique_model_version'),
+            # One version serves; at most one other is compared against it
+            models.UniqueConstraint(
+                fields=['model'],
+                condition=Q(role='PRIMARY'),
+                name='single_primary_model_version',
+            ),
+            models.UniqueConstraint(
+                fields=['model'],
+                condition=Q(role__in=['SHADOW', 'CANARY']),
+                name='single_challenger_model_version',
+            ),
+        ]
+
+class AIModelVersionMetrics(models.Model):
+    """
+    Serving metrics of one model version over one window, per worker process
+    """
+    model_type = models.CharField(max_length=50)
+    version_label = models.CharField(max_length=64)
+    role = models.CharField(max_length=20)
+    window_start = models.DateTimeField()
+    window_end = models.DateTimeField()
+    requests = models.IntegerField(default=0)
+    errors = models.IntegerField(default=0)
+    latency_ms_sum = models.FloatField(default=0.0)
+    # Counts per bucket of ai_models.registry.LATENCY_BUCKETS_MS / SCORE_BUCKETS
+    latency_histogram = models.JSONField(default=list)
+    score_count = models.IntegerField(default=0)
+    score_sum = models.FloatField(default=0.0)
+    score_sq_sum = models.FloatField(default=0.0)
+    score_histogram = models.JSONField(default=list)
+    # Top-k overlap of a shadow version's results with the primary's
+    overlap_sum = models.FloatField(default=0.0)
+    overlap_count = models.IntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.model_type} {self.version_label} ({self.role}) from {self.window_start}"
+
+    class Meta:
+        verbose_name_plural = "AI Model Version Metrics"
+        indexes = [
+            models.Index(fields=['model_type', 'window_start'], name='ai_version_metrics_window_idx'),
+        ]
+
 class AIModelTrainingLog(models.Model):
     """
     Log for tracking AI model training and data collection
@@ -63,7 +121,64 @@ class AIModelTrainingLog(models.Model):
 
     class Meta:
         verbose_name_plural = "AI Model Training Logs"
-        ordering = ['-captured_at']
+        # No default ordering: unqualified queries would sort the whole table
+        indexes = [
+            models.Index(fields=['model_type', 'captured_at'], name='ai_training_type_captured_idx'),
+            # Retention scans every model type by age
+            models.Index(fields=['captured_at'], name='ai_training_captured_idx'),
+        ]
+
+class AIModelTrainingRollup(models.Model):
+    """
+    Daily summary of training logs that have been archived out of the table
+    """
+    model_type = models.CharField(max_length=50, choices=AIModelTrainingLog.MODEL_TYPES)
+    day = models.DateField()
+    row_count = models.IntegerField(default=0)
+    sample_count = models.IntegerField(default=0)
+    positive_count = models.IntegerField(default=0)
+    run_count = models.IntegerField(default=0)
+    accuracy_count = models.IntegerField(default=0)
+    avg_accuracy = models.FloatField(null=True, blank=True)
+    min_accuracy = models.FloatField(null=True, blank=True)
+    max_accuracy = models.FloatField(null=True, blank=True)
+    loss_count = models.IntegerField(default=0)
+    avg_loss = models.FloatField(null=True, blank=True)
+    training_data_size = models.BigIntegerField(default=0)
+    archive_files = models.JSONField(default=list)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def merge(self, stats, archive_file=None):
+        """
+        Fold the aggregates of another batch of rows from the same day in
+        """
+        def weighted(current, current_count, value, count):
+            if not count:
+                return current
+            if not current_count:
+                return value
+            return (current * current_count + value * count) / (current_count + count)
+
+        def bound(current, value, pick):
+            return value if current is None else current if value is None else pick(current, value)
+
+        self.avg_accuracy = weighted(self.avg_accuracy, self.accuracy_count, stats['avg_accuracy'], stats['accuracy_count'])
+        self.avg_loss = weighted(self.avg_loss, self.loss_count, stats['avg_loss'], stats['loss_count'])
+        self.min_accuracy = bound(self.min_accuracy, stats['min_accuracy'], min)
+        self.max_accuracy = bound(self.max_accuracy, stats['max_accuracy'], max)
+        for field in ['row_count', 'sample_count', 'positive_count', 'run_count', 'accuracy_count', 'loss_count']:
+            setattr(self, field, getattr(self, field) + stats[field])
+        self.training_data_size += stats['training_data_size'] or 0
+        if archive_file:
+            self.archive_files = self.archive_files + [archive_file]
+
+    def __str__(self):
+        return f"{self.get_model_type_display()} rollup for {self.day}"
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['model_type', 'day'], name='unique_training_rollup_day'),
+        ]
 
 class FreelancerProfile(models.Model):
     """
@@ -73,6 +188,77 @@ class FreelancerProfile(models.Model):
     skill_embedding = models.JSONField(default=list)
     task_history_embedding = models.JSONField(default=list)
     performance_score = models.FloatField(default=0.0)
+    # Watermark for incremental feature store refreshes
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
     
     def __str__(self):
         return f"AI Profile for {self.user.username}"
+
+class TrainingJob(models.Model):
+    """
+    Background training run for an AI model
+    """
+    STATUS_CHOICES = [
+        ('PENDING', 'Pending'),
+        ('RUNNING', 'Running'),
+        ('SUCCEEDED', 'Succeeded'),
+        ('FAILED', 'Failed'),
+    ]
+    ACTIVE_STATUSES = ['PENDING', 'RUNNING']
+
+    model_type = models.CharField(max_length=50, choices=AIModelTrainingLog.MODEL_TYPES)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='PENDING')
+    progress = models.FloatField(default=0.0)
+    message = models.CharField(max_length=255, blank=True)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    heartbeat_at = models.DateTimeField(default=timezone.now)
+
+    def update_progress(self, progress, message=''):
+        """
+        Record progress without touching the rest of the row
+        """
+        self.progress = progress
+        self.message = message
+        self.heartbeat_at = timezone.now()
+        TrainingJob.objects.filter(id=self.id).update(
+            progress=progress, message=message, heartbeat_at=self.heartbeat_at
+        )
+
+    def __str__(self):
+        return f"{self.get_model_type_display()} training job #{self.id} ({self.status})"
+
+    class Meta:
+        constraints = [
+            # At most one queued or running job per model type
+            models.UniqueConstraint(
+                fields=['model_type'],
+                condition=Q(status__in=['PENDING', 'RUNNING']),
+                name='single_active_training_job',
+            ),
+        ]
+
+class RecommendationSnapshot(models.Model):
+    """
+    Precomputed freelancer ranking for a task, served instead of live scoring
+    """
+    task = models.OneToOneField(
+        'tasks.Task',
+        on_delete=models.CASCADE,
+        related_name='recommendation_snapshot'
+    )
+    model_version = models.CharField(max_length=64)
+    recommendations = models.JSONField(default=list)
+    computed_at = models.DateTimeField(default=timezone.now)
+
+    def is_fresh(self, model_version, max_age):
+        """
+        Whether the snapshot was built by model_version within max_age seconds
+        """
+        age = (timezone.now() - self.computed_at).total_seconds()
+        return self.model_version == model_version and age <= max_age
+
+    def __str__(self):
+        return f"Recommendations for task {self.task_id} ({self.model_version})"
@@ -1,20 +1,49 @@
 import numpy as np
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
-from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import StandardScaler
-from sklearn.linear_model import LogisticRegression
-import joblib
 import os
 import json
 import logging
+from django.conf import settings
 from django.contrib.auth import get_user_model
 from tasks.models import Task
 from ai_models.models import FreelancerProfile, AIModelTrainingLog
+from ai_models.encoding import HashedSkillEncoder
+from ai_models.feature_store import FeatureStore
 
 logger = logging.getLogger(__name__)
 User = get_user_model()
 
+MODELS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'trained_models')
+MODEL_PATH = os.path.join(MODELS_DIR, 'recommendation_model.pkl')
+VECTORIZER_PATH = os.path.join(MODELS_DIR, 'skill_vectorizer.pkl')
+SCALER_PATH = os.path.join(MODELS_DIR, 'feature_scaler.pkl')
+SKILL_IDF_PATH = os.path.join(MODELS_DIR, 'skill_idf.npy')
+
+
+def _dump_atomic(obj, path):
+    """
+    Write an artifact so concurrent readers never see a partial file
+    """
+    tmp_path = f"{path}.tmp-{os.getpid()}"
+    if isinstance(obj, HashedSkillEncoder):
+        with open(tmp_path, 'wb') as f:
+            obj.save(f)
+    else:
+        import joblib
+        joblib.dump(obj, tmp_path)
+    os.replace(tmp_path, path)
+
+
+def _use_hashed_encoder():
+    return settings.AI_MODEL_CONFIG.get('SKILL_ENCODER', 'tfidf') == 'hashed'
+
+
+# Locally trained artifacts, keyed by the version they came from
+_artifact_cache = {}
+
+# Tasks scored per block when building training pairs, bounding memory use
+TRAINING_BLOCK_SIZE = 1024
+
+
 class FreelancerRecommendationEngine:
     """
     AI-powered recommendation engine for matching freelancers to tasks
@@ -23,8 +52,10 @@ class FreelancerRecommendationEngine:
     @staticmethod
     def _extract_features(tasks, freelancers):
         """
-        Extract features for tasks and freelancers
+        Extract TF-IDF features for tasks and freelancers (legacy encoder)
         """
+        from sklearn.feature_extraction.text import TfidfVectorizer
+
         # Extract skills from tasks and freelancers
         task_skills = [' '.join(task.skills_required) for task in tasks]
         freelancer_skills = [' '.join(profile.skill_embedding) for profile in freelancers]
@@ -37,10 +68,94 @@ class FreelancerRecommendationEngine:
         return task_skill_vectors, freelancer_skill_vectors, vectorizer
 
     @staticmethod
-    def train_recommendation_model(tasks, freelancers):
+    def _pair_features(similarities, performance_scores, skill_matches):
+        """
+        Model input for (task, freelancer) pairs; shared by training and serving
+        """
+        return np.column_stack([
+            similarities,  # Similarity score
+            performance_scores,  # Freelancer performance
+            skill_matches,  # Skill match
+        ]).astype(np.float64)
+
+    @staticmethod
+    def _skill_matrices(encoder, task_raw, freelancer_raw, freelancer_vectors=None):
+        """
+        Similarity and skill-match counts between raw task and freelancer encodings
+        """
+        if freelancer_vectors is None:
+            freelancer_vectors = encoder.weight(freelancer_raw).T.tocsr()
+        similarities = (encoder.weight(task_raw) @ freelancer_vectors).toarray()
+        # Shared hash buckets stand in for exact skill overlap
+        skill_matches = ((task_raw != 0).astype(np.float32) @ (freelancer_raw != 0).astype(np.float32).T).toarray()
+        return similarities, skill_matches
+
+    @staticmethod
+    def _training_data_from_feature_store(progress):
+        """
+        Build training pairs from feature store columns
+        """
+        feature_set = FeatureStore().refresh()
+        tasks, freelancers = feature_set.tasks, feature_set.freelancers
+        if len(tasks) < 10 or len(freelancers) < 5:
+            raise ValueError(
+                f"Insufficient data for training. "
+                f"Tasks: {len(tasks)}, Freelancers: {len(freelancers)}"
+            )
+
+        progress(0.2, 'Vectorizing skills')
+        encoder = HashedSkillEncoder(n_features=feature_set.n_features).fit_raw(tasks.skills)
+        X, y = FreelancerRecommendationEngine._training_pairs(
+            encoder, tasks.skills, freelancers.skills, freelancers['performance_score']
+        )
+        return X, y, encoder, len(tasks), len(freelancers)
+
+    @staticmethod
+    def _training_pairs(encoder, task_raw, freelancer_raw, performance_scores):
+        """
+        Labelled pairs from raw skill encodings: each task's 3 most similar
+        freelancers, with label 1 for the top match
+        """
+        freelancer_vectors = encoder.weight(freelancer_raw).T.tocsr()
+        performance = np.asarray(performance_scores)
+
+        X_blocks, y_blocks = [], []
+        for start in range(0, task_raw.shape[0], TRAINING_BLOCK_SIZE):
+            similarities, skill_matches = FreelancerRecommendationEngine._skill_matrices(
+                encoder, task_raw[start:start + TRAINING_BLOCK_SIZE], freelancer_raw, freelancer_vectors
+            )
+            top = np.argsort(-similarities, axis=1, kind='stable')[:, :3]
+            rows = np.repeat(np.arange(len(top)), top.shape[1])
+            cols = top.ravel()
+            X_blocks.append(FreelancerRecommendationEngine._pair_features(
+                similarities[rows, cols], performance[cols], skill_matches[rows, cols]
+            ))
+            y_blocks.append(np.tile([1] + [0] * (top.shape[1] - 1), len(top)))
+
+        return np.vstack(X_blocks), np.concatenate(y_blocks)
+
+    @staticmethod
+    def _fit_model(X, y):
+        """
+        Fit the scaler and logistic regression ranking model on labelled pairs
+        """
+        from sklearn.linear_model import LogisticRegression
+        from sklearn.preprocessing import StandardScaler
+
+        scaler = StandardScaler()
+        X_scaled = scaler.fit_transform(X)
+
+        model = LogisticRegression(random_state=42)
+        model.fit(X_scaled, y)
+        return model, scaler
+
+    @staticmethod
+    def _training_data_from_orm(tasks, freelancers, progress):
         """
-        Train a recommendation model using task and freelancer skills
+        Build training pairs from model instances with the TF-IDF encoder
         """
+        from sklearn.metrics.pairwise import cosine_similarity
+
         # Check if there are enough data points
         if len(tasks) < 10 or len(freelancers) < 5:
             raise ValueError(
@@ -49,6 +164,7 @@ class FreelancerRecommendationEngine:
             )
 
         # Extract features
+        progress(0.2, 'Vectorizing skills')
         task_vectors, freelancer_vectors, vectorizer = FreelancerRecommendationEngine._extract_features(
             tasks, freelancers
         )
@@ -76,36 +192,49 @@ class FreelancerRecommendationEngine:
                 # Label: 1 for top match, 0 for less relevant
                 y.append(1 if j == 0 else 0)
 
-        # Convert to numpy arrays
-        X = np.array(X)
-        y = np.array(y)
+        return np.array(X), np.array(y), vectorizer, len(tasks), len(freelancers)
 
-        # Train a simple logistic regression model
-        scaler = StandardScaler()
-        X_scaled = scaler.fit_transform(X)
+    @staticmethod
+    def train_recommendation_model(tasks=None, freelancers=None, progress=None):
+        """
+        Train a recommendation model using task and freelancer skills.
 
-        model = LogisticRegression(random_state=42)
-        model.fit(X_scaled, y)
+        With the hashed encoder, training reads the feature store (refreshed
+        first) rather than ``tasks`` and ``freelancers``, which only the
+        legacy TF-IDF encoder needs. ``progress`` is an optional callback
+        taking (fraction, message).
+        """
+        progress = progress or (lambda fraction, message: None)
+
+        if _use_hashed_encoder():
+            X, y, vectorizer, tasks_count, freelancers_count = (
+                FreelancerRecommendationEngine._training_data_from_feature_store(progress)
+            )
+        else:
+            X, y, vectorizer, tasks_count, freelancers_count = (
+                FreelancerRecommendationEngine._training_data_from_orm(tasks, freelancers, progress)
+            )
 
-        # Attach X and y to the model for later use
-        model.X = X
-        model.y = y
+        # Train a simple logistic regression model
+        progress(0.6, 'Fitting model')
+        model, scaler = FreelancerRecommendationEngine._fit_model(X, y)
+        X_scaled = scaler.transform(X)
 
         # Save model and vectorizer
-        base_dir = os.path.dirname(os.path.abspath(__file__))
-        models_dir = os.path.join(base_dir, 'trained_models')
-        os.makedirs(models_dir, exist_ok=True)
+        progress(0.9, 'Saving artifacts')
+        os.makedirs(MODELS_DIR, exist_ok=True)
 
-        joblib.dump(model, os.path.join(models_dir, 'recommendation_model.pkl'))
-        joblib.dump(vectorizer, os.path.join(models_dir, 'skill_vectorizer.pkl'))
-        joblib.dump(scaler, os.path.join(models_dir, 'feature_scaler.pkl'))
+        # The model file is written last: its presence marks the artifacts ready
+        _dump_atomic(vectorizer, SKILL_IDF_PATH if _use_hashed_encoder() else VECTORIZER_PATH)
+        _dump_atomic(scaler, SCALER_PATH)
+        _dump_atomic(model, MODEL_PATH)
 
         # Log training details
         AIModelTrainingLog.objects.create(
             model_type='FREELANCER_REC',
             training_data=json.dumps({
-                'tasks_count': len(tasks),
-                'freelancers_count': len(freelancers)
+                'tasks_count': tasks_count,
+                'freelancers_count': freelancers_count
             }),
             training_accuracy=model.score(X_scaled, y),
             training_data_size=len(X),
@@ -115,57 +244,254 @@ class FreelancerRecommendationEngine:
         return model, scaler
 
     @staticmethod
-    def recommend_freelancers(task, top_n=5):
+    def model_status():
         """
-        Recommend top freelancers for a given task
+        Report whether trained artifacts are available for serving
         """
-        # Load pre-trained model and vectorizer
-        base_dir = os.path.dirname(os.path.abspath(__file__))
-        models_dir = os.path.join(base_dir, 'trained_models')
+        from ai_models.registry import get_routing
+        if get_routing('FREELANCER_REC').primary or os.path.exists(MODEL_PATH):
+            return 'ready'
 
+        from ai_models.jobs import get_active_job
+        return 'warming' if get_active_job('FREELANCER_REC') else 'unavailable'
+
+    @staticmethod
+    def model_version(routing_key=None):
+        """
+        Identify the model serving ``routing_key`` (a task id), or None if missing.
+
+        This is the registered AIModelVersion when one is routed, else the
+        trained artifacts currently on disk.
+        """
+        from ai_models.registry import version_label
+        return version_label(
+            'FREELANCER_REC', routing_key, local_label=FreelancerRecommendationEngine._local_model_version
+        )
+
+    @staticmethod
+    def _local_model_version():
         try:
-            model = joblib.load(os.path.join(models_dir, 'recommendation_model.pkl'))
-            vectorizer = joblib.load(os.path.join(models_dir, 'skill_vectorizer.pkl'))
-            scaler = joblib.load(os.path.join(models_dir, 'feature_scaler.pkl'))
-
-            # Vectorize task skills
-            task_skills_str = ' '.join(task.skills_required)
-            task_vector = vectorizer.transform([task_skills_str])
-
-            # Get all freelancers
-            freelancers = list(FreelancerProfile.objects.all())
-            freelancer_skills = [' '.join(profile.skill_embedding) for profile in freelancers]
-            freelancer_vectors = vectorizer.transform(freelancer_skills)
-
-            # Compute similarities
-            similarities = cosine_similarity(task_vector, freelancer_vectors)[0]
-
-            # Prepare features for recommendation
-            X_recommend = []
-            for i, freelancer in enumerate(freelancers):
-                X_recommend.append([
-                    similarities[i],  # Similarity score
-                    freelancer.performance_score,  # Freelancer performance
-                    len(set(task.skills_required) & set(freelancer.skill_embedding))  # Skill match
-                ])
+            return str(os.stat(MODEL_PATH).st_mtime_ns)
+        except FileNotFoundError:
+            return None
+
+    @staticmethod
+    def _load_artifacts():
+        """
+        Load the locally trained model, encoder and scaler, reusing them until
+        the artifacts change; 'label' names their version. Registered
+        versions bundle the same dict.
+        """
+        version = FreelancerRecommendationEngine._local_model_version()
+        if version is None:
+            raise FileNotFoundError(MODEL_PATH)
+
+        cached = _artifact_cache.get(version)
+        if cached is None:
+            import joblib
+
+            if _use_hashed_encoder():
+                encoder = HashedSkillEncoder.load(SKILL_IDF_PATH)
+            else:
+                encoder = joblib.load(VECTORIZER_PATH)
+            cached = {
+                'model': joblib.load(MODEL_PATH), 'encoder': encoder, 'scaler': joblib.load(SCALER_PATH),
+                'label': version,
+            }
+            _artifact_cache.clear()
+            _artifact_cache[version] = cached
+        return cached
 
-            # Scale features
-            X_recommend_scaled = scaler.transform(X_recommend)
+    @staticmethod
+    def _fallback_recommendations(task, top_n):
+        """
+        Rank freelancers by skill overlap and performance without a trained model
+        """
+        task_skills = set(task.skills_required)
+        scored = []
+        for freelancer in FreelancerProfile.objects.select_related('user'):
+            overlap = len(task_skills & set(freelancer.skill_embedding))
+            match_score = overlap / len(task_skills) if task_skills else 0.0
+            scored.append({'freelancer': freelancer, 'match_score': match_score})
 
-            # Predict recommendation scores
-            recommendation_scores = model.predict_proba(X_recommend_scaled)[:, 1]
+        scored.sort(
+            key=lambda rec: (rec['match_score'], rec['freelancer'].performance_score),
+            reverse=True
+        )
+        return scored[:top_n]
 
-            # Sort freelancers by recommendation score
-            recommended_indices = recommendation_scores.argsort()[::-1][:top_n]
-            recommended_freelancers = [freelancers[idx] for idx in recommended_indices]
+    @staticmethod
+    def _score_with_feature_store(tasks, top_n, artifacts):
+        """
+        Score every freelancer in the feature store against each task.
 
-            return recommended_freelancers
+        With RECOMMENDATION_SHARDS above 1 and a large enough pool, the
+        freelancer index is split across worker processes and their top-k
+        lists are merged (see ai_models.sharding).
+        """
+        from ai_models import sharding
 
-        except FileNotFoundError:
-            # Train model if not found
-            from django.core.management import call_command
-            call_command('train_recommendation_model')
-            return FreelancerRecommendationEngine.recommend_freelancers(task, top_n)
-        except Exception as e:
-            logger.error(f"Error recommending freelancers: {e}")
+        encoder = artifacts['encoder']
+        store = FeatureStore()
+        feature_set = store.load()
+        freelancers = feature_set.freelancers
+        if not len(freelancers):
+            return [[] for _ in tasks]
+
+        task_raw = encoder.transform_raw([task.skills_required for task in tasks])
+        n_shards = sharding.shard_count()
+        min_freelancers = settings.AI_MODEL_CONFIG.get('SHARD_MIN_FREELANCERS', 5000)
+        if n_shards > 1 and len(freelancers) >= min_freelancers:
+            top_lists = sharding.score_sharded(
+                feature_set, store.root, task_raw, top_n, artifacts['label'], n_shards
+            )
+        else:
+            # IDF-weighted freelancer matrix only changes with the store or the
+            # artifacts, so it is cached on the artifacts per store version
+            matrix_cache = artifacts.setdefault('freelancer_vectors', {})
+            freelancer_vectors = matrix_cache.get(feature_set.version)
+            if freelancer_vectors is None:
+                freelancer_vectors = encoder.weight(freelancers.skills).T.tocsr()
+                matrix_cache.clear()
+                matrix_cache[feature_set.version] = freelancer_vectors
+            top_lists = sharding.top_k(freelancers, None, task_raw, top_n, artifacts, freelancer_vectors)
+
+        profiles = FreelancerProfile.objects.select_related('user').in_bulk(
+            {profile_id for top in top_lists for _, profile_id in top}
+        )
+        return [
+            [
+                {'freelancer': profiles[profile_id], 'match_score': score}
+                for score, profile_id in top
+                if profile_id in profiles
+            ]
+            for top in top_lists
+        ]
+
+    @staticmethod
+    def _score_with_orm(task, top_n, artifacts):
+        """
+        Score every freelancer profile against one task with the TF-IDF encoder
+        """
+        from sklearn.metrics.pairwise import cosine_similarity
+
+        model, vectorizer, scaler = artifacts['model'], artifacts['encoder'], artifacts['scaler']
+
+        # Vectorize task skills
+        task_skills_str = ' '.join(task.skills_required)
+        task_vector = vectorizer.transform([task_skills_str])
+
+        # Get all freelancers
+        freelancers = list(FreelancerProfile.objects.select_related('user'))
+        if not freelancers:
             return []
+        freelancer_skills = [' '.join(profile.skill_embedding) for profile in freelancers]
+        freelancer_vectors = vectorizer.transform(freelancer_skills)
+
+        # Compute similarities
+        similarities = cosine_similarity(task_vector, freelancer_vectors)[0]
+
+        # Prepare features for recommendation
+        X_recommend = []
+        for i, freelancer in enumerate(freelancers):
+            X_recommend.append([
+                similarities[i],  # Similarity score
+                freelancer.performance_score,  # Freelancer performance
+                len(set(task.skills_required) & set(freelancer.skill_embedding))  # Skill match
+            ])
+
+        # Scale features
+        X_recommend_scaled = scaler.transform(X_recommend)
+
+        # Predict recommendation scores
+        recommendation_scores = model.predict_proba(X_recommend_scaled)[:, 1]
+
+        # Sort freelancers by recommendation score
+        recommended_indices = recommendation_scores.argsort()[::-1][:top_n]
+        return [
+            {'freelancer': freelancers[idx], 'match_score': float(recommendation_scores[idx])}
+            for idx in recommended_indices
+        ]
+
+    @staticmethod
+    def _score_with_artifacts(tasks, top_n, artifacts):
+        if isinstance(artifacts['encoder'], HashedSkillEncoder):
+            return FreelancerRecommendationEngine._score_with_feature_store(tasks, top_n, artifacts)
+        return [FreelancerRecommendationEngine._score_with_orm(task, top_n, artifacts) for task in tasks]
+
+    @staticmethod
+    def score_freelancers_bulk(tasks, top_n=5, fallback=True):
+        """
+        Score many tasks at once; returns one recommendation list per task.
+
+        Tasks are grouped by the model version serving them and each group
+        is scored in a single pass, so the freelancer matrix (or each shard
+        of it) is traversed once per group rather than once per task.
+
+        With ``fallback`` off, tasks of a group that no model scored (its
+        artifacts are missing or scoring failed) come back as None rather
+        than as the skill-overlap ranking or an empty list.
+        """
+        from ai_models.registry import serve, version_label
+
+        groups = {}
+        for index, task in enumerate(tasks):
+            groups.setdefault(version_label('FREELANCER_REC', task.id), []).append(index)
+
+        results = [None] * len(tasks)
+        for indexes in groups.values():
+            group = [tasks[index] for index in indexes]
+            try:
+                # Every key of the group routes to the same version
+                scored = serve(
+                    'FREELANCER_REC',
+                    group[0].id,
+                    predict=lambda artifacts, group=group: FreelancerRecommendationEngine._score_with_artifacts(
+                        group, top_n, artifacts
+                    ),
+                    describe=lambda recs_per_task: (
+                        [rec['freelancer'].id for recs in recs_per_task for rec in recs],
+                        [rec['match_score'] for recs in recs_per_task for rec in recs],
+                    ),
+                    local=FreelancerRecommendationEngine._load_artifacts,
+                    local_label=FreelancerRecommendationEngine._local_model_version,
+                )
+
+            except FileNotFoundError:
+                # Never train on the request path; queue it and serve a fallback ranking
+                from ai_models.jobs import enqueue_training
+                enqueue_training('FREELANCER_REC')
+                scored = [
+                    FreelancerRecommendationEngine._fallback_recommendations(task, top_n) if fallback else None
+                    for task in group
+                ]
+            except Exception as e:
+                logger.error(f"Error recommending freelancers: {e}")
+                scored = [[] if fallback else None for _ in group]
+
+            for index, recs in zip(indexes, scored):
+                results[index] = recs
+        return results
+
+    @staticmethod
+    def score_freelancers(task, top_n=5):
+        """
+        Recommend top freelancers for a task along with their match scores.
+
+        Returns a list of {'freelancer': FreelancerProfile, 'match_score': float}.
+        The scoring version is picked by ai_models.registry (primary, canary or
+        local artifacts; shadows are scored in the background). When no
+        trained model is available, a background training job is queued
+        and a skill-overlap ranking is returned instead of blocking the caller.
+        """
+        return FreelancerRecommendationEngine.score_freelancers_bulk([task], top_n)[0]
+
+    @staticmethod
+    def recommend_freelancers(task, top_n=5):
+        """
+        Recommend top freelancers for a given task
+        """
+        return [
+            rec['freelancer']
+            for rec in FreelancerRecommendationEngine.score_freelancers(task, top_n)
+        ]
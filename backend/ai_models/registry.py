@@ -0,0 +1,348 @@
+import atexit
+import bisect
+import logging
+import random
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.utils import timezone
+
+from ai_models.models import AIModelVersion, AIModelVersionMetrics
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS_MS = [1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000]
+SCORE_BUCKETS = [i / 10 for i in range(1, 10)]
+
+_shadow_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='ai-shadow')
+_shadow_pending = 0
+
+_routing_cache = {}
+_loaded_versions = {}
+_lock = threading.Lock()
+
+
+def _config(key, default):
+    return settings.AI_MODEL_CONFIG.get(key, default)
+
+
+class Routing:
+    """
+    Registered versions serving one model type: a primary and an optional challenger
+    """
+
+    def __init__(self, primary=None, challenger=None):
+        self.primary = primary
+        self.challenger = challenger
+
+    def serving_version(self, routing_key):
+        """
+        Version answering this key; canaries get a stable slice of keys
+        """
+        challenger = self.challenger
+        if challenger and challenger.role == 'CANARY' and challenger.traffic_percent:
+            if routing_key is None:
+                bucket = random.randrange(100)
+            else:
+                bucket = zlib.crc32(f"{challenger.model_id}:{routing_key}".encode()) % 100
+            if bucket < challenger.traffic_percent:
+                return challenger
+        return self.primary
+
+    def shadow_version(self):
+        if self.challenger and self.challenger.role == 'SHADOW':
+            return self.challenger
+        return None
+
+
+def get_routing(model_type):
+    """
+    Current Routing for a model type, re-read at most every MODEL_ROUTING_TTL seconds
+    """
+    now = time.monotonic()
+    with _lock:
+        cached = _routing_cache.get(model_type)
+    if cached and now - cached[0] < _config('MODEL_ROUTING_TTL', 30):
+        return cached[1]
+
+    versions = {
+        version.role: version
+        for version in AIModelVersion.objects.select_related('model').filter(
+            model__name=model_type, role__in=['PRIMARY', *AIModelVersion.CHALLENGER_ROLES]
+        )
+    }
+    routing = Routing(
+        versions.get('PRIMARY'),
+        versions.get('SHADOW') or versions.get('CANARY'),
+    )
+    # A challenger without a primary has nothing to be compared against
+    if routing.primary is None:
+        routing.challenger = None
+
+    with _lock:
+        _routing_cache[model_type] = (now, routing)
+        # Keep only artifacts of versions that are still routed
+        routed_ids = {
+            version.id for cached_routing in (entry[1] for entry in _routing_cache.values())
+            for version in (cached_routing.primary, cached_routing.challenger) if version
+        }
+        for version_id in list(_loaded_versions):
+            if version_id not in routed_ids:
+                del _loaded_versions[version_id]
+    return routing
+
+
+def clear_routing_cache():
+    with _lock:
+        _routing_cache.clear()
+
+
+def load_version(version):
+    """
+    Artifacts bundled in a registered version's model_file, loaded once
+    and labelled with the version name
+    """
+    import joblib
+
+    with _lock:
+        artifacts = _loaded_versions.get(version.id)
+    if artifacts is None:
+        artifacts = joblib.load(version.model_file.path)
+        artifacts['label'] = version.version
+        with _lock:
+            _loaded_versions[version.id] = artifacts
+    return artifacts
+
+
+def version_label(model_type, routing_key=None, local_label=None):
+    """
+    Label of the version that serves this key, or local_label() without a registry
+    """
+    version = get_routing(model_type).serving_version(routing_key)
+    if version is None:
+        return local_label() if local_label else None
+    return version.version
+
+
+class _Window:
+    """
+    In-memory metrics of one version and role until the next flush
+    """
+
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.latency_ms_sum = 0.0
+        self.latency_histogram = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.score_count = 0
+        self.score_sum = 0.0
+        self.score_sq_sum = 0.0
+        self.score_histogram = [0] * (len(SCORE_BUCKETS) + 1)
+        self.overlap_sum = 0.0
+        self.overlap_count = 0
+
+
+class MetricsRecorder:
+    """
+    Aggregates per-version serving metrics in memory and writes one
+    AIModelVersionMetrics row per version and role every flush interval
+    """
+
+    def __init__(self):
+        self._windows = {}
+        self._window_start = timezone.now()
+        self._lock = threading.Lock()
+
+    def record(self, model_type, label, role, latency_ms, scores=(), overlap=None, error=False):
+        with self._lock:
+            window = self._windows.setdefault((model_type, label, role), _Window())
+            window.requests += 1
+            window.errors += int(error)
+            window.latency_ms_sum += latency_ms
+            window.latency_histogram[bisect.bisect_left(LATENCY_BUCKETS_MS, latency_ms)] += 1
+            for score in scores:
+                window.score_count += 1
+                window.score_sum += score
+                window.score_sq_sum += score * score
+                window.score_histogram[bisect.bisect_right(SCORE_BUCKETS, score)] += 1
+            if overlap is not None:
+                window.overlap_sum += overlap
+                window.overlap_count += 1
+            due = timezone.now() - self._window_start >= timedelta(
+                seconds=_config('MODEL_METRICS_FLUSH_INTERVAL', 60)
+            )
+        if due:
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            windows, self._windows = self._windows, {}
+            window_end = timezone.now()
+            window_start, self._window_start = self._window_start, window_end
+        if not windows:
+            return 0
+
+        AIModelVersionMetrics.objects.bulk_create([
+            AIModelVersionMetrics(
+                model_type=model_type,
+                version_label=label,
+                role=role,
+                window_start=window_start,
+                window_end=window_end,
+                **vars(window),
+            )
+            for (model_type, label, role), window in windows.items()
+        ])
+        return len(windows)
+
+
+metrics = MetricsRecorder()
+atexit.register(metrics.flush)
+
+
+def top_k_overlap(primary_ids, shadow_ids):
+    """
+    Share of the primary's results that the shadow also returned
+    """
+    if not primary_ids:
+        return 1.0 if not shadow_ids else 0.0
+    return len(set(primary_ids) & set(shadow_ids)) / len(primary_ids)
+
+
+def _timed(predict, artifacts):
+    started = time.perf_counter()
+    result = predict(artifacts)
+    return result, (time.perf_counter() - started) * 1000
+
+
+def _run_shadow(model_type, version, predict, describe, primary_ids):
+    global _shadow_pending
+    try:
+        result, latency_ms = _timed(predict, load_version(version))
+        ids, scores = describe(result)
+        metrics.record(
+            model_type, version.version, 'SHADOW', latency_ms,
+            scores=scores, overlap=top_k_overlap(primary_ids, ids),
+        )
+    except Exception as e:
+        logger.error(f"Shadow scoring with {model_type} {version.version} failed: {e}")
+        metrics.record(model_type, version.version, 'SHADOW', 0.0, error=True)
+    finally:
+        with _lock:
+            _shadow_pending -= 1
+        connections.close_all()
+
+
+def serve(model_type, routing_key, predict, describe, local=None, local_label=None):
+    """
+    Answer a request with the routed model version and record its metrics.
+
+    ``predict(artifacts)`` computes the result and ``describe(result)``
+    returns (ids, scores) for metrics. Without a registered primary the
+    artifacts come from ``local()``. A shadow version is run in the
+    background on the same input and never affects the response.
+    """
+    global _shadow_pending
+
+    routing = get_routing(model_type)
+    version = routing.serving_version(routing_key)
+    if version is None:
+        artifacts, label, role = local(), local_label() if local_label else 'local', 'LOCAL'
+    else:
+        artifacts, label, role = load_version(version), version.version, version.role
+
+    try:
+        result, latency_ms = _timed(predict, artifacts)
+    except Exception:
+        metrics.record(model_type, label, role, 0.0, error=True)
+        raise
+
+    ids, scores = describe(result)
+    metrics.record(model_type, label, role, latency_ms, scores=scores)
+
+    shadow = routing.shadow_version()
+    if shadow:
+        with _lock:
+            admit = _shadow_pending < _config('SHADOW_MAX_PENDING', 64)
+            if admit:
+                _shadow_pending += 1
+        # Under load, shadow scoring is shed rather than queued without bound
+        if admit:
+            _shadow_executor.submit(_run_shadow, model_type, shadow, predict, describe, ids)
+
+    return result
+
+
+def assign_role(version, role, traffic_percent=0):
+    """
+    Route a registered version, demoting whichever version held that slot
+    """
+    if role == 'CANARY' and not 0 < traffic_percent <= 100:
+        raise ValueError('A canary needs a traffic percentage between 1 and 100')
+
+    with transaction.atomic():
+        displaced_roles = ['PRIMARY'] if role == 'PRIMARY' else AIModelVersion.CHALLENGER_ROLES
+        if role != 'INACTIVE':
+            AIModelVersion.objects.filter(model=version.model, role__in=displaced_roles).exclude(
+                id=version.id
+            ).update(role='INACTIVE', traffic_percent=0)
+        version.role = role
+        version.traffic_percent = traffic_percent if role == 'CANARY' else 0
+        version.save(update_fields=['role', 'traffic_percent'])
+
+    clear_routing_cache()
+    logger.info(f"{version} now routed as {role}")
+    return version
+
+
+def _histogram_quantile(histogram, bounds, quantile):
+    total = sum(histogram)
+    if not total:
+        return None
+    running = 0
+    for count, bound in zip(histogram, bounds + [float('inf')]):
+        running += count
+        if running >= quantile * total:
+            return bound
+    return float('inf')
+
+
+def summarize_metrics(model_type, since):
+    """
+    Combine metric windows since a moment into one summary per version and role
+    """
+    summary = {}
+    windows = AIModelVersionMetrics.objects.filter(model_type=model_type, window_start__gte=since)
+    for window in windows.iterator():
+        entry = summary.setdefault((window.version_label, window.role), {
+            'requests': 0, 'errors': 0, 'latency_ms_sum': 0.0,
+            'latency_histogram': [0] * (len(LATENCY_BUCKETS_MS) + 1),
+            'score_count': 0, 'score_sum': 0.0, 'score_sq_sum': 0.0,
+            'score_histogram': [0] * (len(SCORE_BUCKETS) + 1),
+            'overlap_sum': 0.0, 'overlap_count': 0,
+        })
+        for field in ['requests', 'errors', 'latency_ms_sum', 'score_count', 'score_sum',
+                      'score_sq_sum', 'overlap_sum', 'overlap_count']:
+            entry[field] += getattr(window, field)
+        for field in ['latency_histogram', 'score_histogram']:
+            entry[field] = [a + b for a, b in zip(entry[field], getattr(window, field))]
+
+    for entry in summary.values():
+        served = entry['requests'] - entry['errors']
+        entry['latency_ms_mean'] = entry['latency_ms_sum'] / served if served else None
+        # Upper bounds of the histogram bucket holding each quantile
+        entry['latency_ms_p50'] = _histogram_quantile(entry['latency_histogram'], LATENCY_BUCKETS_MS, 0.5)
+        entry['latency_ms_p95'] = _histogram_quantile(entry['latency_histogram'], LATENCY_BUCKETS_MS, 0.95)
+        if entry['score_count']:
+            mean = entry['score_sum'] / entry['score_count']
+            entry['score_mean'] = mean
+            entry['score_std'] = max(entry['score_sq_sum'] / entry['score_count'] - mean * mean, 0.0) ** 0.5
+        else:
+            entry['score_mean'] = entry['score_std'] = None
+        entry['overlap_mean'] = entry['overlap_sum'] / entry['overlap_count'] if entry['overlap_count'] else None
+    return summary
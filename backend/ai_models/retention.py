@@ -0,0 +1,124 @@
+import gzip
+import json
+import logging
+import os
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Avg, Count, Max, Min, Q, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from ai_models.models import AIModelTrainingLog, AIModelTrainingRollup
+from ai_models.training_data import decode_training_data
+
+logger = logging.getLogger(__name__)
+
+ARCHIVED_FIELDS = [
+    'id', 'model_type', 'model_version', 'training_data', 'label', 'training_accuracy',
+    'training_loss', 'training_data_size', 'is_used_for_training', 'captured_at',
+]
+
+
+def _day_start(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def retention_cutoff(days=None):
+    """
+    Start of the oldest day kept in the table; only whole days are archived
+    """
+    if days is None:
+        days = settings.AI_MODEL_CONFIG.get('TRAINING_LOG_RETENTION_DAYS', 30)
+    return _day_start(timezone.localdate() - timedelta(days=days))
+
+
+def _bucket_stats(rows):
+    return rows.aggregate(
+        row_count=Count('id'),
+        sample_count=Count('id', filter=Q(label__isnull=False)),
+        positive_count=Count('id', filter=Q(label='1')),
+        run_count=Count('id', filter=Q(training_data_size__isnull=False)),
+        accuracy_count=Count('training_accuracy'),
+        avg_accuracy=Avg('training_accuracy'),
+        min_accuracy=Min('training_accuracy'),
+        max_accuracy=Max('training_accuracy'),
+        loss_count=Count('training_loss'),
+        avg_loss=Avg('training_loss'),
+        training_data_size=Sum('training_data_size'),
+    )
+
+
+def _write_archive(rows, path, chunk_size):
+    """
+    Write rows as gzipped JSON lines, atomically and durably
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp-{os.getpid()}"
+    with open(tmp_path, 'wb') as raw, gzip.open(raw, 'wt', encoding='utf-8') as f:
+        for row in rows.values(*ARCHIVED_FIELDS).order_by('id').iterator(chunk_size=chunk_size):
+            row['training_data'] = decode_training_data(row['training_data'])
+            row['captured_at'] = row['captured_at'].isoformat()
+            f.write(json.dumps(row) + '\n')
+        f.flush()
+        raw.flush()
+        os.fsync(raw.fileno())
+    os.replace(tmp_path, path)
+
+
+def archive_training_logs(cutoff=None, archive_dir=None, chunk_size=5000, dry_run=False):
+    """
+    Move training logs captured before ``cutoff`` out of the table.
+
+    Rows are grouped per model type and day. Each group is written to
+    ``<archive_dir>/<model_type>/<year>/<day>-<max id>.jsonl.gz``, folded
+    into that day's AIModelTrainingRollup and deleted, in one transaction
+    per group. Rows logged late for an already archived day go to a new
+    file on a later run. Returns a summary per group.
+    """
+    cutoff = cutoff or retention_cutoff()
+    archive_dir = str(archive_dir or settings.AI_MODEL_CONFIG['TRAINING_LOG_ARCHIVE_DIR'])
+
+    # Served by the captured_at index; the per-group reads below use (model_type, captured_at)
+    buckets = list(
+        AIModelTrainingLog.objects.filter(captured_at__lt=cutoff)
+        .annotate(day=TruncDate('captured_at'))
+        .values('model_type', 'day')
+        .annotate(max_id=Max('id'), row_count=Count('id'))
+        .order_by('model_type', 'day')
+    )
+
+    summary = []
+    for bucket in buckets:
+        model_type, day, max_id = bucket['model_type'], bucket['day'], bucket['max_id']
+        if dry_run:
+            summary.append({'model_type': model_type, 'day': day, 'rows': bucket['row_count'], 'file': None})
+            continue
+
+        rows = AIModelTrainingLog.objects.filter(
+            model_type=model_type,
+            captured_at__gte=_day_start(day),
+            captured_at__lt=_day_start(day + timedelta(days=1)),
+            id__lte=max_id,
+        )
+        relative_path = os.path.join(model_type, f'{day:%Y}', f'{day.isoformat()}-{max_id}.jsonl.gz')
+
+        with transaction.atomic():
+            stats = _bucket_stats(rows)
+            if not stats['row_count']:
+                continue
+            # Named after the last id, so a retry after a failure rewrites the same file
+            _write_archive(rows, os.path.join(archive_dir, relative_path), chunk_size)
+
+            rollup, _ = AIModelTrainingRollup.objects.select_for_update().get_or_create(
+                model_type=model_type, day=day
+            )
+            rollup.merge(stats, archive_file=relative_path)
+            rollup.save()
+            rows.delete()
+
+        summary.append({'model_type': model_type, 'day': day, 'rows': stats['row_count'], 'file': relative_path})
+        logger.info(f"Archived {stats['row_count']} {model_type} training logs for {day} to {relative_path}")
+
+    return summary
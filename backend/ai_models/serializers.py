@@ -1,5 +1,6 @@
 from rest_framework import serializers
 from .models import AIModelTrainingLog, FreelancerProfile
+from ai_marketplace.serialization import ValuesSerializer, model_fields
 from users.serializers import UserProfileSerializer
 
 class AIModelTrainingLogSerializer(serializers.ModelSerializer):
@@ -13,3 +14,12 @@ class FreelancerProfileSerializer(serializers.ModelSerializer):
     class Meta:
         model = FreelancerProfile
         fields = ['user', 'skill_embedding', 'task_history_embedding', 'performance_score']
+
+# Lean counterparts of the serializers above for list and bulk endpoints
+AIModelTrainingLogValues = ValuesSerializer(AIModelTrainingLog, model_fields(AIModelTrainingLog))
+
+FreelancerProfileValues = ValuesSerializer(
+    FreelancerProfile,
+    [f'user.{field}' for field in UserProfileSerializer.Meta.fields]
+    + ['skill_embedding', 'task_history_embedding', 'performance_score']
+)
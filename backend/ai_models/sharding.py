@@ -0,0 +1,197 @@
+import heapq
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+import django
+import numpy as np
+from django.conf import settings
+
+from ai_models.feature_store import FeatureStore
+
+logger = logging.getLogger(__name__)
+
+# Tasks scored per matrix block, bounding the dense (tasks, freelancers) arrays
+SCORING_BLOCK_SIZE = 256
+
+_pool = None
+_pool_size = 0
+_pool_lock = threading.Lock()
+
+# Model versions a worker keeps loaded: the primary plus a challenger, with room to roll over
+WORKER_ARTIFACT_SLOTS = 3
+
+# Worker-side caches: artifacts by version label, shard row selections and
+# weighted freelancer matrices
+_worker_artifacts = {}
+_shard_rows = {}
+_shard_vectors = {}
+
+
+def shard_count():
+    """
+    Number of scoring shards; RECOMMENDATION_SHARDS may be 'auto' (one per core)
+    """
+    configured = str(settings.AI_MODEL_CONFIG.get('RECOMMENDATION_SHARDS', 0)).strip().lower()
+    if configured == 'auto':
+        return os.cpu_count() or 1
+    return max(int(configured or 0), 1)
+
+
+def _load_artifacts(label):
+    """
+    Recommendation artifacts of the version ``label``, loaded once per worker:
+    the registered AIModelVersion of that name, else the local artifacts
+    """
+    artifacts = _worker_artifacts.get(label)
+    if artifacts is not None:
+        return artifacts
+
+    from ai_models.models import AIModelVersion
+    from ai_models.recommendation import FreelancerRecommendationEngine
+    from ai_models.registry import load_version
+
+    version = AIModelVersion.objects.select_related('model').filter(
+        model__name='FREELANCER_REC', version=label
+    ).first()
+    if version is not None:
+        artifacts = load_version(version)
+    else:
+        artifacts = FreelancerRecommendationEngine._load_artifacts()
+        if artifacts['label'] != label:
+            raise FileNotFoundError(f"Recommendation artifacts {label} are no longer on disk")
+
+    if len(_worker_artifacts) >= WORKER_ARTIFACT_SLOTS:
+        _worker_artifacts.pop(next(iter(_worker_artifacts)))
+    _worker_artifacts[label] = artifacts
+    return artifacts
+
+
+def _init_worker(label):
+    """
+    Pool initializer: set up Django and load the serving version up front
+    """
+    django.setup()
+    try:
+        _load_artifacts(label)
+    except Exception as e:
+        # Retried on the first request for this label
+        logger.warning(f"Shard worker could not preload {label}: {e}")
+
+
+def _get_pool(size, label):
+    """
+    Worker pool with one process per shard, rebuilt when the shard count changes
+    """
+    global _pool, _pool_size
+    with _pool_lock:
+        if _pool is None or _pool_size != size:
+            if _pool is not None:
+                _pool.shutdown(wait=False, cancel_futures=False)
+            # Spawned rather than forked: the parent runs request and worker threads
+            _pool = ProcessPoolExecutor(
+                max_workers=size,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_init_worker,
+                initargs=(label,),
+            )
+            _pool_size = size
+            logger.info(f"Started {size} recommendation shard workers")
+        return _pool
+
+
+def top_k(freelancers, rows, task_raw, top_n, artifacts, freelancer_vectors):
+    """
+    Score ``task_raw`` against the freelancer ``rows`` (all when None) and
+    return, per task, the top_n (score, profile_id) pairs best first
+    """
+    from ai_models.recommendation import FreelancerRecommendationEngine as engine
+
+    model, encoder, scaler = artifacts['model'], artifacts['encoder'], artifacts['scaler']
+    freelancer_raw = freelancers.skills if rows is None else freelancers.skills[rows]
+    profile_ids = np.asarray(freelancers['profile_id'])
+    performance = np.asarray(freelancers['performance_score'])
+    if rows is not None:
+        profile_ids, performance = profile_ids[rows], performance[rows]
+
+    n_rows = freelancer_raw.shape[0]
+    k = min(top_n, n_rows)
+    results = []
+    if not k:
+        return [[] for _ in range(task_raw.shape[0])]
+
+    for start in range(0, task_raw.shape[0], SCORING_BLOCK_SIZE):
+        block = task_raw[start:start + SCORING_BLOCK_SIZE]
+        similarities, skill_matches = engine._skill_matrices(encoder, block, freelancer_raw, freelancer_vectors)
+        X_block = engine._pair_features(
+            similarities.ravel(), np.tile(performance, block.shape[0]), skill_matches.ravel()
+        )
+        scores = model.predict_proba(scaler.transform(X_block))[:, 1].reshape(block.shape[0], n_rows)
+
+        # The k best per task; of scores tied with the k-th best, the first
+        # rows are kept, as a stable full sort would (argpartition picks any)
+        kth = -np.partition(-scores, k - 1, axis=1)[:, k - 1:k]
+        above = scores > kth
+        tied = scores == kth
+        keep = above | (tied & (np.cumsum(tied, axis=1) <= k - above.sum(axis=1, keepdims=True)))
+        top = np.nonzero(keep)[1].reshape(block.shape[0], k)
+        top_scores = np.take_along_axis(scores, top, axis=1)
+        # Best first; ties broken by row order
+        order = np.lexsort((top, -top_scores), axis=1)
+        top = np.take_along_axis(top, order, axis=1)
+        top_scores = np.take_along_axis(top_scores, order, axis=1)
+        results.extend(
+            list(zip(row_scores.tolist(), profile_ids[row_top].tolist()))
+            for row_scores, row_top in zip(top_scores, top)
+        )
+    return results
+
+
+def _score_shard(root, version, shard, n_shards, task_raw, top_n, label):
+    """
+    Worker entry point: top-k of one shard of the freelancer index, scored
+    with the artifacts of version ``label``
+    """
+    artifacts = _load_artifacts(label)
+    freelancers = FeatureStore(root).load(version).freelancers
+
+    rows_key = (root, version, n_shards, shard)
+    rows = _shard_rows.get(rows_key)
+    if rows is None:
+        # Freelancers are sharded by profile id
+        rows = np.flatnonzero(np.asarray(freelancers['profile_id']) % n_shards == shard)
+        _shard_rows.clear()
+        _shard_rows[rows_key] = rows
+
+    vectors_key = rows_key + (label,)
+    freelancer_vectors = _shard_vectors.get(vectors_key)
+    if freelancer_vectors is None:
+        freelancer_vectors = artifacts['encoder'].weight(freelancers.skills[rows]).T.tocsr()
+        _shard_vectors.clear()
+        _shard_vectors[vectors_key] = freelancer_vectors
+
+    return top_k(freelancers, rows, task_raw, top_n, artifacts, freelancer_vectors)
+
+
+def score_sharded(feature_set, root, task_raw, top_n, label, n_shards):
+    """
+    Scatter tasks to every shard worker and merge their top-k lists with a heap.
+
+    Only the task features and the version label cross the process
+    boundary; each worker loads the artifacts of that label itself.
+    """
+    pool = _get_pool(n_shards, label)
+    futures = [
+        pool.submit(_score_shard, root, feature_set.version, shard, n_shards, task_raw, top_n, label)
+        for shard in range(n_shards)
+    ]
+    shard_results = [future.result() for future in futures]
+
+    # Store rows are in profile id order, so ties break as in top_k
+    return [
+        list(islice(heapq.merge(*per_shard, key=lambda pair: (-pair[0], pair[1])), top_n))
+        for per_shard in zip(*shard_results)
+    ]
@@ -0,0 +1,44 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from tasks.models import Task
+
+from .models import FreelancerProfile
+
+User = get_user_model()
+
+# User columns copied into the feature store's freelancer rows
+FEATURE_USER_FIELDS = {'reputation_score', 'total_tasks_completed', 'approval_rate'}
+
+
+def queue_feature_store_refresh():
+    # Imported here: the feature store pulls in numpy and scipy
+    from .feature_store import queue_refresh
+    queue_refresh()
+
+
+@receiver(post_save, sender=FreelancerProfile)
+@receiver(post_delete, sender=FreelancerProfile)
+@receiver(post_save, sender=Task)
+@receiver(post_delete, sender=Task)
+def refresh_features_on_change(sender, **kwargs):
+    """
+    Keep served recommendations in step with profile and task edits
+    """
+    queue_feature_store_refresh()
+
+
+@receiver(post_save, sender=User)
+def refresh_features_on_user_change(sender, instance, created, update_fields=None, **kwargs):
+    """
+    Re-read a freelancer's row when the user columns it copies may have changed
+    """
+    if created or not instance.is_freelancer:
+        return
+    if update_fields is not None and not FEATURE_USER_FIELDS & set(update_fields):
+        return
+    # The profile's updated_at is the incremental refresh watermark
+    if FreelancerProfile.objects.filter(user=instance).update(updated_at=timezone.now()):
+        queue_feature_store_refresh()
@@ -0,0 +1,131 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.utils import timezone
+
+from ai_models.models import RecommendationSnapshot
+
+logger = logging.getLogger(__name__)
+
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='ai-snapshots')
+_pending_task_ids = set()
+_pending_lock = threading.Lock()
+
+
+def serialize_recommendations(recommendations):
+    """
+    Convert scored FreelancerProfiles to the JSON served by the API
+    """
+    return [
+        {
+            'user_id': rec['freelancer'].user.id,
+            'username': rec['freelancer'].user.username,
+            'performance_score': rec['freelancer'].performance_score,
+            'skills': rec['freelancer'].skill_embedding,
+            'match_score': rec['match_score'],
+        }
+        for rec in recommendations
+    ]
+
+
+def build_snapshots(tasks):
+    """
+    Score tasks in one bulk pass and store their snapshots.
+
+    Returns one snapshot per task, or None for tasks no trained model
+    scored (artifacts missing or scoring failed), so fallback and empty
+    rankings are never cached.
+    """
+    from ai_models.recommendation import FreelancerRecommendationEngine
+
+    versions = [FreelancerRecommendationEngine.model_version(task.id) for task in tasks]
+    scorable = [(task, version) for task, version in zip(tasks, versions) if version is not None]
+    if not scorable:
+        return [None] * len(tasks)
+
+    size = settings.AI_MODEL_CONFIG.get('SNAPSHOT_SIZE', 20)
+    scored = FreelancerRecommendationEngine.score_freelancers_bulk(
+        [task for task, _ in scorable], top_n=size, fallback=False
+    )
+    computed_at = timezone.now()
+    snapshots = [
+        RecommendationSnapshot(
+            task=task,
+            model_version=version,
+            recommendations=serialize_recommendations(recommendations),
+            computed_at=computed_at,
+        )
+        for (task, version), recommendations in zip(scorable, scored)
+        if recommendations is not None
+    ]
+    if not snapshots:
+        return [None] * len(tasks)
+    # One upsert for the whole batch
+    RecommendationSnapshot.objects.bulk_create(
+        snapshots,
+        update_conflicts=True,
+        unique_fields=['task'],
+        update_fields=['model_version', 'recommendations', 'computed_at'],
+    )
+
+    by_task = {snapshot.task_id: snapshot for snapshot in snapshots}
+    return [by_task.get(task.id) for task in tasks]
+
+
+def build_snapshot(task):
+    """
+    Score a task with the current model and store its snapshot, or return None
+    """
+    return build_snapshots([task])[0]
+
+
+def _drain_pending():
+    from tasks.models import Task
+
+    try:
+        while True:
+            with _pending_lock:
+                task_ids = list(_pending_task_ids)
+                _pending_task_ids.clear()
+            if not task_ids:
+                return
+
+            batch_size = settings.AI_MODEL_CONFIG.get('SNAPSHOT_BATCH_SIZE', 100)
+            for start in range(0, len(task_ids), batch_size):
+                tasks = list(Task.objects.filter(id__in=task_ids[start:start + batch_size]))
+                try:
+                    build_snapshots(tasks)
+                except Exception as e:
+                    logger.error(f"Error building recommendation snapshots for {len(tasks)} tasks: {e}")
+    finally:
+        connections.close_all()
+
+
+def queue_snapshot_refresh(task_ids):
+    """
+    Rebuild snapshots for the given tasks in the background once the
+    current transaction commits. Repeated requests for the same task
+    before the worker gets to it are coalesced.
+    """
+    def submit():
+        with _pending_lock:
+            schedule = not _pending_task_ids
+            _pending_task_ids.update(task_ids)
+        if schedule:
+            _executor.submit(_drain_pending)
+
+    transaction.on_commit(submit)
+
+
+def refresh_open_task_snapshots():
+    """
+    Rebuild snapshots for every open task, e.g. after a new model is trained
+    """
+    from tasks.models import Task
+
+    queue_snapshot_refresh(
+        list(Task.objects.filter(status='CREATED').values_list('id', flat=True))
+    )
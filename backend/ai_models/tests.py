@@ -1,3 +1,1408 @@
-from django.test import TestCase
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+from datetime import timedelta
+from io import StringIO
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+
+from tasks.models import Task, TaskEvent
+from users.models import CustomUser
+
+from .jobs import enqueue_training
+from .models import AIModelVersionMetrics, FreelancerProfile, TrainingJob
+
+# Only training, scoring and model loading may import these
+ML_MODULES = {'numpy', 'scipy', 'sklearn', 'joblib', 'pandas', 'tensorflow'}
+
+# Opt-in ceiling on the summed import time of the boot script, e.g.
+# BOOT_IMPORT_BUDGET_MS=1200 on a known machine; timings vary too much
+# across machines to enforce by default. It measures around 400 ms
+# without the ML stack and well over 1 s with it
+BOOT_IMPORT_BUDGET_MS = os.environ.get('BOOT_IMPORT_BUDGET_MS')
+
+# Django setup, every URLconf and view, the admin, and the commands that
+# only generate data
+BOOT_SCRIPT = '; '.join([
+    'import django',
+    'django.setup()',
+    'from django.urls import get_resolver',
+    'get_resolver().url_patterns',
+    'import ai_models.management.commands.generate_and_train_data',
+    'import ai_models.management.commands.generate_recommendation_data',
+])
+
+
+class ImportTimeBudgetTest(SimpleTestCase):
+    """
+    Non-AI paths must boot without loading the ML stack
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        env = dict(os.environ)
+        env.setdefault('DJANGO_SETTINGS_MODULE', 'ai_marketplace.settings')
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', BOOT_SCRIPT],
+            cwd=settings.BASE_DIR,
+            env=env,
+            capture_output=True,
+            text=True,
+            timeout=120,
+        )
+        if result.returncode:
+            raise AssertionError(f"Boot script failed:\n{result.stderr[-2000:]}")
+
+        # Lines look like "import time:  <self us> | <cumulative us> | <module>"
+        cls.self_times = {}
+        for line in result.stderr.splitlines():
+            if not line.startswith('import time:') or 'self [us]' in line:
+                continue
+            self_us, _, module = line[len('import time:'):].split('|')
+            cls.self_times[module.strip()] = int(self_us)
+
+    def test_boot_does_not_import_ml_stack(self):
+        loaded = {module.split('.')[0] for module in self.self_times} & ML_MODULES
+        self.assertEqual(loaded, set(), f"Imported during boot: {sorted(loaded)}")
+
+    @skipUnless(BOOT_IMPORT_BUDGET_MS, 'BOOT_IMPORT_BUDGET_MS is not set')
+    def test_boot_import_time_within_budget(self):
+        total_ms = sum(self.self_times.values()) / 1000
+        slowest = sorted(self.self_times.items(), key=lambda item: -item[1])[:10]
+        self.assertLessEqual(
+            total_ms,
+            float(BOOT_IMPORT_BUDGET_MS),
+            f"Boot imports took {total_ms:.0f} ms; slowest: {slowest}",
+        )
+
+
+def make_freelancer(username, skills, performance_score=0.5):
+    user = CustomUser.objects.create_user(username=username, password='pw', is_freelancer=True, skills=skills)
+    return FreelancerProfile.objects.create(user=user, skill_embedding=skills, performance_score=performance_score)
+
+
+def make_task(creator, skills, title='Task'):
+    return Task.objects.create(
+        creator=creator, title=title, description='Description', budget=100, skills_required=skills
+    )
+
+
+SKILL_SETS = [
+    ['python', 'django'], ['python', 'react'], ['react', 'css'], ['java', 'spring'],
+    ['python', 'pandas'], ['go', 'docker'], ['docker', 'kubernetes'], ['css', 'html'],
+]
+
+
+def make_marketplace(n_tasks=12, n_freelancers=8):
+    """
+    A client with open tasks and freelancers covering SKILL_SETS, enough to train on
+    """
+    creator = CustomUser.objects.create_user(username='client', password='pw')
+    freelancers = [
+        make_freelancer(f'freelancer{i}', SKILL_SETS[i % len(SKILL_SETS)], (i % 5) / 5)
+        for i in range(n_freelancers)
+    ]
+    tasks = [
+        make_task(creator, SKILL_SETS[(i * 3) % len(SKILL_SETS)], title=f'Task {i}')
+        for i in range(n_tasks)
+    ]
+    return creator, tasks, freelancers
+
+
+class LocalArtifactsMixin:
+    """
+    Point model artifacts and the feature store at a temporary directory
+    """
+
+    def setUp(self):
+        super().setUp()
+        from . import recommendation, registry
+
+        self.artifact_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.artifact_dir, True)
+        for name in ('MODELS_DIR', 'MODEL_PATH', 'VECTORIZER_PATH', 'SCALER_PATH', 'SKILL_IDF_PATH'):
+            path = getattr(recommendation, name)
+            local_path = self.artifact_dir if name == 'MODELS_DIR' else os.path.join(self.artifact_dir, os.path.basename(path))
+            patcher = mock.patch.object(recommendation, name, local_path)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        config = override_settings(AI_MODEL_CONFIG={
+            **settings.AI_MODEL_CONFIG,
+            'SKILL_ENCODER': 'hashed',
+            'FEATURE_STORE_DIR': os.path.join(self.artifact_dir, 'feature_store'),
+            'FEATURE_STORE_REFRESH_INTERVAL': 0,
+        })
+        config.enable()
+        self.addCleanup(config.disable)
+
+        # Serving metrics go to a recorder of the test's own, never
+        # flushed at exit into the destroyed test database
+        patcher = mock.patch.object(registry, 'metrics', registry.MetricsRecorder())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        recommendation._artifact_cache.clear()
+        registry.clear_routing_cache()
+        self.addCleanup(registry.clear_routing_cache)
+
+
+class TrainingJobTest(LocalArtifactsMixin, TestCase):
+    """
+    Training runs as a single-flight background job
+    """
+
+    def test_one_active_job_per_model_type(self):
+        TrainingJob.objects.create(model_type='FREELANCER_REC')
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            TrainingJob.objects.create(model_type='FREELANCER_REC', status='RUNNING')
+
+        # Finished jobs and other model types are not constrained
+        TrainingJob.objects.create(model_type='FREELANCER_REC', status='FAILED')
+        TrainingJob.objects.create(model_type='WORK_VALIDATION')
+
+    def test_enqueue_reuses_the_active_job(self):
+        job, created = enqueue_training()
+        again, created_again = enqueue_training()
+        self.assertTrue(created)
+        self.assertFalse(created_again)
+        self.assertEqual(again.id, job.id)
+
+    def test_abandoned_job_is_expired(self):
+        stale = TrainingJob.objects.create(
+            model_type='FREELANCER_REC', status='RUNNING', heartbeat_at=timezone.now() - timedelta(days=1)
+        )
+        job, created = enqueue_training()
+        stale.refresh_from_db()
+        self.assertEqual(stale.status, 'FAILED')
+        # A crashed run counts as a failure, so the retry cooldown applies
+        self.assertFalse(created)
+        self.assertEqual(job.id, stale.id)
+
+    def test_recent_failure_is_not_retried(self):
+        failed = TrainingJob.objects.create(model_type='FREELANCER_REC', status='FAILED', finished_at=timezone.now())
+        job, created = enqueue_training()
+        self.assertFalse(created)
+        self.assertEqual(job.id, failed.id)
+
+    def test_missing_model_serves_fallback_and_queues_training(self):
+        from .recommendation import FreelancerRecommendationEngine
+
+        creator = CustomUser.objects.create_user(username='client', password='pw')
+        make_freelancer('full', ['python', 'django'], 0.1)
+        make_freelancer('partial', ['python'], 0.9)
+        make_freelancer('none', ['java'], 1.0)
+        task = make_task(creator, ['python', 'django'])
+        self.assertEqual(FreelancerRecommendationEngine.model_status(), 'unavailable')
+
+        with self.captureOnCommitCallbacks(execute=False):
+            recommendations = FreelancerRecommendationEngine.score_freelancers(task, top_n=2)
+
+        self.assertEqual([rec['freelancer'].user.username for rec in recommendations], ['full', 'partial'])
+        self.assertEqual([rec['match_score'] for rec in recommendations], [1.0, 0.5])
+        self.assertTrue(TrainingJob.objects.filter(model_type='FREELANCER_REC', status='PENDING').exists())
+        self.assertEqual(FreelancerRecommendationEngine.model_status(), 'warming')
+
+
+class RecommendationSnapshotTest(LocalArtifactsMixin, TestCase):
+    """
+    Only rankings scored by a trained model are stored as snapshots
+    """
+
+    def setUp(self):
+        super().setUp()
+        from .recommendation import FreelancerRecommendationEngine
+
+        self.creator, self.tasks, self.freelancers = make_marketplace()
+        FreelancerRecommendationEngine.train_recommendation_model()
+        self.task = self.tasks[0]
+
+    def test_trained_model_snapshot_is_stored(self):
+        from .models import RecommendationSnapshot
+        from .snapshots import build_snapshot
+
+        snapshot = build_snapshot(self.task)
+        self.assertIsNotNone(snapshot)
+        self.assertTrue(snapshot.recommendations)
+        self.assertTrue(RecommendationSnapshot.objects.filter(task=self.task).exists())
+
+    def test_missing_artifact_stores_no_snapshot(self):
+        from . import recommendation
+        from .models import RecommendationSnapshot
+        from .snapshots import build_snapshot
+
+        os.remove(recommendation.SKILL_IDF_PATH)
+        recommendation._artifact_cache.clear()
+
+        with self.captureOnCommitCallbacks(execute=False):
+            self.assertIsNone(build_snapshot(self.task))
+            response = self.client.get(f'/api/tasks/{self.task.id}/recommend/')
+        self.assertFalse(RecommendationSnapshot.objects.exists())
+
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.has_header('ETag'))
+        body = response.json()
+        self.assertEqual(body['model_status'], 'degraded')
+        # The fallback ranking is still served, uncached
+        self.assertTrue(body['recommended_freelancers'])
+
+    def test_scoring_error_stores_no_snapshot(self):
+        from .models import RecommendationSnapshot
+        from .recommendation import FreelancerRecommendationEngine
+        from .snapshots import build_snapshots
+
+        with mock.patch.object(
+            FreelancerRecommendationEngine, '_score_with_artifacts', side_effect=RuntimeError('boom')
+        ), self.assertLogs('ai_models.recommendation', 'ERROR'):
+            self.assertEqual(build_snapshots(self.tasks[:3]), [None, None, None])
+        self.assertFalse(RecommendationSnapshot.objects.exists())
+
+
+class FeatureStoreFreshnessTest(LocalArtifactsMixin, TestCase):
+    """
+    Writes queue background refreshes; requests never build the store
+    """
+
+    def setUp(self):
+        super().setUp()
+        from . import feature_store
+
+        self.feature_store = feature_store
+        patcher = mock.patch.object(feature_store, '_refresh_executor')
+        self.executor = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(setattr, feature_store, '_refresh_pending', False)
+
+    def test_load_never_materializes(self):
+        store = self.feature_store.FeatureStore()
+        with self.assertRaises(FileNotFoundError):
+            store.load()
+        self.assertFalse(os.path.exists(store.root))
+
+    def test_serving_without_store_falls_back(self):
+        from .recommendation import FreelancerRecommendationEngine
+
+        creator, tasks, _ = make_marketplace()
+        FreelancerRecommendationEngine.train_recommendation_model()
+        store = self.feature_store.FeatureStore()
+        shutil.rmtree(store.root)
+
+        with self.captureOnCommitCallbacks(execute=False):
+            recommendations = FreelancerRecommendationEngine.score_freelancers(tasks[0], top_n=3)
+        self.assertFalse(os.path.exists(store.root))
+        task_skills = set(tasks[0].skills_required)
+        # The skill-overlap fallback ranking
+        self.assertEqual(
+            [rec['match_score'] for rec in recommendations],
+            [len(task_skills & set(rec['freelancer'].skill_embedding)) / len(task_skills) for rec in recommendations],
+        )
+
+    def test_writes_queue_one_coalesced_refresh(self):
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            creator, tasks, freelancers = make_marketplace(n_tasks=2, n_freelancers=2)
+            freelancers[0].performance_score = 0.9
+            freelancers[0].save()
+            tasks[1].delete()
+        self.assertTrue(callbacks)
+        self.executor.submit.assert_called_once_with(self.feature_store._run_queued_refresh)
+
+    def test_tfidf_encoder_queues_nothing(self):
+        with self.settings(AI_MODEL_CONFIG={**settings.AI_MODEL_CONFIG, 'SKILL_ENCODER': 'tfidf'}):
+            with self.captureOnCommitCallbacks(execute=True):
+                make_marketplace(n_tasks=1, n_freelancers=1)
+        self.executor.submit.assert_not_called()
+
+    def test_user_stat_changes_mark_the_profile(self):
+        profile = make_freelancer('freelancer', ['python'])
+        user = profile.user
+        FreelancerProfile.objects.filter(pk=profile.pk).update(updated_at=timezone.now() - timedelta(days=1))
+        stale = FreelancerProfile.objects.get(pk=profile.pk).updated_at
+
+        user.first_name = 'Renamed'
+        user.save(update_fields=['first_name'])
+        self.assertEqual(FreelancerProfile.objects.get(pk=profile.pk).updated_at, stale)
+
+        user.total_tasks_completed = 3
+        user.save(update_fields=['total_tasks_completed'])
+        self.assertGreater(FreelancerProfile.objects.get(pk=profile.pk).updated_at, stale)
+
+    def test_queued_refresh_serves_new_freelancers(self):
+        from .recommendation import FreelancerRecommendationEngine
+
+        creator, tasks, _ = make_marketplace()
+        FreelancerRecommendationEngine.train_recommendation_model()
+        newcomer = make_freelancer('newcomer', ['rust', 'wasm'], 1.0)
+        task = make_task(creator, ['rust', 'wasm'])
+
+        def served():
+            return [rec['freelancer'].id for rec in FreelancerRecommendationEngine.score_freelancers(task, top_n=3)]
+
+        self.assertNotIn(newcomer.id, served())
+        self.feature_store._run_queued_refresh()
+        self.assertEqual(served()[0], newcomer.id)
+
+
+def reference_ranking_metrics(scores, relevance, ks):
+    """
+    ranking_metrics computed one row at a time from a full sort
+    """
+    import math
+
+    totals = {}
+    for row_scores, row_relevance in zip(scores.tolist(), relevance.tolist()):
+        ranked = sorted(range(len(row_scores)), key=lambda j: -row_scores[j])
+        gains = [int(row_relevance[j]) for j in ranked]
+        n_relevant = sum(gains)
+        for k in ks:
+            top = gains[:k]
+            dcg = sum(gain / math.log2(position + 2) for position, gain in enumerate(top))
+            idcg = sum(1 / math.log2(position + 2) for position in range(min(n_relevant, len(top))))
+            precision_sum = sum(sum(top[:position + 1]) / (position + 1) for position, gain in enumerate(top) if gain)
+            for name, value in (
+                (f'ndcg@{k}', dcg / idcg),
+                (f'recall@{k}', sum(top) / n_relevant),
+                (f'map@{k}', precision_sum / min(n_relevant, len(top))),
+            ):
+                totals[name] = totals.get(name, 0.0) + value
+    return totals
+
+
+class RankingMetricsTest(SimpleTestCase):
+    """
+    Offline ranking metrics agree with their textbook definitions
+    """
+
+    def test_hand_computed_row(self):
+        import numpy as np
+        from .evaluation import ranking_metrics
+
+        # Ranked 0, 1, 3, 2; the only relevant freelancer comes second
+        scores = np.array([[0.9, 0.8, 0.1, 0.3]])
+        relevance = np.array([[False, True, False, False]])
+        metrics = ranking_metrics(scores, relevance, (1, 3))
+
+        self.assertEqual(metrics['ndcg@1'], 0.0)
+        self.assertEqual(metrics['recall@1'], 0.0)
+        self.assertEqual(metrics['map@1'], 0.0)
+        self.assertAlmostEqual(metrics['ndcg@3'], 1 / np.log2(3))
+        self.assertEqual(metrics['recall@3'], 1.0)
+        self.assertAlmostEqual(metrics['map@3'], 0.5)
+
+    def test_perfect_ranking_scores_one(self):
+        import numpy as np
+        from .evaluation import ranking_metrics
+
+        scores = np.array([[0.9, 0.8, 0.1], [0.2, 0.1, 0.7]])
+        relevance = np.array([[True, True, False], [False, False, True]])
+        metrics = ranking_metrics(scores, relevance, (2,))
+        # Summed over the two rows
+        self.assertEqual(metrics, {'ndcg@2': 2.0, 'recall@2': 2.0, 'map@2': 2.0})
+
+    def test_matches_reference_on_random_blocks(self):
+        import numpy as np
+        from .evaluation import ranking_metrics
+
+        rng = np.random.default_rng(7)
+        for n_freelancers in (3, 12, 40):
+            scores = rng.random((25, n_freelancers))
+            relevance = rng.random((25, n_freelancers)) < 0.2
+            relevance[np.arange(25), rng.integers(0, n_freelancers, 25)] = True
+            # k above the number of freelancers is cut to the whole ranking
+            ks = (1, 5, 10, 20)
+
+            metrics = ranking_metrics(scores, relevance, ks)
+            expected = reference_ranking_metrics(scores, relevance, ks)
+            self.assertEqual(set(metrics), set(expected))
+            for name, value in expected.items():
+                self.assertAlmostEqual(metrics[name], value, places=9, msg=f'{name} with {n_freelancers} freelancers')
+
+
+class ModelRoutingTest(LocalArtifactsMixin, TestCase):
+    """
+    Registered versions are routed by role and swapped atomically
+    """
+
+    def setUp(self):
+        super().setUp()
+        from .models import AIModel
+
+        self.model = AIModel.objects.create(name='FREELANCER_REC')
+        self.v1, self.v2, self.v3 = [self.model.versions.create(version=f'v{i}') for i in (1, 2, 3)]
+
+    def roles(self):
+        return dict(self.model.versions.values_list('version', 'role'))
+
+    def test_assign_role_demotes_the_previous_holder(self):
+        from .registry import assign_role
+
+        assign_role(self.v1, 'PRIMARY')
+        assign_role(self.v2, 'SHADOW')
+        self.assertEqual(self.roles(), {'v1': 'PRIMARY', 'v2': 'SHADOW', 'v3': 'INACTIVE'})
+
+        # A canary takes the challenger slot from the shadow
+        assign_role(self.v3, 'CANARY', traffic_percent=25)
+        self.assertEqual(self.roles(), {'v1': 'PRIMARY', 'v2': 'INACTIVE', 'v3': 'CANARY'})
+
+        assign_role(self.v2, 'PRIMARY')
+        self.assertEqual(self.roles(), {'v1': 'INACTIVE', 'v2': 'PRIMARY', 'v3': 'CANARY'})
+        self.v3.refresh_from_db()
+        self.assertEqual(self.v3.traffic_percent, 25)
+
+        assign_role(self.v3, 'INACTIVE')
+        self.v3.refresh_from_db()
+        self.assertEqual((self.v3.role, self.v3.traffic_percent), ('INACTIVE', 0))
+        self.assertEqual(self.roles()['v2'], 'PRIMARY')
+
+    def test_canary_needs_a_traffic_share(self):
+        from .registry import assign_role
+
+        for percent in (0, 101):
+            with self.assertRaises(ValueError):
+                assign_role(self.v1, 'CANARY', traffic_percent=percent)
+        self.assertEqual(set(self.roles().values()), {'INACTIVE'})
+
+    def test_routing_is_cached_until_a_role_changes(self):
+        from .registry import assign_role, get_routing
+
+        assign_role(self.v1, 'PRIMARY')
+        self.assertEqual(get_routing('FREELANCER_REC').primary, self.v1)
+        with self.assertNumQueries(0):
+            get_routing('FREELANCER_REC')
+
+        # Changed behind the registry's back: the cached routing stands
+        self.model.versions.filter(id=self.v1.id).update(role='INACTIVE')
+        self.assertEqual(get_routing('FREELANCER_REC').primary, self.v1)
+
+        assign_role(self.v2, 'PRIMARY')
+        self.assertEqual(get_routing('FREELANCER_REC').primary, self.v2)
+
+    def test_challenger_without_primary_is_not_routed(self):
+        from .registry import assign_role, get_routing
+
+        assign_role(self.v2, 'SHADOW')
+        routing = get_routing('FREELANCER_REC')
+        self.assertIsNone(routing.primary)
+        self.assertIsNone(routing.challenger)
+
+    def test_canary_gets_a_stable_share_of_keys(self):
+        from .registry import Routing
+
+        self.v2.role, self.v2.traffic_percent = 'CANARY', 30
+        routing = Routing(self.v1, self.v2)
+        served = {key: routing.serving_version(key) for key in range(2000)}
+
+        canary_share = sum(version == self.v2 for version in served.values()) / len(served)
+        self.assertAlmostEqual(canary_share, 0.3, delta=0.05)
+        self.assertTrue(all(routing.serving_version(key) == version for key, version in served.items()))
+        self.assertIsNone(routing.shadow_version())
+
+    def test_shadow_never_serves(self):
+        from .registry import Routing
+
+        self.v2.role = 'SHADOW'
+        routing = Routing(self.v1, self.v2)
+        self.assertTrue(all(routing.serving_version(key) == self.v1 for key in range(200)))
+        self.assertEqual(routing.shadow_version(), self.v2)
+
+    def test_serve_answers_with_primary_and_queues_shadow(self):
+        from . import registry
+
+        registry.assign_role(self.v1, 'PRIMARY')
+        registry.assign_role(self.v2, 'SHADOW')
+        artifacts = {self.v1.id: 'primary artifacts', self.v2.id: 'shadow artifacts'}
+        self.addCleanup(setattr, registry, '_shadow_pending', registry._shadow_pending)
+
+        def predict(loaded):
+            return [loaded]
+
+        def describe(result):
+            return [1, 2], [0.5]
+
+        with mock.patch.object(registry, 'load_version', lambda version: artifacts[version.id]):
+            with mock.patch.object(registry, '_shadow_executor') as shadow_executor:
+                result = registry.serve('FREELANCER_REC', 7, predict, describe)
+
+        self.assertEqual(result, ['primary artifacts'])
+        shadow_executor.submit.assert_called_once_with(
+            registry._run_shadow, 'FREELANCER_REC', self.v2, predict, describe, [1, 2]
+        )
+        self.assertEqual(registry.metrics.flush(), 1)
+        window = AIModelVersionMetrics.objects.get()
+        self.assertEqual((window.version_label, window.role, window.requests), ('v1', 'PRIMARY', 1))
+
+    def test_serve_without_registry_uses_local_artifacts(self):
+        from . import registry
+
+        result = registry.serve(
+            'FREELANCER_REC', None, lambda loaded: loaded, lambda result: ([], []),
+            local=lambda: 'local artifacts', local_label=lambda: 'local-1',
+        )
+        self.assertEqual(result, 'local artifacts')
+        registry.metrics.flush()
+        self.assertEqual(
+            list(AIModelVersionMetrics.objects.values_list('version_label', 'role')), [('local-1', 'LOCAL')]
+        )
+
+
+class PartialScoringTest(LocalArtifactsMixin, TestCase):
+    """
+    A version group that fails to score is told apart from real rankings
+    """
+
+    def setUp(self):
+        super().setUp()
+        from . import registry
+        from .models import AIModel
+        from .recommendation import FreelancerRecommendationEngine
+
+        self.creator, self.tasks, self.freelancers = make_marketplace()
+        FreelancerRecommendationEngine.train_recommendation_model()
+
+        model = AIModel.objects.create(name='FREELANCER_REC')
+        self.primary = registry.assign_role(model.versions.create(version='v1'), 'PRIMARY')
+        self.canary = registry.assign_role(model.versions.create(version='v2'), 'CANARY', traffic_percent=50)
+
+        # The canary's artifact is broken; the primary serves the local one
+        def load_version(version):
+            if version == self.canary:
+                raise RuntimeError('corrupt artifact')
+            return FreelancerRecommendationEngine._load_artifacts()
+
+        patcher = mock.patch.object(registry, 'load_version', load_version)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        routing = registry.get_routing('FREELANCER_REC')
+        self.canary_task_ids = {task.id for task in self.tasks if routing.serving_version(task.id) == self.canary}
+        self.assertTrue(0 < len(self.canary_task_ids) < len(self.tasks))
+
+    def test_failed_group_is_none_without_fallback(self):
+        from .recommendation import FreelancerRecommendationEngine
+
+        with self.assertLogs('ai_models.recommendation', 'ERROR'):
+            scored = FreelancerRecommendationEngine.score_freelancers_bulk(self.tasks, fallback=False)
+            with_fallback = FreelancerRecommendationEngine.score_freelancers_bulk(self.tasks)
+
+        for task, recommendations, fallback_recommendations in zip(self.tasks, scored, with_fallback):
+            if task.id in self.canary_task_ids:
+                self.assertIsNone(recommendations)
+                self.assertEqual(fallback_recommendations, [])
+            else:
+                self.assertTrue(recommendations)
+
+    def test_assignment_leaves_unscored_tasks_open(self):
+        from .assignment import assign_open_tasks
+
+        with self.assertLogs('ai_models', 'WARNING'):
+            stats = assign_open_tasks(max_active=len(self.tasks))
+
+        self.assertEqual(stats['unscored'], len(self.canary_task_ids))
+        self.assertEqual(stats['assigned'], len(self.tasks) - len(self.canary_task_ids))
+        assigned = set(Task.objects.filter(status='ASSIGNED').values_list('id', flat=True))
+        self.assertEqual(assigned, {task.id for task in self.tasks} - self.canary_task_ids)
+
+
+class HashedSkillEncoderTest(SimpleTestCase):
+    """
+    Feature-hashed skill encodings are stateless, stable and finite
+    """
+
+    SKILLS = [['python', 'django'], ['python', 'react', 'css'], ['go'], []]
+
+    def colliding_skills(self, n_features, opposite):
+        """
+        Two skills sharing a bucket of an n_features encoder, with opposite or equal signs
+        """
+        from .encoding import HashedSkillEncoder
+
+        encoder = HashedSkillEncoder(n_features=n_features)
+        seen = {}
+        for i in range(1000):
+            skill = f'skill{i}'
+            bucket, sign = encoder._buckets(skill)
+            other = seen.get((bucket, -sign if opposite else sign))
+            if other:
+                return other, skill
+            seen.setdefault((bucket, sign), skill)
+        self.fail('No colliding skills found')
+
+    def test_transform_is_deterministic_across_instances(self):
+        import numpy as np
+
+        from .encoding import HashedSkillEncoder
+
+        first, second = HashedSkillEncoder(), HashedSkillEncoder()
+        encoded = first.transform(self.SKILLS)
+        np.testing.assert_array_equal(encoded.toarray(), second.transform(self.SKILLS).toarray())
+        # Rows don't depend on the batch they are encoded in
+        for row, skills in enumerate(self.SKILLS):
+            np.testing.assert_array_equal(encoded[row].toarray(), second.transform([skills]).toarray())
+        # Names are normalized before hashing
+        np.testing.assert_array_equal(
+            first.transform([[' Python ', 'DJANGO']]).toarray(), encoded[0].toarray()
+        )
+        self.assertEqual(encoded[3].nnz, 0)
+
+    def test_unseen_skill_encodes_after_fit(self):
+        import numpy as np
+
+        from .encoding import HashedSkillEncoder
+
+        encoder = HashedSkillEncoder().fit(self.SKILLS)
+        encoded = encoder.transform([['rust'], ['rust', 'python']])
+        self.assertEqual(encoded[0].nnz, 1)
+        self.assertAlmostEqual(float(np.abs(encoded[0].data).sum()), 1.0, places=6)
+
+        # A never-seen bucket gets the largest IDF: rarer than any fitted skill
+        bucket, _ = encoder._buckets('rust')
+        self.assertAlmostEqual(float(encoder.idf[bucket]), np.log(len(self.SKILLS) + 1) + 1, places=5)
+        self.assertGreater(abs(encoded[1, bucket]), abs(encoded[1, encoder._buckets('python')[0]]))
+
+    def test_idf_survives_save_and_load(self):
+        import numpy as np
+
+        from .encoding import HashedSkillEncoder
+
+        encoder = HashedSkillEncoder(n_features=64).fit(self.SKILLS)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'skill_idf.npy')
+            encoder.save(path)
+            loaded = HashedSkillEncoder.load(path)
+
+        self.assertEqual(loaded.n_features, 64)
+        self.assertEqual(loaded.idf.dtype, np.float32)
+        np.testing.assert_array_equal(loaded.idf, encoder.idf)
+        np.testing.assert_array_equal(loaded.transform(self.SKILLS).toarray(), encoder.transform(self.SKILLS).toarray())
+
+    def test_collisions_stay_finite(self):
+        import numpy as np
+
+        from .encoding import HashedSkillEncoder
+
+        encoder = HashedSkillEncoder(n_features=8)
+        cancelling = self.colliding_skills(8, opposite=True)
+        doubling = self.colliding_skills(8, opposite=False)
+        encoder.fit([cancelling, doubling, ['python']])
+
+        encoded = encoder.transform([cancelling, doubling, [*cancelling, 'python']])
+        self.assertTrue(np.isfinite(encoded.toarray()).all())
+        # Opposite signs cancel to an empty row rather than 0 / 0
+        self.assertEqual(encoded[0].nnz, 0)
+        self.assertEqual(encoded[1].nnz, 1)
+        self.assertAlmostEqual(float(np.abs(encoded[1].data).sum()), 1.0, places=6)
+        np.testing.assert_array_equal(encoded[2].toarray(), encoder.transform([['python']]).toarray())
+
+
+class TrainingLogExportTest(TestCase):
+    """
+    Training logs survive an export, memory-mapped load and import
+    """
+
+    def setUp(self):
+        from .models import AIModelTrainingLog
+
+        self.export_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.export_dir, True)
+        self.since = timezone.now() - timedelta(days=2)
+        self.until = self.since + timedelta(days=1)
+
+        def at(minutes):
+            return self.since + timedelta(minutes=minutes)
+
+        self.samples = [([i, i + 0.25, 2.5 * i], str(i % 2)) for i in range(5)]
+        AIModelTrainingLog.objects.bulk_create([
+            AIModelTrainingLog(model_type='FREELANCER_REC', training_data=features, label=label, captured_at=at(i))
+            for i, (features, label) in enumerate(self.samples[:4])
+        ])
+        # save() double-encodes training_data; the export decodes it
+        AIModelTrainingLog.objects.create(
+            model_type='FREELANCER_REC', training_data=self.samples[4][0], label=self.samples[4][1], captured_at=at(10)
+        )
+
+        AIModelTrainingLog.objects.bulk_create([
+            # Skipped: a training run's summary row and a sample of another width
+            AIModelTrainingLog(
+                model_type='FREELANCER_REC', training_data={'tasks_count': 3}, training_accuracy=0.9,
+                captured_at=at(20),
+            ),
+            AIModelTrainingLog(model_type='FREELANCER_REC', training_data=[1.0, 2.0], label='1', captured_at=at(30)),
+            # Outside the bounds, or of another model type
+            AIModelTrainingLog(
+                model_type='FREELANCER_REC', training_data=[9.0, 9.0, 9.0], label='1',
+                captured_at=self.since - timedelta(seconds=1),
+            ),
+            AIModelTrainingLog(
+                model_type='FREELANCER_REC', training_data=[9.0, 9.0, 9.0], label='1', captured_at=self.until,
+            ),
+            AIModelTrainingLog(model_type='WORK_VALIDATION', training_data=[9.0, 9.0, 9.0], label='1', captured_at=at(5)),
+        ])
+
+    def test_round_trip(self):
+        import numpy as np
+
+        from .models import AIModelTrainingLog
+        from .training_data import export_training_logs, import_training_logs, labels_path, load_training_logs
+
+        path = os.path.join(self.export_dir, 'samples.npy')
+        metadata = export_training_logs(path, 'FREELANCER_REC', since=self.since, until=self.until, chunk_size=2)
+        self.assertEqual((metadata['rows'], metadata['skipped'], metadata['n_features']), (5, 2, 3))
+        self.assertEqual(metadata['arrays'], {
+            'X': {'file': 'samples.npy', 'dtype': 'float32', 'shape': [5, 3]},
+            'y': {'file': 'samples.labels.npy', 'dtype': 'float32', 'shape': [5]},
+        })
+        self.assertTrue(os.path.exists(labels_path(path)))
+
+        X, y, loaded = load_training_logs(path)
+        self.assertEqual(loaded, metadata)
+        # Each array is its own contiguous memory map, not a strided view
+        for array in (X, y):
+            self.assertIsInstance(array, np.memmap)
+            self.assertEqual(array.dtype, np.float32)
+            self.assertTrue(array.flags['C_CONTIGUOUS'])
+        np.testing.assert_array_equal(X, [features for features, _ in self.samples])
+        np.testing.assert_array_equal(y, [float(label) for _, label in self.samples])
+
+        AIModelTrainingLog.objects.all().delete()
+        self.assertEqual(import_training_logs(path, batch_size=2), 5)
+        imported = AIModelTrainingLog.objects.order_by('id')
+        self.assertEqual(
+            [(log.model_type, log.training_data, log.label) for log in imported],
+            [('FREELANCER_REC', features, label) for features, label in self.samples],
+        )
+
+    def test_empty_export(self):
+        from .training_data import export_training_logs, load_training_logs
+
+        path = os.path.join(self.export_dir, 'empty.npy')
+        metadata = export_training_logs(path, 'FREELANCER_REC', until=self.since - timedelta(days=1))
+        X, y, _ = load_training_logs(path)
+        self.assertEqual((metadata['rows'], X.shape, y.shape), (0, (0, 0), (0,)))
+
+
+class TrainingLogWriterTest(TestCase):
+    """
+    Buffered training logs are written by size, on flush and at exit
+    """
+
+    def add(self, writer, n):
+        for i in range(n):
+            writer.add(model_type='FREELANCER_REC', training_data=[float(i)], label='1')
+
+    def test_flushes_when_full(self):
+        from .models import AIModelTrainingLog
+        from .training_data import TrainingLogWriter
+
+        writer = TrainingLogWriter(batch_size=3, flush_interval=0)
+        self.add(writer, 2)
+        self.assertFalse(AIModelTrainingLog.objects.exists())
+        self.add(writer, 1)
+        self.assertEqual(AIModelTrainingLog.objects.count(), 3)
+        self.assertIsNone(writer._timer)
+
+    def test_explicit_flush_and_context_manager(self):
+        from .models import AIModelTrainingLog
+        from .training_data import TrainingLogWriter
+
+        writer = TrainingLogWriter(batch_size=100, flush_interval=0)
+        self.add(writer, 2)
+        with self.assertNumQueries(1):
+            self.assertEqual(writer.flush(), 2)
+        self.assertEqual(writer.flush(), 0)
+
+        with TrainingLogWriter(batch_size=100, flush_interval=0) as scoped:
+            self.add(scoped, 3)
+            self.assertEqual(AIModelTrainingLog.objects.count(), 2)
+        self.assertEqual(AIModelTrainingLog.objects.count(), 5)
+        # Written as plain lists, not re-encoded like save() does
+        self.assertEqual(AIModelTrainingLog.objects.filter(training_data=[1.0]).count(), 2)
+
+    def test_process_writer_flushes_at_exit(self):
+        from . import training_data
+
+        with mock.patch.object(training_data, '_writer', None):
+            with mock.patch.object(training_data.atexit, 'register') as register:
+                writer = training_data.get_training_log_writer()
+                self.assertIs(training_data.get_training_log_writer(), writer)
+        register.assert_called_once_with(writer.flush)
+
+    def test_validate_task_logs_through_the_writer(self):
+        from . import training_data
+        from .models import AIModelTrainingLog
+        from tasks.models import TaskSubmission
+
+        creator = CustomUser.objects.create_user(username='client', password='pw')
+        freelancer = CustomUser.objects.create_user(username='freelancer', password='pw', is_freelancer=True)
+        task = make_task(creator, ['python'])
+        submissions = [
+            TaskSubmission.objects.create(task=task, freelancer=freelancer, submission_text='Done')
+            for _ in range(3)
+        ]
+        self.client.force_login(creator)
+
+        writer = training_data.TrainingLogWriter(batch_size=100, flush_interval=0)
+        with mock.patch.object(training_data, '_writer', writer):
+            for submission, status in zip(submissions, ('APPROVED', 'REJECTED', 'PENDING')):
+                response = self.client.post(
+                    f'/api/tasks/{task.id}/validate/',
+                    {'submission_id': submission.id, 'status': status}, content_type='application/json',
+                )
+                self.assertEqual(response.status_code, 200)
+
+        # Buffered rather than inserted on the request
+        self.assertFalse(AIModelTrainingLog.objects.exists())
+        self.assertEqual(writer.flush(), 2)
+        logs = AIModelTrainingLog.objects.order_by('id')
+        self.assertEqual([log.label for log in logs], ['1', '0'])
+        self.assertEqual([len(log.training_data) for log in logs], [5, 5])
+
+
+class TrainingLogWriterTimerTest(TransactionTestCase):
+    """
+    A partial batch is written by the timer once flush_interval passes.
+
+    The timer thread inserts on its own connection, which only sees
+    committed rows, hence no wrapping transaction.
+    """
+
+    def test_flushes_on_the_timer(self):
+        from .models import AIModelTrainingLog
+        from .training_data import TrainingLogWriter
+
+        writer = TrainingLogWriter(batch_size=100, flush_interval=0.05)
+        writer.add(model_type='FREELANCER_REC', training_data=[1.0], label='1')
+        timer = writer._timer
+        # One timer covers the oldest buffered row
+        writer.add(model_type='FREELANCER_REC', training_data=[2.0], label='0')
+        self.assertIs(writer._timer, timer)
+
+        timer.join(5)
+        self.assertEqual(AIModelTrainingLog.objects.count(), 2)
+        self.assertIsNone(writer._timer)
+
+
+class TrainingLogRetentionTest(TestCase):
+    """
+    Old training logs are archived, rolled up per day and deleted
+    """
+
+    def setUp(self):
+        self.archive_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.archive_dir, True)
+        today = timezone.localdate()
+        self.old_day = today - timedelta(days=40)
+        self.other_day = today - timedelta(days=35)
+
+    def at_noon(self, day):
+        from .retention import _day_start
+        return _day_start(day) + timedelta(hours=12)
+
+    def seed(self, model_type, day, labels=(), runs=()):
+        """
+        Samples with the given labels and training runs as (accuracy, loss, size)
+        """
+        from .models import AIModelTrainingLog
+
+        captured_at = self.at_noon(day)
+        logs = [
+            AIModelTrainingLog(
+                model_type=model_type, training_data=[0.5, float(i)], label=label, captured_at=captured_at
+            )
+            for i, label in enumerate(labels)
+        ] + [
+            AIModelTrainingLog(
+                model_type=model_type, training_data={'tasks_count': 3}, training_accuracy=accuracy,
+                training_loss=loss, training_data_size=size, is_used_for_training=True, captured_at=captured_at,
+            )
+            for accuracy, loss, size in runs
+        ]
+        return AIModelTrainingLog.objects.bulk_create(logs)
+
+    def archive(self):
+        from django.core.management import call_command
+
+        call_command('archive_training_logs', days=30, archive_dir=self.archive_dir, stdout=StringIO())
+
+    def archived_rows(self, relative_path):
+        import gzip
+
+        with gzip.open(os.path.join(self.archive_dir, relative_path), 'rt', encoding='utf-8') as f:
+            return [json.loads(line) for line in f]
+
+    def test_archive_and_merge(self):
+        from .models import AIModelTrainingLog, AIModelTrainingRollup
+
+        old = self.seed('FREELANCER_REC', self.old_day, labels=['1', '1', '0'], runs=[(0.8, 0.3, 100)])
+        old += self.seed('FREELANCER_REC', self.other_day, labels=['1'], runs=[(0.6, None, 50)])
+        old += self.seed('WORK_VALIDATION', self.old_day, labels=['0'])
+        recent = self.seed('FREELANCER_REC', timezone.localdate() - timedelta(days=1), labels=['1'], runs=[(0.9, 0.1, 10)])
+        recent += self.seed('WORK_VALIDATION', timezone.localdate(), labels=['1'])
+
+        self.archive()
+
+        self.assertEqual(
+            set(AIModelTrainingLog.objects.values_list('id', flat=True)), {log.id for log in recent}
+        )
+        rollups = {(rollup.model_type, rollup.day): rollup for rollup in AIModelTrainingRollup.objects.all()}
+        self.assertEqual(set(rollups), {
+            ('FREELANCER_REC', self.old_day), ('FREELANCER_REC', self.other_day), ('WORK_VALIDATION', self.old_day),
+        })
+
+        # Every deleted row is in exactly one archive, decoded as logged
+        archived = {}
+        for rollup in rollups.values():
+            self.assertEqual(len(rollup.archive_files), 1)
+            rows = self.archived_rows(rollup.archive_files[0])
+            self.assertEqual(len(rows), rollup.row_count)
+            for row in rows:
+                self.assertEqual((row['model_type'], row['captured_at'][:10]), (rollup.model_type, str(rollup.day)))
+                archived[row['id']] = row
+        self.assertEqual(set(archived), {log.id for log in old})
+        for log in old:
+            self.assertEqual(archived[log.id]['training_data'], log.training_data)
+            self.assertEqual(archived[log.id]['label'], log.label)
+
+        rollup = rollups['FREELANCER_REC', self.old_day]
+        self.assertEqual(
+            (rollup.row_count, rollup.sample_count, rollup.positive_count, rollup.run_count),
+            (4, 3, 2, 1),
+        )
+        self.assertEqual((rollup.accuracy_count, rollup.loss_count, rollup.training_data_size), (1, 1, 100))
+        self.assertAlmostEqual(rollup.avg_accuracy, 0.8)
+        self.assertAlmostEqual(rollup.avg_loss, 0.3)
+        other = rollups['FREELANCER_REC', self.other_day]
+        self.assertEqual((other.row_count, other.loss_count, other.avg_loss), (2, 0, None))
+        validation = rollups['WORK_VALIDATION', self.old_day]
+        self.assertEqual((validation.row_count, validation.positive_count, validation.avg_accuracy), (1, 0, None))
+
+        # Rows logged late for an archived day are merged into its rollup
+        late = self.seed('FREELANCER_REC', self.old_day, labels=['1'], runs=[(0.4, 0.5, 20)])
+        self.archive()
+        # Nothing left to archive: a further run changes nothing
+        self.archive()
+
+        rollup.refresh_from_db()
+        self.assertEqual(
+            (rollup.row_count, rollup.sample_count, rollup.positive_count, rollup.run_count),
+            (6, 4, 3, 2),
+        )
+        self.assertEqual((rollup.accuracy_count, rollup.training_data_size), (2, 120))
+        self.assertAlmostEqual(rollup.avg_accuracy, 0.6)
+        self.assertAlmostEqual(rollup.avg_loss, 0.4)
+        self.assertEqual((rollup.min_accuracy, rollup.max_accuracy), (0.4, 0.8))
+        self.assertEqual(len(rollup.archive_files), 2)
+        self.assertTrue(rollup.archive_files[1].endswith(f'-{late[-1].id}.jsonl.gz'))
+        self.assertEqual({row['id'] for row in self.archived_rows(rollup.archive_files[1])}, {log.id for log in late})
+        self.assertEqual(AIModelTrainingRollup.objects.count(), 3)
+        self.assertEqual(AIModelTrainingLog.objects.count(), len(recent))
+
+    def test_dry_run_keeps_rows(self):
+        from .models import AIModelTrainingLog, AIModelTrainingRollup
+        from .retention import archive_training_logs, retention_cutoff
+
+        self.seed('FREELANCER_REC', self.old_day, labels=['1', '0'])
+        summary = archive_training_logs(retention_cutoff(30), self.archive_dir, dry_run=True)
+
+        self.assertEqual(summary, [{'model_type': 'FREELANCER_REC', 'day': self.old_day, 'rows': 2, 'file': None}])
+        self.assertEqual(AIModelTrainingLog.objects.count(), 2)
+        self.assertFalse(AIModelTrainingRollup.objects.exists())
+        self.assertEqual(os.listdir(self.archive_dir), [])
+
+
+class WarmUpTest(LocalArtifactsMixin, TestCase):
+    """
+    Workers warm their serving models up before reporting ready
+    """
+
+    def setUp(self):
+        super().setUp()
+        from . import warmup
+
+        patcher = mock.patch.dict(warmup._state)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        config = override_settings(AI_MODEL_CONFIG={**settings.AI_MODEL_CONFIG, 'WARM_UP_ON_BOOT': True})
+        config.enable()
+        self.addCleanup(config.disable)
+
+    def test_readiness_follows_the_warm_up(self):
+        from . import warmup
+
+        warmup._state.update(pid=os.getpid(), status='warming')
+        response = self.client.get('/ready')
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response['Cache-Control'], 'no-store')
+        self.assertNotIn('pid', response.json())
+
+        # A worker that failed to warm still takes traffic, cold
+        for state, code in (('ready', 200), ('failed', 200)):
+            warmup._state['status'] = state
+            response = self.client.get('/ready')
+            self.assertEqual((response.status_code, response.json()['status']), (code, state))
+
+    def test_disabled_warm_up(self):
+        from . import warmup
+
+        with self.settings(AI_MODEL_CONFIG={**settings.AI_MODEL_CONFIG, 'WARM_UP_ON_BOOT': False}):
+            with mock.patch.object(warmup, 'start_warm_up') as start_warm_up:
+                response = self.client.get('/ready')
+        start_warm_up.assert_not_called()
+        self.assertEqual((response.status_code, response.json()), (200, {'status': 'disabled'}))
+
+    def test_warm_up_runs_once_per_process(self):
+        from . import warmup
+
+        with mock.patch.object(warmup.threading, 'Thread') as thread:
+            self.assertEqual(self.client.get('/ready').status_code, 503)
+            self.assertEqual(self.client.get('/ready').status_code, 503)
+        thread.assert_called_once_with(target=warmup._run, name='model-warm-up', daemon=True)
+        self.assertEqual(warmup._state['pid'], os.getpid())
+
+    def test_run_records_the_outcome(self):
+        from . import warmup
+
+        with mock.patch.object(warmup, 'warm_up', return_value=['v1', 'v2']):
+            warmup._run()
+        self.assertEqual((warmup._state['status'], warmup._state['model_versions']), ('ready', ['v1', 'v2']))
+
+        with mock.patch.object(warmup, 'warm_up', side_effect=RuntimeError('corrupt artifact')):
+            with self.assertLogs('ai_models.warmup', 'ERROR'):
+                warmup._run()
+        self.assertEqual((warmup._state['status'], warmup._state['error']), ('failed', 'corrupt artifact'))
+
+    def test_warm_up_without_a_trained_model(self):
+        from .warmup import warm_up
+
+        self.assertEqual(warm_up(), [])
+
+    def test_warm_up_scores_every_serving_version(self):
+        from . import registry
+        from .models import AIModel
+        from .recommendation import FreelancerRecommendationEngine
+        from .warmup import warm_up
+
+        make_marketplace()
+        FreelancerRecommendationEngine.train_recommendation_model()
+        with mock.patch.object(
+            FreelancerRecommendationEngine, '_score_with_artifacts',
+            wraps=FreelancerRecommendationEngine._score_with_artifacts,
+        ) as score:
+            self.assertEqual(warm_up(), [FreelancerRecommendationEngine._local_model_version()])
+        self.assertEqual(score.call_count, 1)
+
+        model = AIModel.objects.create(name='FREELANCER_REC')
+        registry.assign_role(model.versions.create(version='v1'), 'PRIMARY')
+        registry.assign_role(model.versions.create(version='v2'), 'SHADOW')
+        local = FreelancerRecommendationEngine._load_artifacts
+        with mock.patch.object(registry, 'load_version', lambda version: local()):
+            self.assertEqual(warm_up(), ['v1', 'v2'])
+        # The synthetic task stays out of the serving metrics
+        self.assertEqual(registry.metrics.flush(), 0)
+
+
+class InlinePool:
+    """
+    Stands in for the shard process pool: runs each call in-process, after
+    a pickle round trip of its arguments as across the process boundary.
+    Spawned workers would read the configured database and artifact paths
+    rather than the test's.
+    """
+
+    def __init__(self):
+        self.calls = []
+
+    def submit(self, fn, *args):
+        import pickle
+        from concurrent.futures import Future
+
+        self.calls.append(args)
+        future = Future()
+        future.set_result(fn(*pickle.loads(pickle.dumps(args))))
+        return future
+
+
+class ShardedScoringTest(LocalArtifactsMixin, TestCase):
+    """
+    Sharded scoring merges to the same ranking as scoring in-process
+    """
+
+    def setUp(self):
+        super().setUp()
+        from . import sharding
+        from .recommendation import FreelancerRecommendationEngine
+
+        self.creator, self.tasks, _ = make_marketplace()
+        # Runs of identical freelancers with consecutive ids score alike on both shards
+        for i in range(12):
+            make_freelancer(f'twin{i}', SKILL_SETS[(i // 3) % len(SKILL_SETS)], 0.5)
+        FreelancerRecommendationEngine.train_recommendation_model()
+
+        self.pool = InlinePool()
+        patcher = mock.patch.object(sharding, '_get_pool', return_value=self.pool)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        for cache in (sharding._worker_artifacts, sharding._shard_rows, sharding._shard_vectors):
+            cache.clear()
+            self.addCleanup(cache.clear)
+
+        config = override_settings(AI_MODEL_CONFIG={
+            **settings.AI_MODEL_CONFIG, 'RECOMMENDATION_SHARDS': '2', 'SHARD_MIN_FREELANCERS': 0,
+        })
+        config.enable()
+        self.addCleanup(config.disable)
+
+    def test_merge_matches_top_k_including_ties(self):
+        from . import sharding
+        from .feature_store import FeatureStore
+        from .recommendation import FreelancerRecommendationEngine
+
+        artifacts = FreelancerRecommendationEngine._load_artifacts()
+        store = FeatureStore()
+        feature_set = store.load()
+        freelancers = feature_set.freelancers
+        task_raw = artifacts['encoder'].transform_raw([task.skills_required for task in self.tasks])
+        vectors = artifacts['encoder'].weight(freelancers.skills).T.tocsr()
+
+        for top_n in (1, 5, len(freelancers)):
+            expected = sharding.top_k(freelancers, None, task_raw, top_n, artifacts, vectors)
+            merged = sharding.score_sharded(feature_set, store.root, task_raw, top_n, artifacts['label'], 2)
+            self.assertEqual(merged, expected)
+
+        # Tied scores straddle the shards, so the tie order is exercised
+        self.assertTrue(any(
+            a[0] == b[0] and a[1] % 2 != b[1] % 2 for ranking in expected for a, b in zip(ranking, ranking[1:])
+        ))
+
+    def test_bulk_scoring_is_sharded(self):
+        from .recommendation import FreelancerRecommendationEngine
+
+        sharded = FreelancerRecommendationEngine.score_freelancers_bulk(self.tasks, top_n=6)
+        self.assertEqual(len(self.pool.calls), 2)
+        with self.settings(AI_MODEL_CONFIG={**settings.AI_MODEL_CONFIG, 'RECOMMENDATION_SHARDS': '0'}):
+            in_process = FreelancerRecommendationEngine.score_freelancers_bulk(self.tasks, top_n=6)
+        self.assertEqual(len(self.pool.calls), 2)
+
+        def ranking(recommendations):
+            return [[(rec['freelancer'].id, rec['match_score']) for rec in recs] for recs in recommendations]
+
+        self.assertEqual(ranking(sharded), ranking(in_process))
+
+    def test_workers_load_artifacts_once_per_label(self):
+        from . import sharding
+        from .recommendation import FreelancerRecommendationEngine
+
+        label = FreelancerRecommendationEngine._local_model_version()
+        FreelancerRecommendationEngine.score_freelancers_bulk(self.tasks[:2])
+        FreelancerRecommendationEngine.score_freelancers_bulk(self.tasks[2:4])
+
+        # Requests carry the label and task features, never the artifacts
+        for args in self.pool.calls:
+            self.assertEqual(args[-1], label)
+            self.assertFalse(any(isinstance(arg, dict) for arg in args))
+        self.assertEqual(list(sharding._worker_artifacts), [label])
+        self.assertIs(sharding._worker_artifacts[label], FreelancerRecommendationEngine._load_artifacts())
+
+        with self.assertRaises(FileNotFoundError):
+            sharding._load_artifacts('retrained-since')
+
+    def test_shard_count(self):
+        from . import sharding
+
+        with self.settings(AI_MODEL_CONFIG={**settings.AI_MODEL_CONFIG, 'RECOMMENDATION_SHARDS': 'auto'}):
+            self.assertEqual(sharding.shard_count(), os.cpu_count() or 1)
+        with self.settings(AI_MODEL_CONFIG={**settings.AI_MODEL_CONFIG, 'RECOMMENDATION_SHARDS': ''}):
+            self.assertEqual(sharding.shard_count(), 1)
+        self.assertEqual(sharding.shard_count(), 2)
+
+
+class ValuesSerializerTest(TestCase):
+    """
+    Values serializers render exactly what their ModelSerializers render
+    """
+
+    def setUp(self):
+        creator, self.tasks, self.freelancers = make_marketplace(n_tasks=3, n_freelancers=3)
+        CustomUser.objects.filter(pk=self.freelancers[0].user_id).update(
+            wallet_address='0x' + 'ab' * 20, reputation_score=4.5, total_tasks_completed=2, approval_rate=0.75
+        )
+        from .models import AIModelTrainingLog
+
+        AIModelTrainingLog.objects.create(
+            model_type='FREELANCER_REC', model_version='1.0', training_data={'skills': ['python']},
+            label='approved', training_accuracy=0.9, training_data_size=10,
+        )
+        AIModelTrainingLog.objects.create(model_type='WORK_VALIDATION')
+
+    def assertRendersLike(self, values, serializer_class, queryset):
+        from rest_framework.renderers import JSONRenderer
+        from ai_marketplace import serialization
+
+        expected = json.loads(JSONRenderer().render(serializer_class(queryset, many=True).data))
+        self.assertTrue(expected)
+        self.assertEqual(json.loads(serialization.dumps(values.serialize(queryset))), expected)
+        # The stdlib encoder used without orjson renders the same
+        with mock.patch.object(serialization, 'orjson', None):
+            self.assertEqual(json.loads(serialization.dumps(values.serialize(queryset))), expected)
+
+    def test_user_profile(self):
+        from users.serializers import UserProfileSerializer, UserProfileValues
+
+        self.assertRendersLike(UserProfileValues, UserProfileSerializer, CustomUser.objects.order_by('id'))
+
+    def test_freelancer_profile(self):
+        from .serializers import FreelancerProfileSerializer, FreelancerProfileValues
+
+        self.assertRendersLike(
+            FreelancerProfileValues, FreelancerProfileSerializer, FreelancerProfile.objects.order_by('id')
+        )
+
+    def test_training_log(self):
+        from .models import AIModelTrainingLog
+        from .serializers import AIModelTrainingLogSerializer, AIModelTrainingLogValues
+
+        self.assertRendersLike(
+            AIModelTrainingLogValues, AIModelTrainingLogSerializer, AIModelTrainingLog.objects.order_by('id')
+        )
+
+    def test_task_values(self):
+        from rest_framework import serializers
+        from ai_marketplace.serialization import model_fields
+        from tasks.serializers import TaskValues
+
+        class TaskSerializer(serializers.ModelSerializer):
+            class Meta:
+                model = Task
+                fields = model_fields(Task)
+
+        queryset = Task.objects.order_by('id')
+        self.assertRendersLike(TaskValues, TaskSerializer, queryset)
+        self.assertEqual(TaskValues.serialize(queryset), list(queryset.values()))
+        self.assertEqual(TaskValues.get(id=self.tasks[1].id), queryset.values().get(id=self.tasks[1].id))
+        self.assertIsNone(TaskValues.get(id=0))
+
+
+def brute_force_assignment(n_tasks, rows, cols, scores, capacity):
+    """
+    (assigned count, total score) of the best assignment, by enumeration
+    """
+    import itertools
+
+    options = [[None] for _ in range(n_tasks)]
+    for row, col, score in zip(rows, cols, scores):
+        options[row].append((col, score))
+
+    best = (0, 0.0)
+    for choice in itertools.product(*options):
+        picked = [option for option in choice if option is not None]
+        used = [col for col, _ in picked]
+        if all(used.count(col) <= capacity[col] for col in set(used)):
+            best = max(best, (len(picked), sum(score for _, score in picked)))
+    return best
+
+
+class AssignmentTest(TestCase):
+    """
+    Batch assignment finds the best capacity-respecting matching
+    """
+
+    def assertOptimal(self, n_tasks, rows, cols, scores, capacity):
+        from .assignment import solve_assignment
+
+        pairs = solve_assignment(n_tasks, rows, cols, scores, capacity)
+        score_of = {(row, col): score for row, col, score in zip(rows.tolist(), cols.tolist(), scores.tolist())}
+        self.assertEqual(len({row for row, _ in pairs}), len(pairs))
+        for col in set(col for _, col in pairs):
+            self.assertLessEqual(sum(1 for _, c in pairs if c == col), capacity[col])
+        count, total = brute_force_assignment(n_tasks, rows.tolist(), cols.tolist(), scores.tolist(), capacity)
+        self.assertEqual(len(pairs), count)
+        self.assertAlmostEqual(sum(score_of[pair] for pair in pairs), total)
+
+    def test_solver_matches_brute_force(self):
+        import numpy as np
+
+        rng = np.random.default_rng(3)
+        for _ in range(60):
+            n_tasks, n_freelancers = rng.integers(1, 6), rng.integers(1, 4)
+            mask = rng.random((n_tasks, n_freelancers)) < 0.6
+            rows, cols = np.nonzero(mask)
+            scores = rng.uniform(-0.5, 1.0, len(rows))
+            capacity = rng.integers(0, 3, n_freelancers).tolist()
+            self.assertOptimal(n_tasks, rows, cols, scores, capacity)
+
+    def test_negative_scores_are_kept(self):
+        import numpy as np
+        from .assignment import solve_assignment
+
+        pairs = solve_assignment(2, np.array([0, 1]), np.array([0, 1]), np.array([-0.4, -2.0]), [1, 1])
+        self.assertEqual(sorted(pairs), [(0, 0), (1, 1)])
+
+    def test_assign_open_tasks(self):
+        import numpy as np
+        from .assignment import assign_open_tasks
+        from .recommendation import FreelancerRecommendationEngine
+
+        client = CustomUser.objects.create_user(username='client', password='pw')
+        profiles = [make_freelancer(f'freelancer{i}', ['python']) for i in range(4)]
+        busy, self_poster = profiles[0].user, profiles[1].user
+        # Two active tasks leave the busy freelancer one slot; completed ones don't count
+        for status in ('ASSIGNED', 'IN_PROGRESS', 'COMPLETED'):
+            Task.objects.create(
+                creator=client, title=status, description='d', budget=1, skills_required=['python'],
+                assigned_freelancer=busy, status=status,
+            )
+        tasks = [make_task(client, ['python'], title=f'Task {i}') for i in range(5)]
+        tasks.append(make_task(self_poster, ['python'], title='Own task'))
+
+        rng = np.random.default_rng(11)
+        scores = rng.random((len(tasks), len(profiles)))
+        # The posting freelancer is the best match for their own task
+        scores[-1, 1] = 5.0
+
+        def score_freelancers_bulk(batch, top_n=5, fallback=True):
+            by_id = {task.id: row for row, task in enumerate(tasks)}
+            return [
+                sorted(
+                    ({'freelancer': profile, 'match_score': scores[by_id[task.id], col]}
+                     for col, profile in enumerate(profiles)),
+                    key=lambda rec: -rec['match_score'],
+                )[:top_n]
+                for task in batch
+            ]
+
+        engine = FreelancerRecommendationEngine
+        with mock.patch.object(engine, 'score_freelancers_bulk', score_freelancers_bulk):
+            with mock.patch.object(engine, 'model_status', return_value='ready'):
+                with self.captureOnCommitCallbacks(execute=False):
+                    stats = assign_open_tasks(max_active=3, candidates=3, min_score=0.2)
+
+        assigned = dict(Task.objects.filter(id__in=[task.id for task in tasks], status='ASSIGNED')
+                        .values_list('id', 'assigned_freelancer_id'))
+        self.assertNotEqual(assigned.get(tasks[-1].id), self_poster.id)
+        self.assertLessEqual(list(assigned.values()).count(busy.id), 1)
+        for user_id in set(assigned.values()):
+            self.assertLessEqual(list(assigned.values()).count(user_id), 3)
+
+        # The same instance, solved by enumeration
+        rows, cols, pair_scores = [], [], []
+        for row, task in enumerate(tasks):
+            for rec in score_freelancers_bulk([task], top_n=3)[0]:
+                col = profiles.index(rec['freelancer'])
+                if rec['freelancer'].user_id != task.creator_id and rec['match_score'] >= 0.2:
+                    rows.append(row)
+                    cols.append(col)
+                    pair_scores.append(rec['match_score'])
+        count, total = brute_force_assignment(len(tasks), rows, cols, pair_scores, [1, 3, 3, 3])
+        self.assertEqual(stats['assigned'], count)
+        self.assertEqual(len(assigned), count)
+        self.assertAlmostEqual(stats['mean_score'] * count, total)
+        self.assertEqual(
+            TaskEvent.objects.filter(event_type='STATUS_CHANGED', task_id__in=assigned, to_status='ASSIGNED').count(),
+            count,
+        )
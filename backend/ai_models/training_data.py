@@ -0,0 +1,294 @@
+import atexit
+import json
+import logging
+import os
+import tempfile
+import threading
+
+from django.conf import settings
+from django.db import connections
+from django.utils import timezone
+
+from ai_models.models import AIModelTrainingLog
+
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = 2
+
+
+def metadata_path(path):
+    return f"{path}.json"
+
+
+def labels_path(path):
+    """
+    Where an export at ``path`` keeps its labels: ``<name>.labels.npy``
+    """
+    root, ext = os.path.splitext(path)
+    return f"{root}.labels{ext or '.npy'}"
+
+
+def decode_training_data(value):
+    """
+    Undo the json.dumps in AIModelTrainingLog.save, which double-encodes values
+    """
+    while isinstance(value, str):
+        try:
+            value = json.loads(value)
+        except ValueError:
+            return None
+    return value
+
+
+def _sample(training_data, label):
+    """
+    Return (features, label) as floats, or None for rows that aren't samples
+    """
+    features = decode_training_data(training_data)
+    if not isinstance(features, list) or not features or label is None:
+        # Summary rows logged by training runs carry dicts and no label
+        return None
+    try:
+        return [float(value) for value in features], float(label)
+    except (TypeError, ValueError):
+        return None
+
+
+def _write_npy(path, scratch, shape, chunk_size):
+    """
+    Copy float32 values streamed to ``scratch`` into a .npy file at ``path``
+    """
+    import numpy as np
+
+    array = np.lib.format.open_memmap(path, mode='w+', dtype=np.float32, shape=shape)
+    flat = array.reshape(-1)
+    scratch.seek(0)
+    for start in range(0, flat.size, chunk_size):
+        count = min(chunk_size, flat.size - start)
+        flat[start:start + count] = np.frombuffer(scratch.read(count * 4), dtype=np.float32)
+    array.flush()
+    del flat, array
+
+
+def export_training_logs(path, model_type, since=None, until=None, chunk_size=10000):
+    """
+    Write logged samples to ``path`` as a float32 .npy feature matrix X
+    (samples x features) and their labels y to labels_path(path).
+
+    Both are contiguous, so load_training_logs can memory-map each without
+    a copy. Metadata describing both arrays is written next to them as
+    ``<path>.json``. Returns the metadata.
+    """
+    # numpy is only needed by exports, not by the request-path writer below
+    import numpy as np
+    from ai_models.feature_store import SUBMISSION_FEATURES
+
+    logs = AIModelTrainingLog.objects.filter(model_type=model_type)
+    if since:
+        logs = logs.filter(captured_at__gte=since)
+    if until:
+        logs = logs.filter(captured_at__lt=until)
+    logs = logs.order_by('captured_at', 'id').values_list('training_data', 'label')
+
+    n_features = None
+    n_rows = skipped = 0
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    y_path = labels_path(path)
+
+    # Features and labels are streamed to raw scratch files since the final
+    # shapes are only known once every row has been decoded
+    with tempfile.TemporaryFile(dir=directory) as x_scratch, tempfile.TemporaryFile(dir=directory) as y_scratch:
+        features, labels = [], []
+        for training_data, label in logs.iterator(chunk_size=chunk_size):
+            sample = _sample(training_data, label)
+            if sample is None or (n_features is not None and len(sample[0]) != n_features):
+                skipped += 1
+                continue
+            n_features = len(sample[0])
+            features.append(sample[0])
+            labels.append(sample[1])
+            if len(features) >= chunk_size:
+                x_scratch.write(np.asarray(features, dtype=np.float32).tobytes())
+                y_scratch.write(np.asarray(labels, dtype=np.float32).tobytes())
+                n_rows += len(features)
+                features, labels = [], []
+        if features:
+            x_scratch.write(np.asarray(features, dtype=np.float32).tobytes())
+            y_scratch.write(np.asarray(labels, dtype=np.float32).tobytes())
+            n_rows += len(features)
+        x_scratch.flush()
+        y_scratch.flush()
+
+        tmp_paths = [f"{target}.tmp-{os.getpid()}.npy" for target in (path, y_path)]
+        chunk_values = max(1, chunk_size) * max(1, n_features or 0)
+        _write_npy(tmp_paths[0], x_scratch, (n_rows, n_features or 0), chunk_values)
+        _write_npy(tmp_paths[1], y_scratch, (n_rows,), chunk_values)
+    os.replace(tmp_paths[1], y_path)
+    os.replace(tmp_paths[0], path)
+
+    metadata = {
+        'format_version': FORMAT_VERSION,
+        'model_type': model_type,
+        'since': since.isoformat() if since else None,
+        'until': until.isoformat() if until else None,
+        'exported_at': timezone.now().isoformat(),
+        'rows': n_rows,
+        'skipped': skipped,
+        'n_features': n_features or 0,
+        'feature_names': SUBMISSION_FEATURES if n_features == len(SUBMISSION_FEATURES) else None,
+        # File names are relative to the metadata's directory
+        'arrays': {
+            'X': {'file': os.path.basename(path), 'dtype': 'float32', 'shape': [n_rows, n_features or 0]},
+            'y': {'file': os.path.basename(y_path), 'dtype': 'float32', 'shape': [n_rows]},
+        },
+    }
+    with open(metadata_path(path), 'w') as f:
+        json.dump(metadata, f, indent=2)
+
+    logger.info(f"Exported {n_rows} {model_type} samples to {path} ({skipped} rows skipped)")
+    return metadata
+
+
+def load_training_logs(path):
+    """
+    Memory-map an export and return (X, y, metadata) without copying it
+    """
+    import numpy as np
+
+    with open(metadata_path(path)) as f:
+        metadata = json.load(f)
+    if metadata.get('format_version') != FORMAT_VERSION:
+        raise ValueError(f"Unsupported training log export format: {metadata.get('format_version')}")
+
+    directory = os.path.dirname(os.path.abspath(path))
+    X, y = (
+        np.load(os.path.join(directory, metadata['arrays'][name]['file']), mmap_mode='r')
+        for name in ('X', 'y')
+    )
+    return X, y, metadata
+
+
+def import_training_logs(path, batch_size=5000):
+    """
+    Recreate AIModelTrainingLog rows from an export; returns the number created
+    """
+    import numpy as np
+
+    X, y, metadata = load_training_logs(path)
+    captured_at = timezone.now()
+
+    created = 0
+    for start in range(0, len(y), batch_size):
+        features = np.asarray(X[start:start + batch_size], dtype=np.float64).tolist()
+        labels = np.asarray(y[start:start + batch_size])
+        # bulk_create bypasses save(), so values are stored as plain JSON lists
+        AIModelTrainingLog.objects.bulk_create([
+            AIModelTrainingLog(
+                model_type=metadata['model_type'],
+                training_data=row,
+                label=str(int(label)) if float(label).is_integer() else str(float(label)),
+                captured_at=captured_at,
+            )
+            for row, label in zip(features, labels)
+        ])
+        created += len(features)
+
+    logger.info(f"Imported {created} {metadata['model_type']} samples from {path}")
+    return created
+
+
+class TrainingLogWriter:
+    """
+    Buffer AIModelTrainingLog rows and insert them with bulk_create.
+
+    The buffer is flushed once it holds ``batch_size`` rows or its oldest
+    row is ``flush_interval`` seconds old, whichever comes first. A timer
+    thread enforces the interval when no further rows arrive. Use it as a
+    context manager, or call flush(), to write out what is left.
+    """
+
+    def __init__(self, batch_size=None, flush_interval=None):
+        config = settings.AI_MODEL_CONFIG
+        self.batch_size = batch_size or config.get('TRAINING_LOG_BATCH_SIZE', 500)
+        self.flush_interval = (
+            flush_interval if flush_interval is not None
+            else config.get('TRAINING_LOG_FLUSH_INTERVAL', 5.0)
+        )
+        self._buffer = []
+        self._lock = threading.Lock()
+        self._timer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.flush()
+
+    def add(self, **fields):
+        """
+        Queue one log row; returns the unsaved instance
+        """
+        log = AIModelTrainingLog(**fields)
+        with self._lock:
+            self._buffer.append(log)
+            full = len(self._buffer) >= self.batch_size
+            if not full and self._timer is None and self.flush_interval:
+                self._timer = threading.Timer(self.flush_interval, self._flush_on_timer)
+                self._timer.daemon = True
+                self._timer.start()
+        if full:
+            self.flush()
+        return log
+
+    def log_submission(self, submission, model_type='FREELANCER_REC'):
+        """
+        Queue a reviewed submission's features and outcome as a training sample
+        """
+        from ai_models.feature_store import submission_features
+
+        return self.add(
+            model_type=model_type,
+            # bulk_create bypasses save(), so values are stored as plain JSON lists
+            training_data=submission_features(submission.task, submission.freelancer, submission.submitted_at),
+            label=1 if submission.status == 'APPROVED' else 0,
+            captured_at=timezone.now(),
+        )
+
+    def flush(self):
+        """
+        Insert every buffered row; returns the number written
+        """
+        with self._lock:
+            batch, self._buffer = self._buffer, []
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        if batch:
+            AIModelTrainingLog.objects.bulk_create(batch, batch_size=self.batch_size)
+        return len(batch)
+
+    def _flush_on_timer(self):
+        try:
+            self.flush()
+        except Exception as e:
+            logger.error(f"Failed to flush training logs: {e}")
+        finally:
+            # Timer threads own their connections; don't leak them
+            connections.close_all()
+
+
+_writer = None
+_writer_lock = threading.Lock()
+
+
+def get_training_log_writer():
+    """
+    Process-wide writer for training samples captured on the request path
+    """
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = TrainingLogWriter()
+            atexit.register(_writer.flush)
+    return _writer
@@ -1,49 +1,31 @@
 import os
-import joblib
-import numpy as np
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import permissions, status
 from django.conf import settings
 
 from .models import AIModelTrainingLog, FreelancerProfile
-from users.models import CustomUser
+from .registry import serve
+from users.authentication import ClaimsJWTAuthentication
 from tasks.models import Task, TaskSubmission
 
+# The ML stack (numpy, scikit-learn, joblib) is imported inside the views
+# that use it, so loading the URLconf doesn't pay for it
+
 class FreelancerRecommendationView(APIView):
     """
     AI-powered freelancer recommendation endpoint
     """
+    # Read-only: the caller's identity comes from the token claims alone
+    authentication_classes = [ClaimsJWTAuthentication]
     permission_classes = [permissions.IsAuthenticated]
 
-    def load_recommendation_model(self):
-        """
-        Load pre-trained recommendation model
-        """
-        model_path = os.path.join(
-            settings.BASE_DIR, 
-            'ai_models', 
-            'training_scripts', 
-            'freelancer_recommender_model', 
-            'model.joblib'
-        )
-        scaler_path = os.path.join(
-            settings.BASE_DIR, 
-            'ai_models', 
-            'training_scripts', 
-            'freelancer_recommender_model', 
-            'scaler.joblib'
-        )
-        
-        model = joblib.load(model_path)
-        scaler = joblib.load(scaler_path)
-        
-        return model, scaler
-
     def post(self, request):
         """
         Recommend freelancers for a given task
         """
+        from .recommendation import FreelancerRecommendationEngine
+
         task_id = request.data.get('task_id')
         
         try:
@@ -54,54 +36,17 @@ class FreelancerRecommendationView(APIView):
                 status=status.HTTP_404_NOT_FOUND
             )
 
-        # Load model
-        model, scaler = self.load_recommendation_model()
+        # Same engine and feature store as training and snapshots
+        recommendations = FreelancerRecommendationEngine.score_freelancers(task, top_n=5)
 
-        # Get all freelancers
-        freelancers = CustomUser.objects.filter(is_freelancer=True)
-        
-        recommendations = []
-        for freelancer in freelancers:
-            # Prepare feature vector
-            skill_vector = self._skills_to_vector(freelancer.skills)
-            
-            features = [
-                len(Task.objects.filter(submissions__freelancer=freelancer, status='COMPLETED')),
-                freelancer.reputation_score,
-                *skill_vector
-            ]
-
-            # Scale features
-            features_scaled = scaler.transform([features])
-            
-            # Predict recommendation score
-            recommendation_score = model.predict(features_scaled)[0]
-            
-            recommendations.append({
-                'freelancer_id': freelancer.id,
-                'username': freelancer.username,
-                'recommendation_score': float(recommendation_score)
-            })
-
-        # Sort recommendations by score
-        recommendations.sort(key=lambda x: x['recommendation_score'], reverse=True)
-        
-        return Response(recommendations[:5])  # Top 5 recommendations
-
-    def _skills_to_vector(self, skills, max_skills=10):
-        """
-        Convert skills to a numerical vector
-        """
-        skill_dict = {
-            'Python': 1, 'AI': 2, 'Machine Learning': 3,
-            'Web Development': 4, 'Data Science': 5,
-        }
-        
-        vector = [0] * max_skills
-        for i, skill in enumerate(skills[:max_skills]):
-            vector[i] = skill_dict.get(skill, 0)
-        
-        return vector
+        return Response([
+            {
+                'freelancer_id': rec['freelancer'].user.id,
+                'username': rec['freelancer'].user.username,
+                'recommendation_score': rec['match_score']
+            }
+            for rec in recommendations
+        ])
 
 class WorkValidationView(APIView):
     """
@@ -113,6 +58,8 @@ class WorkValidationView(APIView):
         """
         Load pre-trained work validation model
         """
+        import joblib
+
         model_path = os.path.join(
             settings.BASE_DIR, 
             'ai_models', 
@@ -131,12 +78,14 @@ class WorkValidationView(APIView):
         model = joblib.load(model_path)
         scaler = joblib.load(scaler_path)
         
-        return model, scaler
+        return {'model': model, 'scaler': scaler}
 
     def post(self, request):
         """
         Validate a task submission
         """
+        from .feature_store import submission_features
+
         submission_id = request.data.get('submission_id')
         
         try:
@@ -147,23 +96,22 @@ class WorkValidationView(APIView):
                 status=status.HTTP_404_NOT_FOUND
             )
 
-        # Load model
-        model, scaler = self.load_validation_model()
-
         # Prepare feature vector
-        features = [
-            submission.task.budget,
-            len(submission.task.description),
-            submission.freelancer.reputation_score,
-            submission.task.skills_required.count(),
-            submission.submitted_at.timestamp(),
-        ]
-
-        # Scale features
-        features_scaled = scaler.transform([features])
-        
-        # Predict validation
-        validation_prob = model.predict_proba(features_scaled)[0][1]
+        features = submission_features(
+            submission.task, submission.freelancer, submission.submitted_at
+        )
+
+        # Predict validation with the routed model version; registered
+        # versions bundle the same {'model', 'scaler'} artifacts
+        validation_prob = serve(
+            'WORK_VALIDATION',
+            submission.id,
+            predict=lambda artifacts: float(
+                artifacts['model'].predict_proba(artifacts['scaler'].transform([features]))[0][1]
+            ),
+            describe=lambda probability: ([probability > 0.5], [probability]),
+            local=self.load_validation_model,
+        )
         is_valid = validation_prob > 0.5
 
         return Response({
@@ -171,3 +119,23 @@ class WorkValidationView(APIView):
             'is_valid': bool(is_valid),
             'validation_probability': float(validation_prob)
         })
+
+
+class ReadinessView(APIView):
+    """
+    Load balancer readiness probe: 503 while this worker is still warming
+    up its models, 200 once warm (or when warm-up is disabled or failed)
+    """
+    authentication_classes = []
+    permission_classes = [permissions.AllowAny]
+
+    def get(self, request):
+        from .warmup import readiness
+
+        state = readiness()
+        warming = state['status'] == 'warming'
+        return Response(
+            state,
+            status=status.HTTP_503_SERVICE_UNAVAILABLE if warming else status.HTTP_200_OK,
+            headers={'Cache-Control': 'no-store'},
+        )
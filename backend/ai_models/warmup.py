@@ -0,0 +1,117 @@
+import logging
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+
+from django.apps import apps
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+# Skills of the synthetic task scored during warm-up
+WARM_UP_SKILLS = ['python', 'django', 'react']
+
+_lock = threading.Lock()
+# Readiness of this process; a forked worker inherits its parent's state,
+# so the pid tells whether the state belongs to the current process
+_state = {'pid': None, 'status': 'pending', 'model_versions': [], 'error': None, 'seconds': None}
+
+
+def warm_up_enabled():
+    return settings.AI_MODEL_CONFIG.get('WARM_UP_ON_BOOT', False)
+
+
+def serving_process():
+    """
+    Whether this process serves requests, rather than running a management
+    command; runserver only counts in its autoreloaded child
+    """
+    if Path(sys.argv[0]).name not in ('manage.py', 'django-admin', '__main__.py'):
+        return True
+    return sys.argv[1:2] == ['runserver'] and os.environ.get('RUN_MAIN') == 'true'
+
+
+def _artifact_sets():
+    """
+    (label, artifacts) for every recommendation version that can serve traffic
+    """
+    from .recommendation import FreelancerRecommendationEngine
+    from .registry import get_routing, load_version
+
+    routing = get_routing('FREELANCER_REC')
+    versions = [version for version in (routing.primary, routing.challenger) if version]
+    if not routing.primary:
+        label = FreelancerRecommendationEngine._local_model_version()
+        if label is not None:
+            yield label, FreelancerRecommendationEngine._load_artifacts()
+    for version in versions:
+        yield version.version, load_version(version)
+
+
+def warm_up():
+    """
+    Load the serving models and the feature store index, then score a
+    synthetic task with each model so the first real request finds every
+    cache, shard pool and BLAS buffer already built.
+
+    Returns the labels of the versions warmed; an empty list means no
+    model is trained yet and requests get the fallback ranking.
+    """
+    from tasks.models import Task
+    from .recommendation import FreelancerRecommendationEngine
+
+    task = Task(title='warm-up', skills_required=WARM_UP_SKILLS)
+    warmed = []
+    for label, artifacts in _artifact_sets():
+        # Scored directly rather than through serve(), keeping the
+        # synthetic task out of the model metrics
+        FreelancerRecommendationEngine._score_with_artifacts([task], 5, artifacts)
+        warmed.append(label)
+    return warmed
+
+
+def _run():
+    apps.ready_event.wait()
+    started = time.monotonic()
+    try:
+        warmed = warm_up()
+    except Exception as e:
+        # A worker that can't warm still serves, cold; refusing traffic
+        # would take the whole fleet down with a bad artifact
+        logger.error(f"Model warm-up failed: {e}")
+        update = {'status': 'failed', 'error': str(e)}
+    else:
+        update = {'status': 'ready', 'model_versions': warmed}
+    finally:
+        connections.close_all()
+
+    update['seconds'] = round(time.monotonic() - started, 3)
+    with _lock:
+        _state.update(update)
+    logger.info(f"Model warm-up {update['status']} in {update['seconds']}s")
+
+
+def start_warm_up():
+    """
+    Warm up in a background thread, once per process
+    """
+    with _lock:
+        if _state['pid'] == os.getpid():
+            return
+        _state.update(pid=os.getpid(), status='warming', model_versions=[], error=None, seconds=None)
+    threading.Thread(target=_run, name='model-warm-up', daemon=True).start()
+
+
+def readiness():
+    """
+    Warm-up state of this process: 'disabled', 'warming', 'ready' or 'failed'
+    """
+    if not warm_up_enabled():
+        return {'status': 'disabled'}
+    # Covers workers forked after the parent started (gunicorn --preload)
+    start_warm_up()
+    with _lock:
+        return {key: value for key, value in _state.items() if key != 'pid'}
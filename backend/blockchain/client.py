@@ -0,0 +1,209 @@
+import itertools
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+from django.conf import settings
+from eth_abi import decode
+from eth_utils import keccak, to_checksum_address
+
+logger = logging.getLogger(__name__)
+
+# Solidity enum TaskMarketplace.TaskStatus mapped onto Task.status values
+CHAIN_TASK_STATUSES = ['CREATED', 'ASSIGNED', 'SUBMITTED', 'COMPLETED', 'CANCELLED']
+
+TASK_STRUCT_TYPES = ['address', 'address', 'string', 'string', 'uint256', 'uint8', 'bytes32']
+TASKS_SELECTOR = keccak(text='tasks(uint256)')[:4].hex()
+TASK_COUNT_SELECTOR = keccak(text='taskCount()')[:4].hex()
+
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class RPCError(Exception):
+    """
+    Raised when the node rejects a JSON-RPC call or cannot be reached
+    """
+
+    def __init__(self, message, code=None, method=None):
+        super().__init__(message)
+        self.code = code
+        self.method = method
+
+
+class ChainClient:
+    """
+    JSON-RPC client for reading TaskMarketplace state.
+
+    Calls are grouped into JSON-RPC batch requests, sent over a pooled
+    keep-alive session and dispatched with bounded concurrency, so reading
+    thousands of tasks costs a handful of HTTP round trips.
+    """
+
+    def __init__(self, rpc_url=None, contract_address=None, batch_size=None,
+                 max_concurrency=None, max_retries=None, timeout=None):
+        config = settings.BLOCKCHAIN_CONFIG
+        self.rpc_url = rpc_url or config['RPC_URL']
+        self.contract_address = contract_address or config['CONTRACT_ADDRESS']
+        self.batch_size = batch_size or config.get('RPC_BATCH_SIZE', 100)
+        self.max_concurrency = max_concurrency or config.get('RPC_MAX_CONCURRENCY', 4)
+        self.max_retries = config.get('RPC_MAX_RETRIES', 3) if max_retries is None else max_retries
+        self.timeout = timeout or config.get('RPC_TIMEOUT', 30)
+
+        if not self.rpc_url:
+            raise RPCError("BLOCKCHAIN_CONFIG['RPC_URL'] is not configured")
+
+        # One pool sized to the concurrency limit keeps every worker on a warm connection
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.max_concurrency, max_retries=0)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.session.headers.update({'Content-Type': 'application/json'})
+
+        self._request_ids = itertools.count(1)
+        self._request_ids_lock = threading.Lock()
+
+    def close(self):
+        self.session.close()
+
+    def call(self, method, params=None):
+        """
+        Execute a single JSON-RPC call
+        """
+        return self.batch([(method, params or [])])[0]
+
+    def batch(self, calls):
+        """
+        Execute (method, params) calls and return their results in order
+        """
+        calls = list(calls)
+        chunks = [calls[i:i + self.batch_size] for i in range(0, len(calls), self.batch_size)]
+        if not chunks:
+            return []
+        if len(chunks) == 1:
+            return self._send_batch(chunks[0])
+
+        with ThreadPoolExecutor(max_workers=min(self.max_concurrency, len(chunks))) as executor:
+            chunk_results = list(executor.map(self._send_batch, chunks))
+
+        return [result for chunk in chunk_results for result in chunk]
+
+    def _next_ids(self, count):
+        with self._request_ids_lock:
+            return [next(self._request_ids) for _ in range(count)]
+
+    def _post_with_retries(self, payload):
+        """
+        POST a payload, retrying transport failures and throttling with backoff
+        """
+        for attempt in range(self.max_retries + 1):
+            try:
+                response = self.session.post(self.rpc_url, json=payload, timeout=self.timeout)
+                if response.status_code not in RETRYABLE_STATUS_CODES:
+                    response.raise_for_status()
+                    return response.json()
+                error = RPCError(f"RPC endpoint returned HTTP {response.status_code}")
+            except (requests.ConnectionError, requests.Timeout) as e:
+                error = RPCError(f"RPC endpoint unreachable: {e}")
+            except requests.RequestException as e:
+                raise RPCError(f"RPC request failed: {e}")
+
+            if attempt < self.max_retries:
+                delay = 0.2 * (2 ** attempt)
+                logger.warning(f"{error}; retrying in {delay:.1f}s")
+                time.sleep(delay)
+
+        raise error
+
+    def _send_batch(self, calls):
+        ids = self._next_ids(len(calls))
+        payload = [
+            {'jsonrpc': '2.0', 'id': request_id, 'method': method, 'params': params}
+            for request_id, (method, params) in zip(ids, calls)
+        ]
+
+        response = self._post_with_retries(payload)
+        if isinstance(response, dict):
+            # Nodes answer a rejected batch with a single error object
+            error = response.get('error') or {}
+            raise RPCError(error.get('message', 'Malformed batch response'), code=error.get('code'))
+
+        # Batch responses may come back in any order
+        by_id = {item.get('id'): item for item in response}
+        results = []
+        for request_id, (method, _) in zip(ids, calls):
+            item = by_id.get(request_id)
+            if item is None:
+                raise RPCError(f"No response for {method} (id {request_id})", method=method)
+            if 'error' in item:
+                error = item['error']
+                raise RPCError(error.get('message', 'RPC error'), code=error.get('code'), method=method)
+            results.append(item.get('result'))
+
+        return results
+
+    def block_number(self):
+        return int(self.call('eth_blockNumber'), 16)
+
+    def _eth_call(self, data, block):
+        return ('eth_call', [{'to': self.contract_address, 'data': data}, block])
+
+    def get_task_count(self, block='latest'):
+        """
+        Read the contract's taskCount
+        """
+        return int(self.batch([self._eth_call('0x' + TASK_COUNT_SELECTOR, block)])[0], 16)
+
+    def get_tasks(self, task_ids, block=None):
+        """
+        Read entries of the contract's public tasks mapping.
+
+        All reads are pinned to one block so the result is a consistent
+        snapshot even when it spans several batches.
+        """
+        task_ids = list(task_ids)
+        if block is None:
+            block = hex(self.block_number())
+
+        calls = [
+            self._eth_call('0x' + TASKS_SELECTOR + format(task_id, '064x'), block)
+            for task_id in task_ids
+        ]
+        results = self.batch(calls)
+
+        return {
+            task_id: self._decode_task(result)
+            for task_id, result in zip(task_ids, results)
+        }
+
+    @staticmethod
+    def _decode_task(result):
+        creator, freelancer, title, description, budget, status, submission_hash = decode(
+            TASK_STRUCT_TYPES, bytes.fromhex(result[2:])
+        )
+        return {
+            'creator': to_checksum_address(creator),
+            'assigned_freelancer': to_checksum_address(freelancer),
+            'title': title,
+            'description': description,
+            'budget_wei': budget,
+            'status': CHAIN_TASK_STATUSES[status],
+            'submission_hash': '0x' + submission_hash.hex(),
+        }
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """
+    Return the process-wide client so its connection pool is shared
+    """
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = ChainClient()
+        return _client
@@ -0,0 +1,107 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from django.test import SimpleTestCase
+from eth_abi import encode
+
+from .client import ChainClient, RPCError, TASKS_SELECTOR
+
+
+class StubRPCHandler(BaseHTTPRequestHandler):
+    """
+    Minimal JSON-RPC node serving a fixed tasks mapping
+    """
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        server = self.server
+        body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        with server.lock:
+            server.posts += 1
+            server.connections.add(self.client_address)
+            fail = server.failures_left > 0
+            server.failures_left -= 1
+
+        if fail:
+            self.send_response(503)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+
+        requests = body if isinstance(body, list) else [body]
+        server.batch_sizes.append(len(requests))
+        responses = [self._handle(request) for request in reversed(requests)]
+
+        payload = json.dumps(responses).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _handle(self, request):
+        if request['method'] == 'eth_blockNumber':
+            return {'jsonrpc': '2.0', 'id': request['id'], 'result': '0x10'}
+
+        data = request['params'][0]['data']
+        assert data[2:10] == TASKS_SELECTOR
+        task_id = int(data[10:], 16)
+        encoded = encode(
+            ['address', 'address', 'string', 'string', 'uint256', 'uint8', 'bytes32'],
+            ['0x' + '11' * 20, '0x' + '00' * 20, f'Task {task_id}', 'desc', task_id * 10, task_id % 5, b'\x00' * 32]
+        )
+        return {'jsonrpc': '2.0', 'id': request['id'], 'result': '0x' + encoded.hex()}
+
+
+class ChainClientTests(SimpleTestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), StubRPCHandler)
+        self.server.lock = threading.Lock()
+        self.server.posts = 0
+        self.server.failures_left = 0
+        self.server.connections = set()
+        self.server.batch_sizes = []
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+        host, port = self.server.server_address
+        self.client = ChainClient(
+            rpc_url=f'http://{host}:{port}',
+            contract_address='0x' + '22' * 20,
+            batch_size=100,
+            max_concurrency=2,
+        )
+
+    def tearDown(self):
+        self.client.close()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_get_tasks_batches_calls(self):
+        tasks = self.client.get_tasks(range(1, 251))
+
+        self.assertEqual(len(tasks), 250)
+        self.assertEqual(tasks[7]['title'], 'Task 7')
+        self.assertEqual(tasks[7]['budget_wei'], 70)
+        self.assertEqual(tasks[7]['status'], 'SUBMITTED')
+        # One block number lookup plus three batches of at most 100 calls
+        self.assertEqual(self.server.posts, 4)
+        self.assertEqual(sorted(self.server.batch_sizes), [1, 50, 100, 100])
+        self.assertLessEqual(len(self.server.connections), 2)
+
+    def test_retries_transient_failures(self):
+        self.server.failures_left = 2
+        self.client.max_retries = 2
+
+        self.assertEqual(self.client.block_number(), 16)
+        self.assertEqual(self.server.posts, 3)
+
+    def test_gives_up_after_max_retries(self):
+        self.server.failures_left = 5
+        self.client.max_retries = 1
+
+        with self.assertRaises(RPCError):
+            self.client.block_number()
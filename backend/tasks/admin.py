@@ -1,14 +1,38 @@
 from django.contrib import admin
-from .models import Task, TaskSubmission
+from .models import Task, TaskEvent, TaskSubmission, StoredBlob
+from .search import filter_by_search
+
+
+class FullTextSearchMixin:
+    """
+    Admin search through the full-text index instead of LIKE '%term%' scans
+    """
+
+    def get_search_results(self, request, queryset, search_term):
+        if search_term:
+            matches = filter_by_search(queryset, search_term)
+            if matches is not None:
+                return matches, False
+        return super().get_search_results(request, queryset, search_term)
 
 @admin.register(Task)
-class TaskAdmin(admin.ModelAdmin):
+class TaskAdmin(FullTextSearchMixin, admin.ModelAdmin):
     list_display = ('title', 'creator', 'assigned_freelancer', 'budget', 'status', 'created_at')
     list_filter = ('status', 'created_at')
     search_fields = ('title', 'description')
 
 @admin.register(TaskSubmission)
-class TaskSubmissionAdmin(admin.ModelAdmin):
+class TaskSubmissionAdmin(FullTextSearchMixin, admin.ModelAdmin):
     list_display = ('task', 'freelancer', 'status', 'submitted_at')
     list_filter = ('status', 'submitted_at')
     search_fields = ('submission_text',)
+
+@admin.register(TaskEvent)
+class TaskEventAdmin(admin.ModelAdmin):
+    list_display = ('task', 'event_type', 'from_status', 'to_status', 'created_at')
+    list_filter = ('event_type', 'created_at')
+
+@admin.register(StoredBlob)
+class StoredBlobAdmin(admin.ModelAdmin):
+    list_display = ('digest', 'size', 'ref_count', 'updated_at')
+    search_fields = ('digest',)
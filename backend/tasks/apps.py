@@ -0,0 +1,13 @@
+from django.apps import AppConfig
+from django.db.models.signals import post_migrate
+
+
+class TasksConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'tasks'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+        from .search import ensure_search_indexes
+
+        post_migrate.connect(ensure_search_indexes, sender=self)
@@ -0,0 +1,88 @@
+import asyncio
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from ai_marketplace.serialization import dumps
+
+from .models import TaskEvent
+
+EVENT_FIELDS = ('id', 'task_id', 'submission_id', 'event_type', 'from_status', 'to_status', 'created_at')
+
+
+def _config(key, default):
+    return getattr(settings, 'TASK_EVENT_CONFIG', {}).get(key, default)
+
+
+def record_task_created(tasks):
+    """
+    Log creation of tasks saved without post_save, e.g. by bulk_create
+    """
+    TaskEvent.objects.bulk_create([
+        TaskEvent(task_id=task.id, event_type='TASK_CREATED', to_status=task.status)
+        for task in tasks
+    ])
+
+
+def record_status_changed(tasks, from_status):
+    """
+    Log status transitions of tasks saved without post_save, e.g. by bulk_update
+    """
+    TaskEvent.objects.bulk_create([
+        TaskEvent(task_id=task.id, event_type='STATUS_CHANGED', from_status=from_status, to_status=task.status)
+        for task in tasks
+    ])
+
+
+def events_after(cursor, task_id=None, limit=None):
+    """
+    Events with an id above ``cursor``, oldest first.
+
+    The newest SETTLE_SECONDS of events are held back: ids are allocated
+    at insert but rows become visible at commit, so a slow transaction can
+    commit an id below one already delivered.
+    """
+    settled = timezone.now() - timedelta(seconds=_config('SETTLE_SECONDS', 1.0))
+    events = TaskEvent.objects.filter(id__gt=cursor, created_at__lte=settled)
+    if task_id is not None:
+        events = events.filter(task_id=task_id)
+    return events.order_by('id').values(*EVENT_FIELDS)[:limit or _config('PAGE_SIZE', 100)]
+
+
+def _sse(event):
+    return (
+        f"id: {event['id']}\n"
+        f"event: {event['event_type']}\n"
+        f"data: {dumps(event).decode()}\n\n"
+    )
+
+
+async def stream_events(cursor, task_id=None):
+    """
+    Server-sent events after ``cursor`` until STREAM_MAX_SECONDS pass; the
+    client's EventSource then reconnects from its Last-Event-ID
+    """
+    page_size = _config('PAGE_SIZE', 100)
+    poll_interval = _config('POLL_INTERVAL', 1.0)
+    heartbeat = _config('HEARTBEAT_SECONDS', 15)
+    deadline = time.monotonic() + _config('STREAM_MAX_SECONDS', 300)
+    quiet_since = time.monotonic()
+
+    yield f"retry: {int(poll_interval * 1000)}\n\n"
+    while time.monotonic() < deadline:
+        events = [event async for event in events_after(cursor, task_id, page_size)]
+        for event in events:
+            cursor = event['id']
+            yield _sse(event)
+        if events:
+            quiet_since = time.monotonic()
+            if len(events) == page_size:
+                # More may be waiting; catch up without sleeping
+                continue
+        elif time.monotonic() - quiet_since >= heartbeat:
+            # Comment line keeping proxies from closing an idle stream
+            yield ": keep-alive\n\n"
+            quiet_since = time.monotonic()
+        await asyncio.sleep(poll_interval)
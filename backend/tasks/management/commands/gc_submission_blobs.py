@@ -0,0 +1,65 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from datetime import datetime, timedelta, timezone as dt_timezone
+from tasks.models import StoredBlob
+from tasks.storage import CAS_PREFIX, blob_digest, submission_storage
+import os
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = 'Delete content-addressed submission files that nothing references'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--grace-minutes',
+            type=int,
+            default=60,
+            help='Only collect blobs unreferenced for at least this long'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report what would be deleted without deleting it'
+        )
+
+    def handle(self, *args, **options):
+        dry_run = options['dry_run']
+        # The grace period covers uploads written to disk but not yet committed
+        cutoff = timezone.now() - timedelta(minutes=options['grace_minutes'])
+
+        orphans = StoredBlob.objects.filter(ref_count__lte=0, updated_at__lt=cutoff)
+        deleted_blobs = 0
+        for blob in orphans.iterator():
+            if not dry_run:
+                # Re-check under the delete so a concurrent reference wins
+                still_orphaned = StoredBlob.objects.filter(
+                    digest=blob.digest, ref_count__lte=0, updated_at__lt=cutoff
+                )
+                if not still_orphaned.delete()[0]:
+                    continue
+                submission_storage.delete(blob.name)
+            deleted_blobs += 1
+
+        # Files on disk with no StoredBlob row, e.g. from crashed requests
+        known = set(StoredBlob.objects.values_list('digest', flat=True))
+        deleted_files = 0
+        root = submission_storage.path(CAS_PREFIX)
+        for dirpath, _, filenames in os.walk(root):
+            for filename in filenames:
+                full_path = os.path.join(dirpath, filename)
+                name = os.path.relpath(full_path, submission_storage.location).replace(os.sep, '/')
+                modified = datetime.fromtimestamp(os.path.getmtime(full_path), tz=dt_timezone.utc)
+                if blob_digest(name) in known or modified >= cutoff:
+                    continue
+                if not dry_run:
+                    os.remove(full_path)
+                deleted_files += 1
+
+        verb = 'Would delete' if dry_run else 'Deleted'
+        logger.info(f'{verb} {deleted_blobs} orphaned blobs and {deleted_files} untracked files')
+        self.stdout.write(self.style.SUCCESS(
+            f'{verb} {deleted_blobs} orphaned blobs and {deleted_files} untracked files'
+        ))
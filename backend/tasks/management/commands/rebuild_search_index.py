@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+from tasks.search import SearchIndex, search_indexes
+
+
+class Command(BaseCommand):
+    help = 'Create any missing full-text search index and rebuild its contents'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS)
+
+    def handle(self, *args, **options):
+        connection = connections[options['database']]
+        if not SearchIndex.supported(connection):
+            raise CommandError(f'Full-text search is not supported on {connection.vendor}')
+
+        for model, index in search_indexes().items():
+            index.ensure(connection)
+            index.rebuild(connection)
+            self.stdout.write(f'Rebuilt search index for {model._meta.label}')
+        self.stdout.write(self.style.SUCCESS('Search indexes are up to date'))
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.1 on 2026-10-19 16:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tasksubmission',
+            name='submission_hash',
+            field=models.CharField(blank=True, db_index=True, max_length=66),
+        ),
+    ]
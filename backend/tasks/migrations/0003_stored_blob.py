@@ -0,0 +1,30 @@
+# Generated by Django 5.0.1 on 2026-10-19 16:57
+
+import tasks.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0002_submission_hash'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StoredBlob',
+            fields=[
+                ('digest', models.CharField(max_length=64, primary_key=True, serialize=False)),
+                ('name', models.CharField(max_length=255)),
+                ('size', models.BigIntegerField()),
+                ('ref_count', models.IntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AlterField(
+            model_name='tasksubmission',
+            name='submission_file',
+            field=models.FileField(blank=True, null=True, storage=tasks.storage.get_submission_storage, upload_to='task_submissions/'),
+        ),
+    ]
@@ -2,6 +2,8 @@ from django.db import models
 from django.conf import settings
 from django.utils import timezone
 
+from .storage import get_submission_storage
+
 class Task(models.Model):
     """
     Represents a task in the decentralized marketplace
@@ -38,14 +40,14 @@ class Task(models.Model):
     blockchain_task_id = models.IntegerField(null=True, blank=True)
     
     created_at = models.DateTimeField(auto_now_add=True)
-    updated_at = models.DateTimeField(auto_now=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     def recommend_freelancers(self, top_n=5):
         """
-        Recommend top freelancers for this task
+        Recommend top freelancers for this task with their match scores
         """
         from ai_models.recommendation import FreelancerRecommendationEngine
-        return FreelancerRecommendationEngine.recommend_freelancers(self, top_n)
+        return FreelancerRecommendationEngine.score_freelancers(self, top_n)
 
     def __str__(self):
         return self.title
@@ -63,7 +65,14 @@ class TaskSubmission(models.Model):
     task = models.ForeignKey(Task, on_delete=models.CASCADE, related_name='submissions')
     freelancer = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     
-    submission_file = models.FileField(upload_to='task_submissions/', null=True, blank=True)
+    submission_file = models.FileField(
+        upload_to='task_submissions/',
+        storage=get_submission_storage,
+        null=True,
+        blank=True
+    )
+    # 0x-prefixed SHA-256 of submission_file, ready for submitWork's bytes32
+    submission_hash = models.CharField(max_length=66, blank=True, db_index=True)
     submission_text = models.TextField()
     
     status = models.CharField(
@@ -77,3 +86,44 @@ class TaskSubmission(models.Model):
 
     def __str__(self):
         return f"Submission for {self.task.title} by {self.freelancer.username}"
+
+class TaskEvent(models.Model):
+    """
+    Append-only log of task lifecycle changes; the id is the stream cursor
+    """
+    EVENT_TYPES = [
+        ('TASK_CREATED', 'Task Created'),
+        ('STATUS_CHANGED', 'Status Changed'),
+        ('SUBMISSION_CREATED', 'Submission Created'),
+        ('SUBMISSION_REVIEWED', 'Submission Reviewed'),
+    ]
+
+    task = models.ForeignKey(Task, on_delete=models.CASCADE, related_name='events')
+    submission = models.ForeignKey(
+        TaskSubmission,
+        on_delete=models.SET_NULL,
+        related_name='events',
+        null=True,
+        blank=True
+    )
+    event_type = models.CharField(max_length=30, choices=EVENT_TYPES)
+    from_status = models.CharField(max_length=20, blank=True)
+    to_status = models.CharField(max_length=20, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.event_type} for task {self.task_id}"
+
+class StoredBlob(models.Model):
+    """
+    A content-addressed submission file shared by every submission with the same bytes
+    """
+    digest = models.CharField(max_length=64, primary_key=True)
+    name = models.CharField(max_length=255)
+    size = models.BigIntegerField()
+    ref_count = models.IntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.digest} ({self.ref_count} refs)"
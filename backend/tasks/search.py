@@ -0,0 +1,212 @@
+import logging
+import re
+
+from django.db import connections
+from django.db.models.expressions import RawSQL
+
+logger = logging.getLogger(__name__)
+
+# bm25 column weights standing in for Postgres setweight() classes
+BM25_WEIGHTS = {'A': 10.0, 'B': 4.0, 'C': 2.0, 'D': 1.0}
+
+SEARCH_CONFIG = 'english'
+
+
+class SearchIndex:
+    """
+    Full-text index over some columns of a model's table.
+
+    On SQLite it is an external-content FTS5 table kept in sync by
+    triggers; on Postgres a generated, GIN-indexed tsvector column. Both
+    follow every write, including bulk_create and queryset updates.
+    Other databases have no index and callers fall back to LIKE lookups.
+    """
+
+    def __init__(self, model, fields):
+        # fields: (field name, weight class 'A'-'D') pairs
+        self.model = model
+        self.fields = fields
+
+    @property
+    def table(self):
+        return self.model._meta.db_table
+
+    @property
+    def fts_table(self):
+        return f"{self.table}_fts"
+
+    def columns(self):
+        return [self.model._meta.get_field(name).column for name, _ in self.fields]
+
+    @staticmethod
+    def supported(connection):
+        return connection.vendor in ('sqlite', 'postgresql')
+
+    def ensure(self, connection):
+        """
+        Create whatever part of the index is missing and fill it if needed
+        """
+        if connection.vendor == 'sqlite':
+            self._ensure_sqlite(connection)
+        elif connection.vendor == 'postgresql':
+            self._ensure_postgresql(connection)
+
+    def rebuild(self, connection):
+        if connection.vendor == 'sqlite':
+            with connection.cursor() as cursor:
+                cursor.execute(f"INSERT INTO {self.fts_table}({self.fts_table}) VALUES ('rebuild')")
+        # The Postgres column is generated, so it never needs a rebuild
+
+    def _sqlite_triggers(self):
+        columns = self.columns()
+        names = ', '.join(columns)
+        new_values = ', '.join(f'new.{column}' for column in columns)
+        old_values = ', '.join(f'old.{column}' for column in columns)
+        insert = f"INSERT INTO {self.fts_table}(rowid, {names}) VALUES (new.id, {new_values});"
+        delete = (
+            f"INSERT INTO {self.fts_table}({self.fts_table}, rowid, {names}) "
+            f"VALUES ('delete', old.id, {old_values});"
+        )
+        return {
+            f"{self.fts_table}_ai": f"AFTER INSERT ON {self.table} BEGIN {insert} END",
+            f"{self.fts_table}_ad": f"AFTER DELETE ON {self.table} BEGIN {delete} END",
+            f"{self.fts_table}_au": f"AFTER UPDATE OF {names} ON {self.table} BEGIN {delete} {insert} END",
+        }
+
+    def _ensure_sqlite(self, connection):
+        triggers = self._sqlite_triggers()
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT name FROM sqlite_master WHERE name = %s OR (type = 'trigger' AND tbl_name = %s)",
+                [self.fts_table, self.table],
+            )
+            existing = {row[0] for row in cursor.fetchall()}
+            if {self.fts_table, *triggers} <= existing:
+                return
+
+            # Triggers are lost whenever Django remakes the table during a
+            # migration, so the index may be stale and is rebuilt below
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {self.fts_table} USING fts5("
+                f"{', '.join(self.columns())}, content='{self.table}', content_rowid='id', "
+                f"tokenize='porter unicode61')"
+            )
+            for name, body in triggers.items():
+                cursor.execute(f"CREATE TRIGGER IF NOT EXISTS {name} {body}")
+        self.rebuild(connection)
+        logger.info(f"Built full-text index {self.fts_table}")
+
+    def _ensure_postgresql(self, connection):
+        parts = []
+        for name, weight in self.fields:
+            field = self.model._meta.get_field(name)
+            if field.get_internal_type() == 'JSONField':
+                vector = f"jsonb_to_tsvector('{SEARCH_CONFIG}', coalesce({field.column}, '[]'), '[\"string\"]')"
+            else:
+                vector = f"to_tsvector('{SEARCH_CONFIG}', coalesce({field.column}, ''))"
+            parts.append(f"setweight({vector}, '{weight}')")
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"ALTER TABLE {self.table} ADD COLUMN IF NOT EXISTS search_vector tsvector "
+                f"GENERATED ALWAYS AS ({' || '.join(parts)}) STORED"
+            )
+            cursor.execute(
+                f"CREATE INDEX IF NOT EXISTS {self.table}_search_idx ON {self.table} USING GIN (search_vector)"
+            )
+
+    def match(self, connection, text):
+        """
+        (sql, params) selecting ids of rows matching ``text``, or None when
+        nothing could match
+        """
+        if connection.vendor == 'sqlite':
+            expression = fts5_query(text)
+            if not expression:
+                return None
+            return f"SELECT rowid FROM {self.fts_table} WHERE {self.fts_table} MATCH %s", [expression]
+        return (
+            f"SELECT id FROM {self.table} "
+            f"WHERE search_vector @@ websearch_to_tsquery('{SEARCH_CONFIG}', %s)",
+            [text],
+        )
+
+    def ranked(self, connection, text, limit, offset):
+        """
+        (ids best first, relevance by id, total matches) for one page
+        """
+        if connection.vendor == 'sqlite':
+            expression = fts5_query(text)
+            if not expression:
+                return [], {}, 0
+            weights = ', '.join(str(BM25_WEIGHTS[weight]) for _, weight in self.fields)
+            # bm25() is lower for better matches
+            page_sql = (
+                f"SELECT rowid, -bm25({self.fts_table}, {weights}) AS rank FROM {self.fts_table} "
+                f"WHERE {self.fts_table} MATCH %s ORDER BY rank DESC, rowid LIMIT %s OFFSET %s"
+            )
+            count_sql = f"SELECT count(*) FROM {self.fts_table} WHERE {self.fts_table} MATCH %s"
+            params = [expression]
+        else:
+            page_sql = (
+                f"SELECT id, ts_rank_cd(search_vector, query) AS rank "
+                f"FROM {self.table}, websearch_to_tsquery('{SEARCH_CONFIG}', %s) query "
+                f"WHERE search_vector @@ query ORDER BY rank DESC, id LIMIT %s OFFSET %s"
+            )
+            count_sql = (
+                f"SELECT count(*) FROM {self.table} "
+                f"WHERE search_vector @@ websearch_to_tsquery('{SEARCH_CONFIG}', %s)"
+            )
+            params = [text]
+
+        with connection.cursor() as cursor:
+            cursor.execute(page_sql, params + [limit, offset])
+            rows = cursor.fetchall()
+            cursor.execute(count_sql, params)
+            total = cursor.fetchone()[0]
+        return [row[0] for row in rows], {row[0]: row[1] for row in rows}, total
+
+
+def fts5_query(text):
+    """
+    FTS5 expression requiring every word of ``text``, the last one as a
+    prefix; FTS5 operators in user input are never interpreted
+    """
+    words = re.findall(r'\w+', text or '')
+    if not words:
+        return ''
+    return ' '.join(f'"{word}"' for word in words) + '*'
+
+
+def search_indexes():
+    from .models import Task, TaskSubmission
+
+    return {
+        Task: SearchIndex(Task, [('title', 'A'), ('skills_required', 'A'), ('description', 'B')]),
+        TaskSubmission: SearchIndex(TaskSubmission, [('submission_text', 'A')]),
+    }
+
+
+def filter_by_search(queryset, text):
+    """
+    Narrow a queryset of an indexed model to rows matching ``text``;
+    None when the database has no full-text index
+    """
+    connection = connections[queryset.db]
+    index = search_indexes().get(queryset.model)
+    if index is None or not index.supported(connection):
+        return None
+    match = index.match(connection, text)
+    if match is None:
+        return queryset.none()
+    return queryset.filter(id__in=RawSQL(*match))
+
+
+def ensure_search_indexes(using='default', **kwargs):
+    """
+    post_migrate hook installing (or repairing) the full-text indexes
+    """
+    connection = connections[using]
+    if not SearchIndex.supported(connection):
+        return
+    for index in search_indexes().values():
+        index.ensure(connection)
@@ -0,0 +1,5 @@
+from ai_marketplace.serialization import ValuesSerializer, model_fields
+from .models import Task
+
+# Every concrete Task column, keyed like Task.objects.values()
+TaskValues = ValuesSerializer(Task, model_fields(Task))
@@ -0,0 +1,241 @@
+from django.contrib.auth import get_user_model
+from django.db.models import Case, F, FloatField, When
+from django.db.models.functions import Cast
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from ai_models.models import FreelancerProfile
+
+from .models import Task, TaskEvent, TaskSubmission
+from .storage import add_blob_reference, release_blob_reference
+
+User = get_user_model()
+
+REVIEWED_STATUSES = ('APPROVED', 'REJECTED')
+
+
+# Marks a tracked field that was deferred when the instance was loaded
+NOT_LOADED = object()
+
+TRACKED_FIELDS = {
+    Task: ('status', 'skills_required'),
+    TaskSubmission: ('status', 'submission_file'),
+}
+
+
+def _field_state(instance, field):
+    """
+    Comparable value of a tracked field, read without triggering deferred loads
+    """
+    value = instance.__dict__.get(field, NOT_LOADED)
+    if value is NOT_LOADED:
+        return value
+    if field == 'skills_required':
+        return list(value)
+    if field == 'submission_file':
+        return getattr(value, 'name', value) or None
+    return value
+
+
+@receiver(post_init, sender=Task)
+@receiver(post_init, sender=TaskSubmission)
+def remember_loaded_state(sender, instance, **kwargs):
+    """
+    Keep tracked fields as loaded so saves can detect transitions without a query
+    """
+    instance._loaded = {
+        field: _field_state(instance, field) if instance.pk else None
+        for field in TRACKED_FIELDS[sender]
+    }
+
+
+def _transition(instance, field, created):
+    """
+    Return (old, new) for a tracked field, or None if it didn't change or can't be known
+    """
+    old = None if created else instance._loaded[field]
+    new = _field_state(instance, field)
+    if old is NOT_LOADED or new is NOT_LOADED or old == new:
+        return None
+    return old, new
+
+
+def _mark_saved(instance):
+    for field in instance._loaded:
+        state = _field_state(instance, field)
+        if state is not NOT_LOADED:
+            instance._loaded[field] = state
+
+
+def _apply_freelancer_deltas(user_ids, reviewed=0, approved=0, completed=0):
+    """
+    Adjust denormalized freelancer counters in a single UPDATE.
+
+    Expressions refer to pre-update column values, so the derived rates are
+    computed from the old counts plus the deltas.
+    """
+    if not user_ids or not (reviewed or approved or completed):
+        return
+
+    new_reviewed = F('submissions_reviewed') + reviewed
+    new_approved = F('submissions_approved') + approved
+    rate = Case(
+        When(submissions_reviewed__gt=-reviewed, then=Cast(new_approved, FloatField()) / new_reviewed),
+        default=0.0,
+        output_field=FloatField(),
+    )
+
+    User.objects.filter(pk__in=user_ids).update(
+        submissions_reviewed=new_reviewed,
+        submissions_approved=new_approved,
+        total_tasks_completed=F('total_tasks_completed') + completed,
+        approval_rate=rate,
+        reputation_score=rate * User.REPUTATION_SCALE,
+    )
+    # Queryset updates skip auto_now and signals; mark the profiles for the feature store
+    if FreelancerProfile.objects.filter(user_id__in=user_ids).update(updated_at=timezone.now()):
+        from ai_models.signals import queue_feature_store_refresh
+        queue_feature_store_refresh()
+
+
+def _submission_deltas(old_status, new_status):
+    reviewed = int(new_status in REVIEWED_STATUSES) - int(old_status in REVIEWED_STATUSES)
+    approved = int(new_status == 'APPROVED') - int(old_status == 'APPROVED')
+    return reviewed, approved
+
+
+def _has_other_approval(submission):
+    return TaskSubmission.objects.filter(
+        task_id=submission.task_id,
+        freelancer_id=submission.freelancer_id,
+        status='APPROVED',
+    ).exclude(pk=submission.pk).exists()
+
+
+def _completed_delta(submission, approved):
+    """
+    A COMPLETED task counts once per freelancer with an approved submission
+    """
+    if not approved:
+        return 0
+    # Read the status fresh; a cached submission.task may be stale
+    if not Task.objects.filter(pk=submission.task_id, status='COMPLETED').exists():
+        return 0
+    return 0 if _has_other_approval(submission) else approved
+
+
+@receiver(post_save, sender=TaskSubmission)
+def update_stats_on_submission_save(sender, instance, created, **kwargs):
+    transition = _transition(instance, 'status', created)
+    if transition:
+        reviewed, approved = _submission_deltas(*transition)
+        _apply_freelancer_deltas(
+            [instance.freelancer_id],
+            reviewed=reviewed,
+            approved=approved,
+            completed=_completed_delta(instance, approved),
+        )
+
+
+@receiver(post_delete, sender=TaskSubmission)
+def update_stats_on_submission_delete(sender, instance, **kwargs):
+    reviewed, approved = _submission_deltas(instance.status, None)
+    _apply_freelancer_deltas([instance.freelancer_id], reviewed=reviewed, approved=approved)
+    if approved:
+        # Sibling submissions may have gone in the same batch delete, so a
+        # delta can't be derived from what remains; recount this freelancer
+        completed = Task.objects.filter(
+            status='COMPLETED',
+            submissions__freelancer_id=instance.freelancer_id,
+            submissions__status='APPROVED',
+        ).distinct().count()
+        User.objects.filter(pk=instance.freelancer_id).update(total_tasks_completed=completed)
+
+
+@receiver(post_save, sender=Task)
+def update_stats_on_task_save(sender, instance, created, **kwargs):
+    transition = _transition(instance, 'status', created)
+    if created or not transition:
+        return
+    was_completed, is_completed = (status == 'COMPLETED' for status in transition)
+    if was_completed != is_completed:
+        freelancer_ids = list(
+            instance.submissions.filter(status='APPROVED')
+            .values_list('freelancer_id', flat=True).distinct()
+        )
+        _apply_freelancer_deltas(freelancer_ids, completed=1 if is_completed else -1)
+
+
+@receiver(post_save, sender=Task)
+def queue_recommendation_snapshot(sender, instance, created, **kwargs):
+    """
+    Precompute recommendations for open tasks when they appear or their skills change
+    """
+    skills_changed = _transition(instance, 'skills_required', created) is not None
+    if instance.status == 'CREATED' and (created or skills_changed):
+        from ai_models.snapshots import queue_snapshot_refresh
+        queue_snapshot_refresh([instance.id])
+
+
+@receiver(post_save, sender=TaskSubmission)
+def update_blob_references_on_save(sender, instance, created, **kwargs):
+    transition = _transition(instance, 'submission_file', created)
+    if transition:
+        old_file, new_file = transition
+        if new_file:
+            add_blob_reference(new_file)
+        if old_file:
+            release_blob_reference(old_file)
+
+
+@receiver(post_delete, sender=TaskSubmission)
+def release_blob_reference_on_delete(sender, instance, **kwargs):
+    if instance.submission_file.name:
+        release_blob_reference(instance.submission_file.name)
+
+
+@receiver(post_save, sender=Task)
+def record_task_event(sender, instance, created, **kwargs):
+    """
+    Append task creation and status transitions to the event log
+    """
+    if created:
+        TaskEvent.objects.create(task=instance, event_type='TASK_CREATED', to_status=instance.status)
+        return
+    transition = _transition(instance, 'status', created)
+    if transition:
+        TaskEvent.objects.create(
+            task=instance,
+            event_type='STATUS_CHANGED',
+            from_status=transition[0],
+            to_status=transition[1],
+        )
+
+
+@receiver(post_save, sender=TaskSubmission)
+def record_submission_event(sender, instance, created, **kwargs):
+    if created:
+        TaskEvent.objects.create(
+            task_id=instance.task_id,
+            submission=instance,
+            event_type='SUBMISSION_CREATED',
+            to_status=instance.status,
+        )
+        return
+    transition = _transition(instance, 'status', created)
+    if transition:
+        TaskEvent.objects.create(
+            task_id=instance.task_id,
+            submission=instance,
+            event_type='SUBMISSION_REVIEWED',
+            from_status=transition[0],
+            to_status=transition[1],
+        )
+
+
+# Registered last so every post_save handler above sees the pre-save state
+@receiver(post_save, sender=Task)
+@receiver(post_save, sender=TaskSubmission)
+def remember_saved_state(sender, instance, **kwargs):
+    _mark_saved(instance)
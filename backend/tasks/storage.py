@@ -0,0 +1,111 @@
+import hashlib
+import os
+import uuid
+
+from django.core.files.move import file_move_safe
+from django.core.files.storage import FileSystemStorage
+from django.db.models import F
+from django.utils import timezone
+
+CAS_PREFIX = 'task_submissions/cas/'
+
+
+def blob_name(digest):
+    """
+    Storage path for a blob; fanned out so no directory grows unbounded
+    """
+    return f"{CAS_PREFIX}{digest[:2]}/{digest[2:4]}/{digest}"
+
+
+def blob_digest(name):
+    """
+    Return the digest a stored name refers to, or None for non-CAS files
+    """
+    if name and name.startswith(CAS_PREFIX):
+        return os.path.basename(name)
+    return None
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    File storage that keys every file by the SHA-256 of its content.
+
+    Saving bytes that are already stored returns the existing name without
+    writing anything. Uploads hashed by HashingUploadHandler carry their
+    digest; other content is hashed while it is copied into place.
+    """
+
+    def get_available_name(self, name, max_length=None):
+        # Names are derived from content in _save, never deduplicated by suffix
+        return name
+
+    def _save(self, name, content):
+        digest = getattr(content, 'sha256', None)
+        if digest and self.exists(blob_name(digest)):
+            return blob_name(digest)
+
+        os.makedirs(self.path(CAS_PREFIX), exist_ok=True)
+        tmp_path = self.path(f"{CAS_PREFIX}.part-{uuid.uuid4().hex}")
+
+        if digest and hasattr(content, 'temporary_file_path'):
+            file_move_safe(content.temporary_file_path(), tmp_path)
+        else:
+            hasher = hashlib.sha256()
+            with open(tmp_path, 'wb') as f:
+                for chunk in content.chunks():
+                    hasher.update(chunk)
+                    f.write(chunk)
+            digest = hasher.hexdigest()
+
+        name = blob_name(digest)
+        full_path = self.path(name)
+        if os.path.exists(full_path):
+            os.remove(tmp_path)
+            return name
+
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        if self.file_permissions_mode is not None:
+            os.chmod(tmp_path, self.file_permissions_mode)
+        # Same content under the same name, so a concurrent writer is harmless
+        os.replace(tmp_path, full_path)
+        return name
+
+
+submission_storage = ContentAddressedStorage()
+
+
+def get_submission_storage():
+    return submission_storage
+
+
+def add_blob_reference(name):
+    """
+    Count a reference to a stored blob, registering it on first use
+    """
+    from .models import StoredBlob
+
+    digest = blob_digest(name)
+    if not digest:
+        return
+
+    blob, created = StoredBlob.objects.get_or_create(
+        digest=digest,
+        defaults={'name': name, 'size': submission_storage.size(name), 'ref_count': 1}
+    )
+    if not created:
+        StoredBlob.objects.filter(digest=digest).update(
+            ref_count=F('ref_count') + 1, updated_at=timezone.now()
+        )
+
+
+def release_blob_reference(name):
+    """
+    Drop a reference; unreferenced blobs are removed by gc_submission_blobs
+    """
+    from .models import StoredBlob
+
+    digest = blob_digest(name)
+    if digest:
+        StoredBlob.objects.filter(digest=digest, ref_count__gt=0).update(
+            ref_count=F('ref_count') - 1, updated_at=timezone.now()
+        )
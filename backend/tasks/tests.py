@@ -0,0 +1,682 @@
+import contextvars
+import gzip
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+from datetime import timedelta
+from io import StringIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections, router, transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from unittest import mock
+
+from ai_marketplace.db import STICKY_COOKIE, read_from_replica
+from ai_marketplace.http import negotiate_encoding
+from ai_models.models import FreelancerProfile, RecommendationSnapshot
+from ai_models.tests import LocalArtifactsMixin, make_marketplace
+from tasks.models import StoredBlob, Task, TaskEvent, TaskSubmission
+from tasks.search import filter_by_search, search_indexes
+from tasks.storage import blob_name, submission_storage
+from users.models import CustomUser
+
+REPLICA = 'replica_test'
+
+# A database standing in for a read replica. It is registered at import,
+# before the runner creates the test databases, and doesn't mirror the
+# primary, so a read that reaches it only sees rows copied with replicate()
+connections.settings[REPLICA] = connections.configure_settings({
+    **connections.settings,
+    REPLICA: {'ENGINE': 'django.db.backends.sqlite3', 'NAME': ':memory:'},
+})[REPLICA]
+
+
+def replicate(*models):
+    """
+    Copy the primary's rows of ``models`` to the replica, as replication would
+    """
+    for model in models:
+        model.objects.using(REPLICA).all().delete()
+        model.objects.using(REPLICA).bulk_create(model.objects.using(DEFAULT_DB_ALIAS).all())
+
+
+def make_task(creator, skills=('python',), title='Task', **fields):
+    return Task.objects.create(
+        creator=creator, title=title, description='Description', budget=100, skills_required=list(skills), **fields
+    )
+
+
+class FreelancerStatsTest(TestCase):
+    """
+    Denormalized freelancer counters follow submission and task writes
+    """
+
+    def setUp(self):
+        self.client_user = CustomUser.objects.create_user(username='client', password='pw')
+        self.freelancer = CustomUser.objects.create_user(username='freelancer', password='pw', is_freelancer=True)
+        self.task = make_task(self.client_user)
+
+    def submit(self, task=None, status='PENDING'):
+        return TaskSubmission.objects.create(
+            task=task or self.task, freelancer=self.freelancer, submission_text='Done', status=status
+        )
+
+    def assertStats(self, reviewed, approved, completed):
+        self.freelancer.refresh_from_db()
+        self.assertEqual(
+            (
+                self.freelancer.submissions_reviewed,
+                self.freelancer.submissions_approved,
+                self.freelancer.total_tasks_completed,
+            ),
+            (reviewed, approved, completed),
+        )
+        rate = approved / reviewed if reviewed else 0.0
+        self.assertAlmostEqual(self.freelancer.approval_rate, rate)
+        self.assertAlmostEqual(self.freelancer.reputation_score, rate * CustomUser.REPUTATION_SCALE)
+
+    def test_approve_and_unapprove(self):
+        submission = self.submit()
+        self.assertStats(0, 0, 0)
+
+        submission.status = 'APPROVED'
+        submission.save()
+        self.assertStats(1, 1, 0)
+
+        submission.status = 'REJECTED'
+        submission.save()
+        self.assertStats(1, 0, 0)
+
+        submission.status = 'PENDING'
+        submission.save()
+        self.assertStats(0, 0, 0)
+
+    def test_completing_a_task_counts_once_per_freelancer(self):
+        self.submit(status='APPROVED')
+        self.submit(status='APPROVED')
+        self.task.status = 'COMPLETED'
+        self.task.save()
+        self.assertStats(2, 2, 1)
+
+        self.task.status = 'SUBMITTED'
+        self.task.save()
+        self.assertStats(2, 2, 0)
+
+    def test_approving_on_a_completed_task(self):
+        self.task.status = 'COMPLETED'
+        self.task.save()
+        submission = self.submit()
+        submission.status = 'APPROVED'
+        submission.save()
+        self.assertStats(1, 1, 1)
+
+        # A second approval for the same task doesn't count it twice
+        second = self.submit()
+        second.status = 'APPROVED'
+        second.save()
+        self.assertStats(2, 2, 1)
+
+    def test_submission_delete(self):
+        approved = self.submit(status='APPROVED')
+        rejected = self.submit(status='REJECTED')
+        self.task.status = 'COMPLETED'
+        self.task.save()
+        self.assertStats(2, 1, 1)
+
+        rejected.delete()
+        self.assertStats(1, 1, 1)
+        approved.delete()
+        self.assertStats(0, 0, 0)
+
+    def test_task_cascade_delete_decrements_once(self):
+        self.submit(status='APPROVED')
+        self.submit(status='APPROVED')
+        self.submit(status='REJECTED')
+        self.task.status = 'COMPLETED'
+        self.task.save()
+        other = make_task(self.client_user, status='COMPLETED')
+        self.submit(task=other, status='APPROVED')
+        self.assertStats(4, 3, 2)
+
+        self.task.delete()
+        self.assertStats(1, 1, 1)
+
+    def test_deferred_querysets_load_nothing_extra(self):
+        self.submit(status='APPROVED')
+        with self.assertNumQueries(1):
+            list(Task.objects.only('id'))
+        with self.assertNumQueries(1):
+            list(TaskSubmission.objects.defer('status', 'submission_file'))
+
+    def test_deferred_instance_save_keeps_stats(self):
+        self.submit(status='APPROVED')
+        task = Task.objects.only('id', 'title').get(pk=self.task.pk)
+        task.title = 'Renamed'
+        task.save(update_fields=['title'])
+        self.assertStats(1, 1, 0)
+
+    def test_reconcile_command_repairs_drift(self):
+        self.submit(status='APPROVED')
+        self.submit(status='REJECTED')
+        self.task.status = 'COMPLETED'
+        self.task.save()
+        CustomUser.objects.filter(pk=self.freelancer.pk).update(
+            submissions_reviewed=9, submissions_approved=0, total_tasks_completed=7, approval_rate=0, reputation_score=0
+        )
+
+        call_command('reconcile_freelancer_stats', stdout=StringIO())
+        self.assertStats(2, 1, 1)
+
+
+class SubmissionBlobTest(TestCase):
+    """
+    Submission files are stored once per content and reference counted
+    """
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, True)
+        media = override_settings(MEDIA_ROOT=media_root)
+        media.enable()
+        self.addCleanup(media.disable)
+
+        self.client_user = CustomUser.objects.create_user(username='client', password='pw')
+        self.alice = CustomUser.objects.create_user(username='alice', password='pw', is_freelancer=True)
+        self.bob = CustomUser.objects.create_user(username='bob', password='pw', is_freelancer=True)
+        self.task = make_task(self.client_user)
+        self.url = f'/api/tasks/{self.task.id}/submit/'
+
+    def upload(self, user, content=b'deliverable'):
+        self.client.force_login(user)
+        return self.client.post(self.url, {
+            'submission_text': 'Done',
+            'submission_file': SimpleUploadedFile('work.txt', content),
+        })
+
+    def submit_json(self, user, **data):
+        self.client.force_login(user)
+        return self.client.post(self.url, {'submission_text': 'Done', **data}, content_type='application/json')
+
+    def blob(self, content=b'deliverable'):
+        return StoredBlob.objects.get(digest=hashlib.sha256(content).hexdigest())
+
+    def test_identical_uploads_share_one_blob(self):
+        first = self.upload(self.alice)
+        second = self.upload(self.bob)
+        self.assertEqual(first.status_code, 201)
+        self.assertEqual(second.status_code, 201)
+        self.assertEqual(first.json()['submission_hash'], '0x' + hashlib.sha256(b'deliverable').hexdigest())
+
+        blob = self.blob()
+        self.assertEqual(blob.ref_count, 2)
+        self.assertEqual(set(TaskSubmission.objects.values_list('submission_file', flat=True)), {blob.name})
+        self.assertTrue(submission_storage.exists(blob.name))
+
+    def test_large_upload_is_hashed_across_chunks(self):
+        from tasks.uploads import HashingUploadHandler
+
+        # Past the in-memory limit and spread over several handler chunks
+        size = settings.FILE_UPLOAD_MAX_MEMORY_SIZE + 3 * HashingUploadHandler.chunk_size
+        content = bytes(range(256)) * (size // 256 + 1)
+        receive = HashingUploadHandler.receive_data_chunk
+        with mock.patch.object(
+            HashingUploadHandler, 'receive_data_chunk', autospec=True, side_effect=receive
+        ) as chunks:
+            response = self.upload(self.alice, content)
+
+        self.assertEqual(response.status_code, 201)
+        self.assertGreater(chunks.call_count, 3)
+        self.assertEqual(response.json()['submission_hash'], '0x' + hashlib.sha256(content).hexdigest())
+        with submission_storage.open(self.blob(content).name) as f:
+            self.assertEqual(f.read(), content)
+
+    def test_owner_can_resubmit_by_hash(self):
+        submission_hash = self.upload(self.alice).json()['submission_hash']
+        response = self.submit_json(self.alice, submission_hash=submission_hash)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(self.blob().ref_count, 2)
+
+    def test_others_content_cannot_be_claimed_by_hash_or_name(self):
+        submission_hash = self.upload(self.alice).json()['submission_hash']
+        blob = self.blob()
+
+        by_hash = self.submit_json(self.bob, submission_hash=submission_hash)
+        by_name = self.submit_json(self.bob, submission_file=blob.name)
+        unknown = self.submit_json(self.bob, submission_hash='0x' + 'ab' * 32)
+
+        for response in (by_hash, by_name):
+            self.assertEqual(response.status_code, 404)
+            self.assertEqual(response.json(), unknown.json())
+        self.assertFalse(TaskSubmission.objects.filter(freelancer=self.bob).exists())
+        self.assertEqual(self.blob().ref_count, 1)
+
+    def test_references_follow_file_changes_and_deletes(self):
+        self.upload(self.alice)
+        self.upload(self.bob)
+        submission = TaskSubmission.objects.get(freelancer=self.bob)
+
+        submission.submission_file.save('other.txt', ContentFile(b'revised'), save=False)
+        submission.save()
+        self.assertEqual(self.blob().ref_count, 1)
+        self.assertEqual(self.blob(b'revised').ref_count, 1)
+
+        submission.delete()
+        TaskSubmission.objects.get(freelancer=self.alice).delete()
+        self.assertEqual(self.blob().ref_count, 0)
+        self.assertEqual(self.blob(b'revised').ref_count, 0)
+        # Files stay until garbage collection
+        self.assertTrue(submission_storage.exists(self.blob().name))
+
+    def test_gc_deletes_only_old_orphans(self):
+        self.upload(self.alice, b'kept')
+        self.upload(self.alice, b'orphan')
+        self.upload(self.alice, b'recent orphan')
+        TaskSubmission.objects.exclude(submission_file=self.blob(b'kept').name).delete()
+        StoredBlob.objects.filter(digest=self.blob(b'orphan').digest).update(
+            updated_at=timezone.now() - timedelta(hours=2)
+        )
+
+        # A file left on disk without a StoredBlob row, e.g. by a crashed request
+        untracked = submission_storage.path(blob_name('cd' * 32))
+        os.makedirs(os.path.dirname(untracked))
+        with open(untracked, 'wb') as f:
+            f.write(b'untracked')
+        two_hours_ago = time.time() - 7200
+        os.utime(untracked, (two_hours_ago, two_hours_ago))
+
+        orphan_name = self.blob(b'orphan').name
+        call_command('gc_submission_blobs', dry_run=True, stdout=StringIO())
+        self.assertTrue(submission_storage.exists(orphan_name))
+        self.assertTrue(os.path.exists(untracked))
+
+        call_command('gc_submission_blobs', stdout=StringIO())
+        self.assertFalse(StoredBlob.objects.filter(name=orphan_name).exists())
+        self.assertFalse(submission_storage.exists(orphan_name))
+        self.assertFalse(os.path.exists(untracked))
+        for content in (b'kept', b'recent orphan'):
+            self.assertTrue(submission_storage.exists(self.blob(content).name))
+
+
+class ReplicaTestCase(TransactionTestCase):
+    """
+    Routes reads marked with read_from_replica to the REPLICA database
+    """
+    databases = {DEFAULT_DB_ALIAS, REPLICA}
+
+    def setUp(self):
+        super().setUp()
+        # Enabled per test rather than per class, so the teardown flush
+        # still reaches the replica
+        replicas = override_settings(REPLICA_DATABASES=[REPLICA])
+        replicas.enable()
+        self.addCleanup(replicas.disable)
+
+        # Without a wrapping transaction on_commit work runs at once; keep
+        # it off the background executors, which would outlive the test
+        from ai_models import feature_store, jobs, snapshots
+        for module, name in ((jobs, '_executor'), (snapshots, '_executor'), (feature_store, '_refresh_executor')):
+            patcher = mock.patch.object(module, name)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.addCleanup(snapshots._pending_task_ids.clear)
+        self.addCleanup(setattr, feature_store, '_refresh_pending', False)
+
+
+class ReplicaRoutingTest(ReplicaTestCase):
+    """
+    Marked reads go to a replica, writes to the primary, and a client that
+    wrote reads from the primary for a while
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.user = CustomUser.objects.create_user(username='client', password='pw')
+
+    def listed_titles(self):
+        response = self.client.get('/api/tasks/list/')
+        self.assertEqual(response.status_code, 200)
+        return {task['title'] for task in response.json()['tasks']}
+
+    def test_router(self):
+        def route():
+            self.assertEqual(router.db_for_read(Task), DEFAULT_DB_ALIAS)
+            with read_from_replica():
+                self.assertEqual(router.db_for_read(Task), REPLICA)
+                with transaction.atomic():
+                    self.assertEqual(router.db_for_read(Task), DEFAULT_DB_ALIAS)
+                self.assertEqual(router.db_for_write(Task), DEFAULT_DB_ALIAS)
+                # Reads its own write
+                self.assertEqual(router.db_for_read(Task), DEFAULT_DB_ALIAS)
+
+        # A fresh context, not pinned by the writes of earlier tests
+        contextvars.Context().run(route)
+
+    def test_decorated_reads_go_to_the_replica(self):
+        make_task(self.user, title='Replicated')
+        replicate(CustomUser, Task)
+        make_task(self.user, title='Not yet replicated')
+
+        self.assertEqual(self.listed_titles(), {'Replicated'})
+        self.assertNotIn(STICKY_COOKIE, self.client.cookies)
+
+    def test_writes_go_to_the_primary_and_pin_the_client(self):
+        replicate(CustomUser)
+        self.client.force_login(self.user)
+        response = self.client.post(
+            '/api/tasks/create/',
+            {'title': 'Fresh', 'description': 'Description', 'budget': 100},
+            content_type='application/json',
+        )
+        self.assertEqual(response.status_code, 201)
+        task_id = response.json()['task_id']
+        self.assertTrue(Task.objects.using(DEFAULT_DB_ALIAS).filter(id=task_id).exists())
+        self.assertFalse(Task.objects.using(REPLICA).filter(id=task_id).exists())
+        self.assertIn(STICKY_COOKIE, response.cookies)
+
+        # The next read sees the write despite the replica lagging
+        self.assertEqual(self.listed_titles(), {'Fresh'})
+
+        self.client.cookies[STICKY_COOKIE] = str(time.time() - 1)
+        self.assertEqual(self.listed_titles(), set())
+
+
+class ReplicaRecommendationTest(LocalArtifactsMixin, ReplicaTestCase):
+    """
+    The replica-read recommendation view writes its snapshot to the primary
+    """
+
+    def test_snapshot_is_written_to_the_primary(self):
+        from ai_models.recommendation import FreelancerRecommendationEngine
+
+        creator, tasks, _ = make_marketplace()
+        FreelancerRecommendationEngine.train_recommendation_model()
+        replicate(CustomUser, FreelancerProfile, Task)
+
+        response = self.client.get(f'/api/tasks/{tasks[0].id}/recommend/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['model_status'], 'ready')
+        self.assertTrue(RecommendationSnapshot.objects.using(DEFAULT_DB_ALIAS).filter(task=tasks[0]).exists())
+        self.assertFalse(RecommendationSnapshot.objects.using(REPLICA).exists())
+        self.assertIn(STICKY_COOKIE, response.cookies)
+
+        # Pinned, the next request finds the snapshot on the primary
+        again = self.client.get(f'/api/tasks/{tasks[0].id}/recommend/')
+        self.assertEqual(again.json()['recommended_freelancers'], response.json()['recommended_freelancers'])
+
+
+class BulkCreateTasksTest(TestCase):
+    """
+    Bulk task creation is all-or-nothing
+    """
+    url = '/api/tasks/bulk-create/'
+
+    def setUp(self):
+        self.client_user = CustomUser.objects.create_user(username='client', password='pw')
+        self.client.force_login(self.client_user)
+
+    def post(self, items):
+        with self.captureOnCommitCallbacks(execute=False):
+            return self.client.post(self.url, {'tasks': items}, content_type='application/json')
+
+    def item(self, title='Task', **fields):
+        return {'title': title, 'description': 'Description', 'budget': 100, 'skills_required': ['python'], **fields}
+
+    def test_valid_batch_is_created_with_events(self):
+        response = self.post([self.item('First'), self.item('Second', skills_required=[])])
+        self.assertEqual(response.status_code, 201)
+
+        task_ids = response.json()['task_ids']
+        self.assertEqual(
+            list(Task.objects.filter(id__in=task_ids).order_by('id').values_list('title', flat=True)),
+            ['First', 'Second'],
+        )
+        self.assertEqual(
+            set(TaskEvent.objects.filter(event_type='TASK_CREATED').values_list('task_id', flat=True)), set(task_ids)
+        )
+
+    def test_one_invalid_item_rejects_the_whole_batch(self):
+        response = self.post([
+            self.item('Valid'),
+            self.item(title=''),
+            'not an object',
+            self.item('Bad skills', skills_required='python'),
+            self.item('Valid too'),
+        ])
+        self.assertEqual(response.status_code, 400)
+        errors = response.json()['errors']
+        self.assertEqual([error['index'] for error in errors], [1, 2, 3])
+        self.assertIn('title', errors[0]['errors'])
+        self.assertIn('skills_required', errors[2]['errors'])
+        self.assertFalse(Task.objects.exists())
+        self.assertFalse(TaskEvent.objects.exists())
+
+    @override_settings(TASK_BULK_CREATE_LIMIT=2)
+    def test_batch_above_the_limit_is_rejected(self):
+        response = self.post([self.item(), self.item(), self.item()])
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Task.objects.exists())
+
+    def test_failure_while_saving_rolls_back_the_batch(self):
+        with mock.patch('tasks.views.record_task_created', side_effect=DatabaseError('disk full')):
+            with self.assertRaises(DatabaseError):
+                self.post([self.item('First'), self.item('Second')])
+        self.assertFalse(Task.objects.exists())
+
+
+class TaskSearchIndexTest(TestCase):
+    """
+    The full-text index follows every kind of task write
+    """
+
+    def setUp(self):
+        self.client_user = CustomUser.objects.create_user(username='client', password='pw')
+        self.task = make_task(self.client_user, skills=('django',), title='Build a payment API')
+
+    def search(self, query):
+        response = self.client.get('/api/tasks/search/', {'q': query})
+        self.assertEqual(response.status_code, 200)
+        return {result['id'] for result in response.json()['results']}
+
+    def matching(self, query):
+        return set(filter_by_search(Task.objects.all(), query).values_list('id', flat=True))
+
+    def test_inserts_are_indexed(self):
+        bulk = Task.objects.bulk_create([Task(
+            creator=self.client_user, title='Payment dashboard', description='Charts', budget=50,
+            skills_required=['react'],
+        )])[0]
+        self.assertEqual(self.search('payment'), {self.task.id, bulk.id})
+        self.assertEqual(self.search('django'), {self.task.id})
+        # The last word matches as a prefix
+        self.assertEqual(self.search('dashb'), {bulk.id})
+
+    def test_updates_replace_the_indexed_text(self):
+        self.task.title = 'Build a shipping API'
+        self.task.save()
+        self.assertEqual(self.search('payment'), set())
+        self.assertEqual(self.search('shipping'), {self.task.id})
+
+        # Queryset updates bypass save() but not the triggers
+        Task.objects.filter(id=self.task.id).update(description='Needs websockets', skills_required=['go'])
+        self.assertEqual(self.matching('websockets'), {self.task.id})
+        self.assertEqual(self.matching('django'), set())
+        self.assertEqual(self.matching('go'), {self.task.id})
+
+        # Writes to columns outside the index leave it alone
+        Task.objects.filter(id=self.task.id).update(budget=500)
+        self.assertEqual(self.matching('shipping'), {self.task.id})
+
+    def test_deletes_leave_the_index(self):
+        other = make_task(self.client_user, title='Payment reconciliation')
+        self.task.delete()
+        self.assertEqual(self.search('payment'), {other.id})
+        Task.objects.filter(id=other.id).delete()
+        response = self.client.get('/api/tasks/search/', {'q': 'payment'})
+        self.assertEqual(response.json()['count'], 0)
+
+    def test_ensure_repairs_missing_triggers(self):
+        index = search_indexes()[Task]
+        connection = connections[DEFAULT_DB_ALIAS]
+        with connection.cursor() as cursor:
+            cursor.execute(f"DROP TRIGGER {index.fts_table}_au")
+        Task.objects.filter(id=self.task.id).update(title='Logo design')
+
+        index.ensure(connection)
+        self.assertEqual(self.matching('logo'), {self.task.id})
+        self.assertEqual(self.matching('payment'), set())
+        Task.objects.filter(id=self.task.id).update(title='Icon design')
+        self.assertEqual(self.matching('icon'), {self.task.id})
+
+    def test_search_operators_are_taken_literally(self):
+        self.assertEqual(self.search('payment OR "NEAR( *'), set())
+        self.assertEqual(self.search('api payment'), {self.task.id})
+        self.assertEqual(self.matching('***'), set())
+
+
+@override_settings(TASK_EVENT_CONFIG={**settings.TASK_EVENT_CONFIG, 'SETTLE_SECONDS': 0, 'PAGE_SIZE': 2})
+class TaskEventLogTest(TestCase):
+    """
+    Task and submission changes are logged and read back by cursor
+    """
+
+    def setUp(self):
+        self.client_user = CustomUser.objects.create_user(username='client', password='pw')
+        self.freelancer = CustomUser.objects.create_user(username='freelancer', password='pw', is_freelancer=True)
+        self.task = make_task(self.client_user)
+
+    def events(self, **filters):
+        return list(
+            TaskEvent.objects.filter(**filters).order_by('id').values_list('event_type', 'from_status', 'to_status')
+        )
+
+    def page(self, **params):
+        response = self.client.get('/api/tasks/events/', params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_task_transitions_are_logged(self):
+        self.task.title = 'Renamed'
+        self.task.save()
+        self.task.status = 'ASSIGNED'
+        self.task.save()
+        self.task.status = 'IN_PROGRESS'
+        self.task.save(update_fields=['status'])
+
+        self.assertEqual(self.events(task=self.task), [
+            ('TASK_CREATED', '', 'CREATED'),
+            ('STATUS_CHANGED', 'CREATED', 'ASSIGNED'),
+            ('STATUS_CHANGED', 'ASSIGNED', 'IN_PROGRESS'),
+        ])
+
+    def test_submissions_are_logged(self):
+        submission = TaskSubmission.objects.create(task=self.task, freelancer=self.freelancer, submission_text='Done')
+        submission.submission_text = 'Done, with tests'
+        submission.save()
+        submission.status = 'APPROVED'
+        submission.save()
+
+        self.assertEqual(self.events(submission=submission), [
+            ('SUBMISSION_CREATED', '', 'PENDING'),
+            ('SUBMISSION_REVIEWED', 'PENDING', 'APPROVED'),
+        ])
+
+    def test_cursor_pages_through_every_event_once(self):
+        for status in ('ASSIGNED', 'IN_PROGRESS', 'SUBMITTED', 'COMPLETED'):
+            self.task.status = status
+            self.task.save()
+        other = make_task(self.client_user)
+        expected = list(TaskEvent.objects.order_by('id').values_list('id', flat=True))
+
+        seen, cursor = [], 0
+        while True:
+            body = self.page(after=cursor)
+            self.assertLessEqual(len(body['events']), 2)
+            if not body['events']:
+                self.assertEqual(body['cursor'], cursor)
+                break
+            seen += [event['id'] for event in body['events']]
+            cursor = body['cursor']
+        self.assertEqual(seen, expected)
+
+        # Last-Event-ID resumes like ?after=, and ?task= narrows the log
+        response = self.client.get('/api/tasks/events/', HTTP_LAST_EVENT_ID=str(expected[-2]))
+        self.assertEqual([event['id'] for event in response.json()['events']], expected[-1:])
+        self.assertEqual([event['task_id'] for event in self.page(task=other.id)['events']], [other.id])
+
+    def test_unsettled_events_are_held_back(self):
+        with self.settings(TASK_EVENT_CONFIG={**settings.TASK_EVENT_CONFIG, 'SETTLE_SECONDS': 60}):
+            self.assertEqual(self.page(after=0), {'events': [], 'cursor': 0})
+        self.assertEqual(len(self.page(after=0)['events']), 1)
+
+    def test_malformed_cursor_is_rejected(self):
+        for params in ({'after': 'abc'}, {'task': 'x'}):
+            response = self.client.get('/api/tasks/events/', params)
+            self.assertEqual(response.status_code, 400)
+
+
+def fake_encodings():
+    # Stand-ins for the optional zstd and brotli codings, in server preference order
+    return {'zstd': lambda content: b'zstd', 'br': lambda content: b'br', 'gzip': lambda content: b'gzip'}
+
+
+class CompressionTest(TestCase):
+    """
+    Responses get the best coding the client accepts, and stay revalidatable
+    """
+
+    def test_negotiate_encoding_weighs_q_values(self):
+        encodings = fake_encodings()
+        for accept, expected in [
+            ('gzip, br', 'br'),
+            ('gzip', 'gzip'),
+            ('br;q=0.5, gzip', 'gzip'),
+            ('br;q=0.5, gzip;q=0.5', 'br'),
+            ('GZIP ; Q=0.3', 'gzip'),
+            ('gzip;q=0', None),
+            ('*', 'zstd'),
+            ('*;q=0.2, zstd;q=0, gzip;q=0.2', 'br'),
+            ('identity', None),
+            ('', None),
+            ('gzip;q=high, br;q=1.0.0', None),
+        ]:
+            self.assertEqual(negotiate_encoding(accept, encodings), expected, accept)
+
+    def test_compressed_collection_revalidates_with_304(self):
+        client_user = CustomUser.objects.create_user(username='client', password='pw')
+        for i in range(20):
+            make_task(client_user, title=f'Task {i}')
+
+        response = self.client.get('/api/tasks/list/', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        etag = response['ETag']
+        self.assertTrue(etag.startswith('W/"'))
+        self.assertEqual(len(json.loads(gzip.decompress(response.content))['tasks']), 20)
+
+        not_modified = self.client.get('/api/tasks/list/', HTTP_ACCEPT_ENCODING='gzip', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(not_modified.status_code, 304)
+        self.assertEqual(not_modified.content, b'')
+        self.assertFalse(not_modified.has_header('Content-Encoding'))
+
+        make_task(client_user, title='Task 20')
+        changed = self.client.get('/api/tasks/list/', HTTP_ACCEPT_ENCODING='gzip', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(changed.status_code, 200)
+
+    def test_small_and_unaccepted_responses_are_left_alone(self):
+        client_user = CustomUser.objects.create_user(username='client', password='pw')
+        task = make_task(client_user)
+        small = self.client.get(f'/api/tasks/{task.id}/', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertFalse(small.has_header('Content-Encoding'))
+        self.assertIn('Accept-Encoding', small['Vary'])
+
+        with self.settings(COMPRESSION_MIN_SIZE=0):
+            plain = self.client.get(f'/api/tasks/{task.id}/', HTTP_ACCEPT_ENCODING='identity')
+        self.assertFalse(plain.has_header('Content-Encoding'))
+        self.assertEqual(json.loads(plain.content)['id'], task.id)
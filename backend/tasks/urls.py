@@ -4,7 +4,11 @@ from . import views
 urlpatterns = [
     # Task-related endpoints
     path('create/', views.create_task, name='create_task'),
+    path('bulk-create/', views.bulk_create_tasks, name='bulk_create_tasks'),
     path('list/', views.list_tasks, name='list_tasks'),
+    path('search/', views.search_tasks, name='search_tasks'),
+    path('events/', views.task_events, name='task_events'),
+    path('events/stream/', views.stream_task_events, name='stream_task_events'),
     path('<int:task_id>/', views.task_detail, name='task_detail'),
     path('<int:task_id>/submit/', views.submit_task, name='submit_task'),
     path('<int:task_id>/validate/', views.validate_task, name='validate_task'),
@@ -1,11 +1,27 @@
-from django.http import JsonResponse
-from django.views.decorators.http import require_http_methods
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition, require_http_methods
 from django.views.decorators.csrf import csrf_exempt
 from django.contrib.auth.decorators import login_required
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import connections, router, transaction
+from django.db.models import Q
+from ai_marketplace.db import read_from_replica
+from ai_marketplace.http import collection_etag
+from ai_marketplace.serialization import FastJsonResponse
 import json
 
-from .models import Task, TaskSubmission
-from ai_models.models import FreelancerProfile
+from .models import Task, TaskSubmission, StoredBlob
+from .events import events_after, record_task_created, stream_events
+from .search import search_indexes
+from .serializers import TaskValues
+from .storage import blob_digest
+from .uploads import HashingUploadHandler
+from ai_models.models import FreelancerProfile, RecommendationSnapshot
+from ai_models.signals import queue_feature_store_refresh
+from ai_models.snapshots import queue_snapshot_refresh
+from ai_models.training_data import get_training_log_writer
 
 @csrf_exempt
 @require_http_methods(["POST"])
@@ -32,51 +48,275 @@ def create_task(request):
             'message': str(e)
         }, status=400)
 
+@csrf_exempt
+@login_required
+@require_http_methods(["POST"])
+def bulk_create_tasks(request):
+    """
+    Create many tasks in one transaction; nothing is created if any item is invalid
+    """
+    try:
+        data = json.loads(request.body)
+    except json.JSONDecodeError:
+        return JsonResponse({'status': 'error', 'message': 'Invalid JSON'}, status=400)
+
+    items = data.get('tasks') if isinstance(data, dict) else data
+    if not isinstance(items, list) or not items:
+        return JsonResponse({'status': 'error', 'message': 'Expected a non-empty list of tasks'}, status=400)
+    limit = getattr(settings, 'TASK_BULK_CREATE_LIMIT', 1000)
+    if len(items) > limit:
+        return JsonResponse({'status': 'error', 'message': f'At most {limit} tasks per request'}, status=400)
+
+    tasks, errors = [], []
+    for index, item in enumerate(items):
+        if not isinstance(item, dict):
+            errors.append({'index': index, 'errors': {'__all__': ['Expected an object']}})
+            continue
+        task = Task(
+            creator=request.user,
+            title=item.get('title'),
+            description=item.get('description'),
+            budget=item.get('budget'),
+            skills_required=item.get('skills_required', []),
+        )
+        try:
+            # An empty skill list is allowed, as with create_task
+            task.full_clean(exclude=['creator', 'skills_required'])
+            skills = task.skills_required
+            if not isinstance(skills, list) or not all(isinstance(skill, str) for skill in skills):
+                raise ValidationError({'skills_required': ['Expected a list of skill names']})
+        except ValidationError as e:
+            errors.append({'index': index, 'errors': e.message_dict})
+            continue
+        tasks.append(task)
+
+    if errors:
+        return JsonResponse({'status': 'error', 'errors': errors}, status=400)
+
+    with transaction.atomic():
+        # bulk_create sends no post_save, so events, snapshots and features are handled here for the whole batch
+        Task.objects.bulk_create(tasks, batch_size=500)
+        task_ids = [task.id for task in tasks]
+        record_task_created(tasks)
+        queue_snapshot_refresh(task_ids)
+        queue_feature_store_refresh()
+
+    return JsonResponse({
+        'status': 'success',
+        'task_ids': task_ids
+    }, status=201)
+
+def _tasks_etag(request):
+    return collection_etag(Task.objects.all())
+
+
+def _search_etag(request):
+    params = request.GET
+    return collection_etag(Task.objects.all(), params.get('q', ''), params.get('page'), params.get('page_size'))
+
+
+def _recommendation_etag(request, task_id):
+    """
+    ETag of a fresh snapshot; without one the view rebuilds it, so no ETag
+    """
+    from ai_models.recommendation import FreelancerRecommendationEngine
+
+    model_version = FreelancerRecommendationEngine.model_version(task_id)
+    max_age = settings.AI_MODEL_CONFIG.get('SNAPSHOT_MAX_AGE', 3600)
+    snapshot = RecommendationSnapshot.objects.filter(task_id=task_id).only(
+        'task_id', 'model_version', 'computed_at'
+    ).first()
+    if snapshot and snapshot.is_fresh(model_version, max_age):
+        return f"{task_id}-{snapshot.model_version}-{snapshot.computed_at.timestamp()}"
+    return None
+
+
+# Collection endpoints: clients and proxies may store the response but
+# revalidate it with its ETag, getting a 304 while nothing changed
+
 @require_http_methods(["GET"])
+@read_from_replica
+@cache_control(no_cache=True)
+@condition(etag_func=_tasks_etag)
 def list_tasks(request):
     """
     List tasks with optional filtering
     """
-    tasks = Task.objects.all()
-    return JsonResponse({
-        'tasks': list(tasks.values())
+    return FastJsonResponse({
+        'tasks': TaskValues.serialize()
+    })
+
+@require_http_methods(["GET"])
+@read_from_replica
+@cache_control(no_cache=True)
+@condition(etag_func=_search_etag)
+def search_tasks(request):
+    """
+    Full-text search over task titles, descriptions and skills, best matches first
+    """
+    query = request.GET.get('q', '').strip()
+    try:
+        page = max(int(request.GET.get('page', 1)), 1)
+        page_size = min(max(int(request.GET.get('page_size', 20)), 1), 100)
+    except ValueError:
+        return JsonResponse({'status': 'error', 'message': 'page and page_size must be integers'}, status=400)
+    if not query:
+        return JsonResponse({'status': 'error', 'message': 'Missing search query'}, status=400)
+
+    fields = ('id', 'title', 'description', 'skills_required', 'budget', 'status', 'created_at')
+    offset = (page - 1) * page_size
+    connection = connections[router.db_for_read(Task)]
+    index = search_indexes()[Task]
+    if index.supported(connection):
+        task_ids, ranks, total = index.ranked(connection, query, page_size, offset)
+        rows = {row['id']: row for row in Task.objects.using(connection.alias).filter(id__in=task_ids).values(*fields)}
+        results = [dict(rows[task_id], rank=ranks[task_id]) for task_id in task_ids if task_id in rows]
+    else:
+        # No full-text index on this database
+        matches = Task.objects.filter(Q(title__icontains=query) | Q(description__icontains=query))
+        total = matches.count()
+        results = [
+            dict(row, rank=None)
+            for row in matches.order_by('-created_at').values(*fields)[offset:offset + page_size]
+        ]
+
+    return FastJsonResponse({
+        'query': query,
+        'count': total,
+        'page': page,
+        'page_size': page_size,
+        'results': results
     })
 
+def _event_cursor(request):
+    """
+    Cursor from ?after= or an EventSource's Last-Event-ID; None if malformed
+    """
+    value = request.GET.get('after') or request.headers.get('Last-Event-ID') or 0
+    try:
+        return max(int(value), 0)
+    except (TypeError, ValueError):
+        return None
+
+
 @require_http_methods(["GET"])
+@read_from_replica
+def task_events(request):
+    """
+    Catch-up: task events after a cursor, oldest first
+    """
+    cursor = _event_cursor(request)
+    task_id = request.GET.get('task')
+    if cursor is None or (task_id is not None and not task_id.isdigit()):
+        return JsonResponse({'status': 'error', 'message': 'after and task must be integers'}, status=400)
+
+    events = list(events_after(cursor, int(task_id) if task_id else None))
+    return FastJsonResponse({
+        'events': events,
+        'cursor': events[-1]['id'] if events else cursor
+    })
+
+
+@require_http_methods(["GET"])
+async def stream_task_events(request):
+    """
+    Server-sent event stream of task events after a cursor (requires ASGI)
+    """
+    cursor = _event_cursor(request)
+    task_id = request.GET.get('task')
+    if cursor is None or (task_id is not None and not task_id.isdigit()):
+        return JsonResponse({'status': 'error', 'message': 'after and task must be integers'}, status=400)
+
+    response = StreamingHttpResponse(
+        stream_events(cursor, int(task_id) if task_id else None),
+        content_type='text/event-stream'
+    )
+    response['Cache-Control'] = 'no-cache'
+    # Stop nginx from buffering the stream
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+@require_http_methods(["GET"])
+@read_from_replica
 def task_detail(request, task_id):
     """
     Get task details
     """
-    try:
-        task = Task.objects.get(id=task_id)
-        return JsonResponse(task.__dict__)
-    except Task.DoesNotExist:
+    task = TaskValues.get(id=task_id)
+    if task is None:
         return JsonResponse({
             'status': 'error', 
             'message': 'Task not found'
         }, status=404)
+    return FastJsonResponse(task)
+
+def _own_stored_blob(user, digest):
+    """
+    The StoredBlob for ``digest`` if one of ``user``'s submissions already references it
+    """
+    blob = StoredBlob.objects.filter(digest=digest).first()
+    if blob and TaskSubmission.objects.filter(freelancer=user, submission_file=blob.name).exists():
+        return blob
+    return None
 
 @csrf_exempt
 @login_required
 @require_http_methods(["POST"])
 def submit_task(request, task_id):
     """
-    Submit work for a task
+    Submit work for a task.
+
+    Accepts JSON, or multipart/form-data with the deliverable in a
+    ``submission_file`` part. Uploads are streamed to disk in chunks and
+    hashed on the way, so large files never sit in worker memory. Clients
+    may instead send ``submission_hash`` alone to reuse content already
+    stored by one of their own submissions; anyone else's content must be
+    uploaded, since submission hashes are public.
     """
+    # Must be set before request.POST/FILES are first accessed
+    request.upload_handlers = [HashingUploadHandler(request)]
+
     try:
         task = Task.objects.get(id=task_id)
-        data = json.loads(request.body)
-        
-        submission = TaskSubmission.objects.create(
+        if request.content_type == 'multipart/form-data':
+            data = request.POST
+            upload = request.FILES.get('submission_file')
+        else:
+            data = json.loads(request.body)
+            upload = None
+
+        submission = TaskSubmission(
             task=task,
             freelancer=request.user,
             submission_text=data.get('submission_text'),
-            submission_file=data.get('submission_file')
         )
+        stored_blob = None
+        file_name = data.get('submission_file')
+        digest = (data.get('submission_hash') or '').lower().removeprefix('0x') or blob_digest(file_name)
+        if not upload and digest:
+            # Content already stored: reference it without transferring bytes
+            stored_blob = _own_stored_blob(request.user, digest)
+            if not stored_blob:
+                # Same answer whether the content is missing or someone else's
+                return JsonResponse({
+                    'status': 'error',
+                    'message': 'No stored content matches submission_hash; upload the file'
+                }, status=404)
+
+        if upload:
+            submission.submission_hash = '0x' + upload.sha256
+            submission.submission_file.save(upload.name, upload, save=False)
+        elif stored_blob:
+            submission.submission_hash = '0x' + stored_blob.digest
+            submission.submission_file.name = stored_blob.name
+        else:
+            submission.submission_file = file_name
+        submission.save()
         
         return JsonResponse({
             'status': 'success', 
-            'submission_id': submission.id
+            'submission_id': submission.id,
+            'submission_hash': submission.submission_hash
         }, status=201)
     except Exception as e:
         return JsonResponse({
@@ -95,14 +335,19 @@ def validate_task(request, task_id):
         task = Task.objects.get(id=task_id)
         data = json.loads(request.body)
         
-        submission = TaskSubmission.objects.get(
+        submission = TaskSubmission.objects.select_related('freelancer').get(
             id=data.get('submission_id'), 
             task=task
         )
+        submission.task = task
         
         # Update submission status
         submission.status = data.get('status', 'APPROVED')
         submission.save()
+
+        # Capture the outcome as a training sample; buffered and bulk-inserted
+        if submission.status in ('APPROVED', 'REJECTED'):
+            get_training_log_writer().log_submission(submission)
         
         return JsonResponse({
             'status': 'success'
@@ -114,34 +359,54 @@ def validate_task(request, task_id):
         }, status=400)
 
 @require_http_methods(["GET"])
+@read_from_replica
+@cache_control(no_cache=True)
+@condition(etag_func=_recommendation_etag)
 def recommend_freelancers(request, task_id):
     """
-    Get recommended freelancers for a task
+    Get recommended freelancers for a task.
+
+    Served from the task's RecommendationSnapshot when it was built by the
+    current model within AI_MODEL_CONFIG['SNAPSHOT_MAX_AGE']; otherwise the
+    ranking is computed and written through to the snapshot.
     """
-    try:
-        task = Task.objects.get(id=task_id)
-        
-        # Get top 5 recommended freelancers
-        recommendations = task.recommend_freelancers(top_n=5)
-        
-        # Convert recommendations to JSON-serializable format
-        recommended_freelancers = []
-        for rec in recommendations:
-            freelancer = rec['freelancer']
-            recommended_freelancers.append({
-                'user_id': freelancer.user.id,
-                'username': freelancer.user.username,
-                'performance_score': freelancer.performance_score,
-                'skills': freelancer.skill_embedding,
-                'match_score': rec['match_score']
-            })
-        
+    from ai_models.recommendation import FreelancerRecommendationEngine
+    from ai_models.snapshots import build_snapshot, serialize_recommendations
+
+    top_n = 5
+    model_version = FreelancerRecommendationEngine.model_version(task_id)
+    max_age = settings.AI_MODEL_CONFIG.get('SNAPSHOT_MAX_AGE', 3600)
+
+    snapshot = RecommendationSnapshot.objects.filter(task_id=task_id).first()
+    if snapshot and snapshot.is_fresh(model_version, max_age):
         return JsonResponse({
             'task_id': task_id,
-            'recommended_freelancers': recommended_freelancers
+            'model_status': 'ready',
+            'recommended_freelancers': snapshot.recommendations[:top_n]
         })
+
+    try:
+        task = Task.objects.get(id=task_id)
     except Task.DoesNotExist:
         return JsonResponse({
             'status': 'error', 
             'message': 'Task not found'
         }, status=404)
+
+    snapshot = build_snapshot(task)
+    if snapshot:
+        recommended_freelancers = snapshot.recommendations[:top_n]
+    else:
+        # No trained model yet: serve the fallback ranking uncached
+        recommended_freelancers = serialize_recommendations(task.recommend_freelancers(top_n=top_n))
+
+    # 'warming' means a model is being trained and the ranking is a fallback
+    model_status = FreelancerRecommendationEngine.model_status()
+    if snapshot is None and model_status == 'ready':
+        # Artifacts are present but couldn't score the task
+        model_status = 'degraded'
+    return JsonResponse({
+        'task_id': task_id,
+        'model_status': model_status,
+        'recommended_freelancers': recommended_freelancers
+    })
@@ -0,0 +1,93 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication, JWTStatelessUserAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+TOKEN_VERSION_CLAIM = 'token_version'
+
+
+def _cache():
+    return caches[getattr(settings, 'AUTH_USER_CACHE', 'default')]
+
+
+def user_cache_key(user_id, token_version):
+    return f"auth_user:{user_id}:{token_version}"
+
+
+def invalidate_cached_user(user, token_version=None):
+    """
+    Drop the cached copy of a user so the next request reloads it
+    """
+    if token_version is None:
+        token_version = user.token_version
+    _cache().delete(user_cache_key(user.pk, token_version))
+
+
+class VersionedRefreshToken(RefreshToken):
+    """
+    Refresh token carrying the user's token_version and the claims read by
+    ClaimsUser; access tokens derived from it inherit them
+    """
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        token[TOKEN_VERSION_CLAIM] = user.token_version
+        token['username'] = user.username
+        token['is_freelancer'] = user.is_freelancer
+        return token
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication resolving the user from a short-lived cache keyed by
+    user id and token version instead of querying it on every request.
+
+    Tokens issued for an older token_version are rejected.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_('Token contained no recognizable user identification'))
+        token_version = validated_token.get(TOKEN_VERSION_CLAIM, 0)
+
+        cache = _cache()
+        key = user_cache_key(user_id, token_version)
+        user = cache.get(key)
+        if user is None:
+            try:
+                user = self.user_model.objects.get(**{api_settings.USER_ID_FIELD: user_id})
+            except self.user_model.DoesNotExist:
+                raise AuthenticationFailed(_('User not found'), code='user_not_found')
+            if user.token_version != token_version:
+                raise AuthenticationFailed(_('Token has been revoked'), code='token_revoked')
+            cache.set(key, user, getattr(settings, 'AUTH_USER_CACHE_TTL', 60))
+
+        if not user.is_active:
+            raise AuthenticationFailed(_('User is inactive'), code='user_inactive')
+        return user
+
+
+class ClaimsUser(TokenUser):
+    """
+    Stateless user built from token claims alone
+    """
+
+    @property
+    def is_freelancer(self):
+        return self.token.get('is_freelancer', False)
+
+
+class ClaimsJWTAuthentication(JWTStatelessUserAuthentication):
+    """
+    Authentication without any user lookup, for read-only endpoints that
+    only need the user's id and token claims.
+
+    A revoked token keeps working here until it expires.
+    """
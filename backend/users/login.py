@@ -0,0 +1,60 @@
+import asyncio
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth import authenticate
+from django.db import close_old_connections
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_admitted = None
+_lock = threading.Lock()
+
+
+class LoginSaturated(Exception):
+    """
+    Every hashing worker is busy and the wait queue is full
+    """
+
+
+def _get_executor():
+    """
+    Dedicated hashing pool, so password checks never occupy request threads.
+
+    PBKDF2 runs in OpenSSL without the GIL, so these threads hash in parallel.
+    """
+    global _executor, _admitted
+    with _lock:
+        if _executor is None:
+            config = settings.LOGIN_CONFIG
+            workers = config['HASH_WORKERS']
+            _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='login-hash')
+            # Running plus queued logins
+            _admitted = threading.BoundedSemaphore(workers + config['HASH_QUEUE_SIZE'])
+            logger.info(f"Started {workers} password hashing workers")
+        return _executor, _admitted
+
+
+def _authenticate(username, password):
+    close_old_connections()
+    try:
+        return authenticate(username=username, password=password)
+    finally:
+        close_old_connections()
+
+
+async def authenticate_async(username, password):
+    """
+    authenticate() on the hashing pool; raises LoginSaturated instead of
+    queueing past HASH_QUEUE_SIZE
+    """
+    executor, admitted = _get_executor()
+    if not admitted.acquire(blocking=False):
+        raise LoginSaturated()
+    future = executor.submit(_authenticate, username, password)
+    # Freed when hashing ends, even if the request is cancelled before that
+    future.add_done_callback(lambda _: admitted.release())
+    return await asyncio.wrap_future(future)
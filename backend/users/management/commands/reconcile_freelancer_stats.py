@@ -0,0 +1,71 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, Q
+from django.utils import timezone
+from ai_models.models import FreelancerProfile
+from ai_models.signals import queue_feature_store_refresh
+from users.models import CustomUser
+import logging
+
+logger = logging.getLogger(__name__)
+
+STAT_FIELDS = [
+    'submissions_reviewed', 'submissions_approved', 'total_tasks_completed',
+    'approval_rate', 'reputation_score',
+]
+
+
+class Command(BaseCommand):
+    help = 'Recompute denormalized freelancer task and approval statistics'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Number of users written per UPDATE batch'
+        )
+
+    @transaction.atomic
+    def handle(self, *args, **options):
+        # One grouped query over users, their submissions and those submissions' tasks
+        stats = CustomUser.objects.annotate(
+            reviewed=Count(
+                'tasksubmission',
+                filter=Q(tasksubmission__status__in=['APPROVED', 'REJECTED'])
+            ),
+            approved=Count(
+                'tasksubmission',
+                filter=Q(tasksubmission__status='APPROVED')
+            ),
+            completed=Count(
+                'tasksubmission__task',
+                filter=Q(tasksubmission__status='APPROVED', tasksubmission__task__status='COMPLETED'),
+                distinct=True
+            ),
+        ).only('id', *STAT_FIELDS)
+
+        changed = []
+        for user in stats.iterator(chunk_size=options['batch_size']):
+            approval_rate = user.approved / user.reviewed if user.reviewed else 0.0
+            values = {
+                'submissions_reviewed': user.reviewed,
+                'submissions_approved': user.approved,
+                'total_tasks_completed': user.completed,
+                'approval_rate': approval_rate,
+                'reputation_score': approval_rate * CustomUser.REPUTATION_SCALE,
+            }
+            if any(getattr(user, field) != value for field, value in values.items()):
+                for field, value in values.items():
+                    setattr(user, field, value)
+                changed.append(user)
+
+        if changed:
+            CustomUser.objects.bulk_update(changed, STAT_FIELDS, batch_size=options['batch_size'])
+            # bulk_update sends no signals; mark the profiles for the feature store
+            changed_ids = [user.id for user in changed]
+            if FreelancerProfile.objects.filter(user_id__in=changed_ids).update(updated_at=timezone.now()):
+                queue_feature_store_refresh()
+
+        logger.info(f'Reconciled freelancer stats for {len(changed)} users')
+        self.stdout.write(self.style.SUCCESS(f'Updated stats for {len(changed)} users'))
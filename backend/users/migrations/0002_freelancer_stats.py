@@ -0,0 +1,28 @@
+# Generated by Django 5.0.1 on 2026-10-19 16:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customuser',
+            name='approval_rate',
+            field=models.FloatField(default=0.0),
+        ),
+        migrations.AddField(
+            model_name='customuser',
+            name='submissions_approved',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='customuser',
+            name='submissions_reviewed',
+            field=models.IntegerField(default=0),
+        ),
+    ]
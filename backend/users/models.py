@@ -11,6 +11,19 @@ class CustomUser(AbstractUser):
     reputation_score = models.FloatField(default=0.0)
     total_tasks_completed = models.IntegerField(default=0)
 
+    # Denormalized submission outcomes, maintained by tasks.signals and
+    # recomputed by the reconcile_freelancer_stats command
+    submissions_reviewed = models.IntegerField(default=0)
+    submissions_approved = models.IntegerField(default=0)
+    approval_rate = models.FloatField(default=0.0)
+
+    # Embedded in issued JWTs; bumped on password change or deactivation
+    # to revoke every outstanding token (see users.authentication)
+    token_version = models.PositiveIntegerField(default=0)
+
+    # reputation_score is the approval rate on a 0-5 scale
+    REPUTATION_SCALE = 5.0
+
     groups = models.ManyToManyField(
         Group,
         verbose_name='groups',
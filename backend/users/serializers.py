@@ -1,4 +1,7 @@
 from rest_framework import serializers
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from ai_marketplace.serialization import ValuesSerializer
+from .authentication import VersionedRefreshToken
 from .models import CustomUser
 
 class UserRegistrationSerializer(serializers.ModelSerializer):
@@ -26,5 +29,14 @@ class UserRegistrationSerializer(serializers.ModelSerializer):
 class UserProfileSerializer(serializers.ModelSerializer):
     class Meta:
         model = CustomUser
-        fields = ['id', 'username', 'email', 'wallet_address', 'is_freelancer', 'skills', 'reputation_score', 'total_tasks_completed']
-        read_only_fields = ['reputation_score', 'total_tasks_completed']
+        fields = ['id', 'username', 'email', 'wallet_address', 'is_freelancer', 'skills', 'reputation_score', 'total_tasks_completed', 'approval_rate']
+        read_only_fields = ['reputation_score', 'total_tasks_completed', 'approval_rate']
+
+# UserProfileSerializer's output for lists, without per-instance overhead
+UserProfileValues = ValuesSerializer(CustomUser, UserProfileSerializer.Meta.fields)
+
+class VersionedTokenObtainPairSerializer(TokenObtainPairSerializer):
+    """
+    Token obtain serializer issuing tokens bound to the user's token_version
+    """
+    token_class = VersionedRefreshToken
@@ -0,0 +1,52 @@
+from django.db.models.signals import post_delete, post_init, post_save, pre_save
+from django.dispatch import receiver
+
+from .authentication import invalidate_cached_user
+from .models import CustomUser
+
+# Fields whose change revokes every token issued to the user
+REVOKING_FIELDS = ('password', 'is_active')
+TRACKED_FIELDS = REVOKING_FIELDS + ('token_version',)
+
+
+@receiver(post_init, sender=CustomUser)
+def remember_credentials(sender, instance, **kwargs):
+    """
+    Keep the loaded credentials so saves can detect changes without a query
+    """
+    instance._loaded_credentials = {
+        field: instance.__dict__.get(field) if instance.pk else None
+        for field in TRACKED_FIELDS
+    }
+
+
+@receiver(pre_save, sender=CustomUser)
+def bump_token_version(sender, instance, **kwargs):
+    """
+    Revoke outstanding tokens when the password changes or the user is deactivated
+    """
+    if instance._state.adding:
+        return
+    loaded = instance._loaded_credentials
+    password_changed = loaded['password'] is not None and loaded['password'] != instance.password
+    deactivated = loaded['is_active'] and not instance.is_active
+    if password_changed or deactivated:
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'token_version' not in update_fields:
+            # Can't widen update_fields from here; revoke with a direct update
+            CustomUser.objects.filter(pk=instance.pk).update(token_version=instance.token_version + 1)
+        instance.token_version += 1
+
+
+@receiver(post_save, sender=CustomUser)
+@receiver(post_delete, sender=CustomUser)
+def drop_cached_user(sender, instance, **kwargs):
+    """
+    Keep CachedJWTAuthentication from serving a stale or deleted user
+    """
+    invalidate_cached_user(instance)
+    loaded_version = instance._loaded_credentials['token_version']
+    if loaded_version is not None and loaded_version != instance.token_version:
+        # Cached under the version its now-revoked tokens carry
+        invalidate_cached_user(instance, loaded_version)
+    instance._loaded_credentials = {field: instance.__dict__.get(field) for field in TRACKED_FIELDS}
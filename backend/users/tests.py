@@ -1,3 +1,224 @@
-from django.test import TestCase
+import json
+import threading
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.core.cache import caches
+from django.test import TestCase, TransactionTestCase, override_settings
+
+from .authentication import CachedJWTAuthentication, VersionedRefreshToken, user_cache_key
+from .models import CustomUser
+
+PROFILE_URL = '/api/users/profile/'
+LOGIN_URL = '/api/users/login/'
+
+
+@override_settings(AUTH_USER_CACHE='default', AUTH_USER_CACHE_TTL=60)
+class TokenRevocationTest(TestCase):
+    """
+    Password changes and deactivation revoke issued tokens, cached or not
+    """
+
+    def setUp(self):
+        self.cache = caches['default']
+        self.cache.clear()
+        self.addCleanup(self.cache.clear)
+        self.user = CustomUser.objects.create_user(username='alice', password='old-password')
+
+    def token(self, user=None):
+        return str(VersionedRefreshToken.for_user(user or self.user).access_token)
+
+    def get_profile(self, token):
+        return self.client.get(PROFILE_URL, HTTP_AUTHORIZATION=f'Bearer {token}')
+
+    def test_cached_user_skips_the_query(self):
+        token = self.token()
+        self.assertEqual(self.get_profile(token).status_code, 200)
+        self.assertIsNotNone(self.cache.get(user_cache_key(self.user.pk, 0)))
+
+        authentication = CachedJWTAuthentication()
+        validated = authentication.get_validated_token(token.encode())
+        with self.assertNumQueries(0):
+            self.assertEqual(authentication.get_user(validated), self.user)
+
+    def test_password_change_revokes_tokens(self):
+        token = self.token()
+        self.assertEqual(self.get_profile(token).status_code, 200)
+
+        self.user.set_password('new-password')
+        self.user.save()
+
+        self.assertEqual(self.get_profile(token).status_code, 401)
+        self.assertEqual(self.get_profile(self.token()).status_code, 200)
+
+    def test_deactivation_revokes_tokens(self):
+        token = self.token()
+        self.assertEqual(self.get_profile(token).status_code, 200)
+
+        self.user.is_active = False
+        self.user.save()
+
+        self.assertEqual(self.get_profile(token).status_code, 401)
+        self.assertEqual(self.get_profile(self.token()).status_code, 401)
+
+    def test_update_fields_save_revokes_tokens(self):
+        token = self.token()
+        self.user.set_password('new-password')
+        self.user.save(update_fields=['password'])
+
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.token_version, 1)
+        self.assertEqual(self.get_profile(token).status_code, 401)
+
+    def test_unrelated_save_keeps_tokens(self):
+        token = self.token()
+        self.user.first_name = 'Alice'
+        self.user.save(update_fields=['first_name'])
+
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.token_version, 0)
+        self.assertEqual(self.get_profile(token).status_code, 200)
+
+    def test_revocation_evicts_the_old_version(self):
+        self.assertEqual(self.get_profile(self.token()).status_code, 200)
+        self.assertIsNotNone(self.cache.get(user_cache_key(self.user.pk, 0)))
+
+        # A separately loaded copy, as another request would hold
+        user = CustomUser.objects.get(pk=self.user.pk)
+        user.set_password('new-password')
+        user.save()
+
+        self.assertIsNone(self.cache.get(user_cache_key(self.user.pk, 0)))
+        self.assertIsNone(self.cache.get(user_cache_key(self.user.pk, 1)))
+
+    def test_old_token_version_is_rejected_on_a_cold_cache(self):
+        token = self.token()
+        # Bumped without signals, e.g. by another process; nothing cached here
+        CustomUser.objects.filter(pk=self.user.pk).update(token_version=2)
+
+        response = self.get_profile(token)
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response.json()['code'], 'token_revoked')
+        self.assertIsNone(self.cache.get(user_cache_key(self.user.pk, 0)))
+
+
+@override_settings(
+    PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'],
+    LOGIN_CONFIG={
+        'HASH_WORKERS': 1, 'HASH_QUEUE_SIZE': 1,
+        'IP_BURST': 3, 'IP_PER_MINUTE': 1, 'USERNAME_BURST': 2, 'USERNAME_PER_MINUTE': 1,
+    },
+)
+class LoginThrottleTest(TransactionTestCase):
+    """
+    Logins are throttled per client IP and per username before any hashing.
+
+    Passwords are checked on the hashing pool's own connection, which only
+    sees committed rows, hence no wrapping transaction.
+    """
+
+    def setUp(self):
+        caches['default'].clear()
+        self.addCleanup(caches['default'].clear)
+        CustomUser.objects.create_user(username='alice', password='right')
+
+    def login(self, password='right', username='alice', **headers):
+        return self.client.post(
+            LOGIN_URL, {'username': username, 'password': password}, content_type='application/json', **headers
+        )
+
+    def test_success_returns_tokens_and_spends_no_username_tokens(self):
+        with self.settings(LOGIN_CONFIG={**settings.LOGIN_CONFIG, 'IP_BURST': 10}):
+            for _ in range(4):
+                response = self.login()
+                self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['user']['username'], 'alice')
+        self.assertIn('access', response.json())
+
+    def test_failures_lock_the_username(self):
+        with self.settings(LOGIN_CONFIG={**settings.LOGIN_CONFIG, 'IP_BURST': 10}):
+            self.assertEqual(self.login('wrong').status_code, 401)
+            self.assertEqual(self.login('wrong').status_code, 401)
+            # Refused before the password is even checked
+            with mock.patch('users.views.authenticate_async') as authenticate:
+                response = self.login()
+            authenticate.assert_not_called()
+            self.assertEqual(response.status_code, 429)
+            self.assertGreaterEqual(int(response['Retry-After']), 1)
+
+            # Other usernames are unaffected
+            self.assertEqual(self.login(username='bob').status_code, 401)
+
+    def test_ip_bucket_counts_every_attempt(self):
+        for _ in range(3):
+            self.assertEqual(self.login().status_code, 200)
+        response = self.login()
+        self.assertEqual(response.status_code, 429)
+        self.assertIn('Retry-After', response)
+
+    def test_forwarded_for_is_trusted_only_behind_proxies(self):
+        for _ in range(3):
+            self.login(HTTP_X_FORWARDED_FOR='203.0.113.1')
+        # Without trusted proxies the header is ignored: same REMOTE_ADDR
+        self.assertEqual(self.login(HTTP_X_FORWARDED_FOR='203.0.113.2').status_code, 429)
+
+        with self.settings(REST_FRAMEWORK={**settings.REST_FRAMEWORK, 'NUM_PROXIES': 1}):
+            for client in ('203.0.113.1', '203.0.113.2'):
+                self.assertEqual(self.login(HTTP_X_FORWARDED_FOR=f'198.51.100.9, {client}').status_code, 200)
+            self.assertEqual(self.login(HTTP_X_FORWARDED_FOR='203.0.113.9').status_code, 200)
+
+    def test_saturated_hashing_pool_returns_503(self):
+        from . import login
+
+        saturated = (None, threading.Semaphore(0))
+        with mock.patch.object(login, '_get_executor', return_value=saturated):
+            with self.assertLogs('users.views', 'WARNING'):
+                response = self.login()
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response['Retry-After'], '1')
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'], COMPRESSION_MIN_SIZE=0)
+class SecretResponseCompressionTest(TransactionTestCase):
+    """
+    Responses carrying tokens only get padded gzip, never zstd or brotli
+    """
+
+    def setUp(self):
+        caches['default'].clear()
+        self.addCleanup(caches['default'].clear)
+        CustomUser.objects.create_user(username='alice', password='right')
+        # The optional codings aren't installed here; any coding shorter than the body will do
+        encodings = {'zstd': lambda content: b'z', 'br': lambda content: b'b', 'gzip': lambda content: b'g'}
+        patcher = mock.patch('ai_marketplace.http.available_encodings', return_value=encodings)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_token_responses_use_gzip(self):
+        login = self.client.post(
+            LOGIN_URL, {'username': 'alice', 'password': 'right'},
+            content_type='application/json', HTTP_ACCEPT_ENCODING='zstd, br, gzip',
+        )
+        token = self.client.post(
+            '/api/users/token/', {'username': 'alice', 'password': 'right'},
+            content_type='application/json', HTTP_ACCEPT_ENCODING='zstd, br, gzip',
+        )
+        register = self.client.post(
+            '/api/users/register/',
+            {'username': 'bob', 'password': 'pw-123456', 'confirm_password': 'pw-123456', 'email': 'bob@example.com'},
+            content_type='application/json', HTTP_ACCEPT_ENCODING='br, gzip',
+        )
+        for response in (login, token, register):
+            self.assertEqual(response['Content-Encoding'], 'gzip')
+
+        # Nothing but the padded coding is acceptable: sent uncompressed
+        login_br = self.client.post(
+            LOGIN_URL, {'username': 'alice', 'password': 'right'},
+            content_type='application/json', HTTP_ACCEPT_ENCODING='br',
+        )
+        self.assertFalse(login_br.has_header('Content-Encoding'))
+        self.assertIn('access', json.loads(login_br.content))
+
+    def test_other_responses_use_the_preferred_coding(self):
+        response = self.client.get('/api/tasks/list/', HTTP_ACCEPT_ENCODING='gzip, br, zstd')
+        self.assertEqual(response['Content-Encoding'], 'zstd')
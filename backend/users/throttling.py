@@ -0,0 +1,65 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.throttling import BaseThrottle
+
+
+class TokenBucket:
+    """
+    Token bucket kept in the cache: ``burst`` attempts at once, refilled at
+    ``per_minute`` attempts a minute.
+
+    The read-modify-write is not atomic, so concurrent attempts may slightly
+    exceed the rate; that is acceptable for throttling.
+    """
+
+    def __init__(self, scope, burst, per_minute):
+        self.scope = scope
+        self.burst = burst
+        self.rate = per_minute / 60.0
+
+    def key(self, ident):
+        # Hashed so arbitrary usernames and addresses make valid cache keys
+        return f"throttle:{self.scope}:{hashlib.sha1(str(ident).encode()).hexdigest()}"
+
+    async def _tokens(self, key, now):
+        tokens, updated = await cache.aget(key, (self.burst, now))
+        return min(self.burst, tokens + (now - updated) * self.rate)
+
+    async def retry_after(self, ident):
+        """
+        Seconds until ``ident`` may try again, without taking a token
+        """
+        tokens = await self._tokens(self.key(ident), time.time())
+        return 0 if tokens >= 1 else (1 - tokens) / self.rate
+
+    async def consume(self, ident):
+        """
+        Take one token for ``ident``; return 0 if allowed, else seconds to wait
+        """
+        key = self.key(ident)
+        now = time.time()
+        tokens = await self._tokens(key, now)
+        if tokens < 1:
+            return (1 - tokens) / self.rate
+        # Expire once the bucket would have refilled anyway
+        await cache.aset(key, (tokens - 1, now), int(self.burst / self.rate) + 1)
+        return 0
+
+
+def login_buckets():
+    config = settings.LOGIN_CONFIG
+    return (
+        TokenBucket('login_ip', config['IP_BURST'], config['IP_PER_MINUTE']),
+        TokenBucket('login_username', config['USERNAME_BURST'], config['USERNAME_PER_MINUTE']),
+    )
+
+
+def client_ip(request):
+    """
+    Address of the client; read from X-Forwarded-For only behind the
+    REST_FRAMEWORK['NUM_PROXIES'] trusted proxies, so clients can't spoof it
+    """
+    return BaseThrottle().get_ident(request)
@@ -4,6 +4,7 @@ from rest_framework_simplejwt.views import (
     TokenRefreshView,
     TokenVerifyView
 )
+from ai_marketplace.http import secret_response
 from . import views
 
 urlpatterns = [
@@ -12,11 +13,11 @@ urlpatterns = [
     path('profile/', views.UserProfileView.as_view(), name='user-profile'),
     
     # JWT Token Endpoints
-    path('token/', TokenObtainPairView.as_view(), name='token_obtain_pair'),
-    path('token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
+    path('token/', secret_response(TokenObtainPairView.as_view()), name='token_obtain_pair'),
+    path('token/refresh/', secret_response(TokenRefreshView.as_view()), name='token_refresh'),
     path('token/verify/', TokenVerifyView.as_view(), name='token_verify'),
     
     # Additional Authentication Endpoints
-    path('login/', views.UserLoginView.as_view(), name='user-login'),
+    path('login/', views.user_login, name='user-login'),
     path('logout/', views.UserLogoutView.as_view(), name='user-logout'),
 ]
@@ -2,10 +2,21 @@ from django.shortcuts import render
 from rest_framework import generics, permissions, status
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from rest_framework_simplejwt.tokens import RefreshToken
-from django.contrib.auth import authenticate, logout
+from django.contrib.auth import logout
+from django.http import JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_http_methods
+from ai_marketplace.http import secret_response
+from .authentication import VersionedRefreshToken
+from .login import LoginSaturated, authenticate_async
 from .serializers import UserRegistrationSerializer, UserProfileSerializer
 from .models import CustomUser
+from .throttling import client_ip, login_buckets
+import json
+import logging
+import math
+
+logger = logging.getLogger(__name__)
 
 class UserRegistrationView(generics.CreateAPIView):
     """
@@ -20,36 +31,65 @@ class UserRegistrationView(generics.CreateAPIView):
         user = serializer.save()
         
         # Generate JWT tokens
-        refresh = RefreshToken.for_user(user)
+        refresh = VersionedRefreshToken.for_user(user)
         
-        return Response({
+        response = Response({
             'user': UserProfileSerializer(user).data,
             'refresh': str(refresh),
             'access': str(refresh.access_token)
         }, status=status.HTTP_201_CREATED)
+        # Carries tokens; see ai_marketplace.http.secret_response
+        response.contains_secrets = True
+        return response
 
-class UserLoginView(APIView):
+@csrf_exempt
+@require_http_methods(["POST"])
+@secret_response
+async def user_login(request):
     """
-    Handle user login with username/password
+    Handle user login with username/password without blocking on password hashing
     """
-    permission_classes = [permissions.AllowAny]
+    try:
+        data = json.loads(request.body) if request.content_type == 'application/json' else request.POST
+    except json.JSONDecodeError:
+        return JsonResponse({'error': 'Invalid JSON'}, status=400)
+    username = data.get('username')
+    password = data.get('password')
+    if not isinstance(username, str) or not isinstance(password, str) or not username:
+        return JsonResponse({'error': 'Invalid Credentials'}, status=401)
 
-    def post(self, request):
-        username = request.data.get('username')
-        password = request.data.get('password')
-        
-        user = authenticate(username=username, password=password)
-        
-        if user:
-            # Generate JWT tokens
-            refresh = RefreshToken.for_user(user)
-            return Response({
-                'user': UserProfileSerializer(user).data,
-                'refresh': str(refresh),
-                'access': str(refresh.access_token)
-            })
-        
-        return Response({'error': 'Invalid Credentials'}, status=status.HTTP_401_UNAUTHORIZED)
+    # Throttled before any hashing so credential stuffing can't burn CPU.
+    # Every attempt costs the client IP a token; a username only pays for
+    # failed ones, so its owner's own logins never lock it
+    ip_bucket, username_bucket = login_buckets()
+    retry_after = (
+        await ip_bucket.consume(client_ip(request))
+        or await username_bucket.retry_after(username.lower())
+    )
+    if retry_after:
+        response = JsonResponse({'error': 'Too many login attempts'}, status=429)
+        response['Retry-After'] = str(math.ceil(retry_after))
+        return response
+
+    try:
+        user = await authenticate_async(username, password)
+    except LoginSaturated:
+        logger.warning("Login rejected: password hashing pool saturated")
+        response = JsonResponse({'error': 'Login temporarily unavailable'}, status=503)
+        response['Retry-After'] = '1'
+        return response
+
+    if user:
+        # Generate JWT tokens
+        refresh = VersionedRefreshToken.for_user(user)
+        return JsonResponse({
+            'user': UserProfileSerializer(user).data,
+            'refresh': str(refresh),
+            'access': str(refresh.access_token)
+        })
+
+    await username_bucket.consume(username.lower())
+    return JsonResponse({'error': 'Invalid Credentials'}, status=401)
 
 class UserLogoutView(APIView):
     """